@@ -0,0 +1,96 @@
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from benchmarks.drop_chance_benchmark import DropChanceBenchmark
+from src.wow_consts.wow_class import WowClass
+from src.wow_consts.wow_spec import WowSpec
+from src.wow_drop_chance_matrix import WowDropChanceMatrix
+from src.wow_item_csv_exporter import WowItemCsvExporter
+from src.wow_item_table import WowItemTable
+
+class CsvExportBenchmark:
+    """
+    Export time of the class and aggregate csvs, with and without the per-spec csvs, on synthetic items.
+    Also times selecting the rows of every spec and class file: filtering all rows per file, against grouping
+    the rows by spec mask once and joining the groups of each file. Items get the specs of a class, an armor
+    type or a single spec, so there are few distinct masks, as in a real export.
+    """
+
+    ITEM_COUNTS = [250, 1000, 2500]
+    ARMOR_TYPE_CLASSES = [("Mage", "Priest", "Warlock"), ("Dh", "Druid", "Monk", "Rogue"), ("Evoker", "Hunter", "Shaman"),
+                          ("Dk", "Paladin", "Warrior")]
+    REPEATS = 3
+
+    @staticmethod
+    def run() -> None:
+        print(f"{'items':>8} {'classes':>12} {'+ per spec':>12} {'filter rows':>12} {'group rows':>12}")
+        for item_count in CsvExportBenchmark.ITEM_COUNTS:
+            items = DropChanceBenchmark.create_items(item_count)
+            spec_id_lists = CsvExportBenchmark._create_spec_id_lists()
+            rng = random.Random(item_count)
+            for item in items:
+                item.loot_category = "Chest"
+                item.spec_ids = rng.choice(spec_id_lists)
+            item_table = WowItemTable(items)
+            WowDropChanceMatrix(item_table).fill_drop_chances()
+            class_seconds = CsvExportBenchmark._time_best_of(lambda: CsvExportBenchmark._export(item_table, per_spec=False))
+            per_spec_seconds = CsvExportBenchmark._time_best_of(lambda: CsvExportBenchmark._export(item_table, per_spec=True))
+            sorted_rows = item_table.get_rows_for_specs(WowSpec.get_all_spec_ids())
+            filter_seconds = CsvExportBenchmark._time_best_of(lambda: CsvExportBenchmark._filter_rows_per_file(item_table, sorted_rows))
+            group_seconds = CsvExportBenchmark._time_best_of(lambda: CsvExportBenchmark._group_rows_per_file(item_table, sorted_rows))
+            print(f"{item_count:>8} {class_seconds * 1000:10.1f}ms {per_spec_seconds * 1000:10.1f}ms "
+                  f"{filter_seconds * 1000:10.2f}ms {group_seconds * 1000:10.2f}ms")
+
+    @staticmethod
+    def _export(item_table: WowItemTable, per_spec: bool) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            WowItemCsvExporter.export_items_to_csv_for_all_specs_and_classes(item_table, Path(temp_dir), per_spec)
+
+    @staticmethod
+    def _create_spec_id_lists() -> List[List[int]]:
+        """The specs of each class, of each armor type and each single spec"""
+        spec_id_lists = [WowSpec.get_all_spec_ids_for_class(wow_class) for wow_class in WowClass.get_all()]
+        for armor_type_classes in CsvExportBenchmark.ARMOR_TYPE_CLASSES:
+            spec_id_lists.append([spec_id for wow_class in WowClass.get_all() if wow_class.get_abbr() in armor_type_classes
+                                  for spec_id in WowSpec.get_all_spec_ids_for_class(wow_class)])
+        spec_id_lists.extend([spec_id] for spec_id in WowSpec.get_all_spec_ids())
+        return spec_id_lists
+
+    @staticmethod
+    def _get_file_spec_id_lists() -> List[List[int]]:
+        """The spec ids of every spec and class file"""
+        file_spec_id_lists = [[spec_id] for spec_id in WowSpec.get_all_spec_ids()]
+        file_spec_id_lists.extend(WowSpec.get_all_spec_ids_for_class(wow_class) for wow_class in WowClass.get_all())
+        return file_spec_id_lists
+
+    @staticmethod
+    def _filter_rows_per_file(item_table: WowItemTable, sorted_rows: List[int]) -> None:
+        """The row selection used before grouping: every spec and class file filters all rows by its spec mask"""
+        spec_masks = item_table.spec_masks
+        for spec_ids in CsvExportBenchmark._get_file_spec_id_lists():
+            spec_mask = WowSpec.get_mask_from_spec_ids(spec_ids)
+            [row for row in sorted_rows if spec_masks[row] & spec_mask]
+
+    @staticmethod
+    def _group_rows_per_file(item_table: WowItemTable, sorted_rows: List[int]) -> None:
+        row_groups = WowItemCsvExporter._group_rows_by_spec_mask(item_table, sorted_rows)
+        positions = [0] * item_table.row_count
+        for position, row in enumerate(sorted_rows):
+            positions[row] = position
+        for spec_ids in CsvExportBenchmark._get_file_spec_id_lists():
+            WowItemCsvExporter._join_row_groups(row_groups, positions, spec_ids)
+
+    @staticmethod
+    def _time_best_of(benchmark: Callable[[], object]) -> float:
+        best = float("inf")
+        for _ in range(CsvExportBenchmark.REPEATS):
+            start = time.perf_counter()
+            benchmark()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+if __name__ == "__main__":
+    CsvExportBenchmark.run()
@@ -0,0 +1,58 @@
+import random
+import time
+from typing import List, Optional
+
+from src.wow_consts.wow_spec import WowSpec
+from src.wow_drop_chance_matrix import WowDropChanceMatrix
+from src.wow_item import WowItem
+from src.wow_item_table import WowItemTable
+
+class DropChanceBenchmark:
+    """Scaling of WowDropChanceMatrix against per-item WowItem.calculate_drop_chance_per_spec on synthetic items."""
+
+    ITEM_COUNTS = [250, 500, 1000, 2500, 10000, 20000]
+    MAX_PER_ITEM_COUNT = 500 # Above this the per-item calculation (N² x specs) takes minutes
+    BOSS_COUNT = 60
+
+    @staticmethod
+    def run() -> None:
+        print(f"{'items':>8} {'per item':>12} {'matrix':>12}")
+        for item_count in DropChanceBenchmark.ITEM_COUNTS:
+            per_item_seconds: Optional[float] = None
+            if item_count <= DropChanceBenchmark.MAX_PER_ITEM_COUNT:
+                per_item_items = DropChanceBenchmark.create_items(item_count)
+                start = time.perf_counter()
+                for item in per_item_items:
+                    item.calculate_drop_chance_per_spec(per_item_items)
+                per_item_seconds = time.perf_counter() - start
+            matrix_items = DropChanceBenchmark.create_items(item_count)
+            start = time.perf_counter()
+            WowDropChanceMatrix(WowItemTable(matrix_items)).fill_drop_chances()
+            matrix_seconds = time.perf_counter() - start
+            per_item_str = "skipped"
+            if per_item_seconds is not None:
+                per_item_str = f"{per_item_seconds * 1000:10.1f}ms"
+                for per_item_item, matrix_item in zip(per_item_items, matrix_items):
+                    if per_item_item.drop_chances != matrix_item.drop_chances:
+                        print(f"Error: Drop chances of item {matrix_item.item_id} differ")
+                        break
+            print(f"{item_count:>8} {per_item_str:>12} {matrix_seconds * 1000:10.1f}ms")
+
+    @staticmethod
+    def create_items(item_count: int, seed: int = 0) -> List[WowItem]:
+        """Items spread over BOSS_COUNT bosses, each for a random set of specs"""
+        rng = random.Random(seed)
+        all_spec_ids = WowSpec.get_all_spec_ids()
+        items: List[WowItem] = []
+        for index in range(item_count):
+            item = WowItem.create_empty()
+            item.item_id = 100000 + index
+            item.gear_slot = "Chest"
+            item.gear_type = "Plate"
+            item.dropped_by = f"Boss {rng.randrange(DropChanceBenchmark.BOSS_COUNT)}'s Lair"
+            item.spec_ids = rng.sample(all_spec_ids, rng.randint(1, len(all_spec_ids)))
+            items.append(item)
+        return items
+
+if __name__ == "__main__":
+    DropChanceBenchmark.run()
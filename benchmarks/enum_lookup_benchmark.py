@@ -0,0 +1,108 @@
+import time
+from typing import Callable, List, Optional, Tuple, Type
+
+from src.wow_consts.wow_class import WowClass
+from src.wow_consts.wow_enum_base import WowEnumBase
+from src.wow_consts.wow_equip_slot import WowEquipSlot
+from src.wow_consts.wow_loot_category import WowLootCategory
+from src.wow_consts.wow_spec import WowSpec
+
+class EnumLookupBenchmark:
+    """Compares the precomputed wow_consts lookups with the linear scans they replaced."""
+
+    REPEATS = 3
+    ROUNDS = 200
+
+    @staticmethod
+    def run() -> None:
+        spec_ids = WowSpec.get_all_spec_ids()
+        spec_abbrs = WowSpec.get_all_abbrs()
+        slot_names = WowEquipSlot.get_all_ingame_names()
+        category_abbrs = WowLootCategory.get_all_abbrs()
+        specs = WowSpec.get_all()
+
+        def legacy_lookups() -> None:
+            for _ in range(EnumLookupBenchmark.ROUNDS):
+                for spec_id in spec_ids:
+                    EnumLookupBenchmark._legacy_get_abbr(EnumLookupBenchmark._legacy_get_spec_from_id(spec_id))
+                for abbr in spec_abbrs:
+                    EnumLookupBenchmark._legacy_get_from_abbr(WowSpec, abbr)
+                for slot_name in slot_names:
+                    EnumLookupBenchmark._legacy_get_from_ingame_name(WowEquipSlot, slot_name)
+                for abbr in category_abbrs:
+                    EnumLookupBenchmark._legacy_get_from_abbr(WowLootCategory, abbr)
+                for wow_class in WowClass:
+                    EnumLookupBenchmark._legacy_get_spec_ids_for_class(wow_class)
+                for spec in specs:
+                    EnumLookupBenchmark._legacy_is_in_enum_set(spec, "Frost")
+
+        def precomputed_lookups() -> None:
+            for _ in range(EnumLookupBenchmark.ROUNDS):
+                for spec_id in spec_ids:
+                    WowSpec.get_abbr_from_id(spec_id)
+                for abbr in spec_abbrs:
+                    WowSpec.get_from_abbr(abbr)
+                for slot_name in slot_names:
+                    WowEquipSlot.get_from_ingame_name(slot_name)
+                for abbr in category_abbrs:
+                    WowLootCategory.get_from_abbr(abbr)
+                for wow_class in WowClass.get_all():
+                    WowSpec.get_all_spec_ids_for_class(wow_class)
+                for spec in specs:
+                    spec.is_in_enum_set("Frost")
+
+        benchmarks: List[Tuple[str, Callable[[], None]]] = [
+            ("enum lookups (linear scans)", legacy_lookups),
+            ("enum lookups (precomputed)", precomputed_lookups),
+        ]
+        for name, benchmark in benchmarks:
+            seconds = EnumLookupBenchmark._time_best_of(benchmark)
+            print(f"{name:<30} {seconds * 1000:10.2f} ms")
+
+    @staticmethod
+    def _time_best_of(benchmark: Callable[[], None]) -> float:
+        best = float("inf")
+        for _ in range(EnumLookupBenchmark.REPEATS):
+            start = time.perf_counter()
+            benchmark()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    # The implementations before the lookup tables, kept here for comparison only
+    @staticmethod
+    def _legacy_get_abbr(enum: WowEnumBase) -> str:
+        return ''.join(word.capitalize() for word in enum.name.split('_'))
+
+    @staticmethod
+    def _legacy_get_from_abbr(enum_class: Type[WowEnumBase], abbr: str) -> WowEnumBase:
+        for enum in enum_class:
+            if EnumLookupBenchmark._legacy_get_abbr(enum) == abbr:
+                return enum
+        raise ValueError(f"No enum matched the abbr {abbr}")
+
+    @staticmethod
+    def _legacy_get_from_ingame_name(enum_class: Type[WowEnumBase], ingame_name: str) -> Optional[WowEnumBase]:
+        for enum in enum_class:
+            if enum.get_ingame_name() == ingame_name:
+                return enum
+        return None
+
+    @staticmethod
+    def _legacy_get_spec_from_id(spec_id: int) -> WowSpec:
+        for spec in WowSpec:
+            if spec.value.spec_id == spec_id:
+                return spec
+        raise ValueError(f"No spec found with id {spec_id}")
+
+    @staticmethod
+    def _legacy_get_spec_ids_for_class(wowclass: WowClass) -> List[int]:
+        return [spec.value.spec_id for spec in WowSpec if spec.value.wowclass == wowclass]
+
+    @staticmethod
+    def _legacy_is_in_enum_set(enum: WowEnumBase, value: str) -> bool:
+        enum_class = type(enum)
+        return value in [EnumLookupBenchmark._legacy_get_abbr(member) for member in enum_class] \
+            or value in [member.get_ingame_name() for member in enum_class]
+
+if __name__ == "__main__":
+    EnumLookupBenchmark.run()
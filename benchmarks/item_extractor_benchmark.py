@@ -0,0 +1,71 @@
+import time
+from pathlib import Path
+from typing import Any, Callable, List
+
+from scrape_utils import ScrapeUtils
+from src.wow_item_extractor import WowItemExtractor
+from src.wow_item_scraper import WowItemScraper
+
+class ItemExtractorBenchmark:
+    """Item pages parsed per second, by the single-pass extractor and by one regex search per field."""
+
+    REPEATS = 3
+
+    @staticmethod
+    def run(webcache_folder: Path = ScrapeUtils.Html.html_webcache_folder) -> None:
+        pages = ItemExtractorBenchmark._load_pages(webcache_folder)
+        print(f"Info: Benchmarking on {len(pages)} item pages")
+        ItemExtractorBenchmark._print_result("fields, per field (extract_* methods)", pages, ItemExtractorBenchmark._extract_per_field)
+        ItemExtractorBenchmark._print_result("fields, single pass (WowItemExtractor)", pages, WowItemExtractor)
+        old_flag = WowItemScraper.feature_flag_single_pass_extractor
+        try:
+            for single_pass in (False, True):
+                WowItemScraper.feature_flag_single_pass_extractor = single_pass
+                name = f"WowItemScraper, {'single pass' if single_pass else 'per field'}"
+                ItemExtractorBenchmark._print_result(name, pages, lambda html: WowItemScraper(0, html))
+        finally:
+            WowItemScraper.feature_flag_single_pass_extractor = old_flag
+
+    @staticmethod
+    def _load_pages(webcache_folder: Path) -> List[str]:
+        pages = [ScrapeUtils.Persistence.read_textfile(path) for path in sorted(Path(webcache_folder).glob("wowhead/item_*.txt"))]
+        if not pages:
+            print(f"Info: No cached item pages in {webcache_folder}. Using a synthetic page instead.")
+            page = ('<h1 class="heading-size-1">Synthetic Blade</h1>Item Level <!--ilvl-->639 Binds when picked up'
+                    '<table width="100%"><tr><td>One-Hand</td><th><!--scstart2:7--><span class="q1">Sword</span>'
+                    '<!--scend--></th></tr></table>+1,234 [Agility or Strength] +5,678 Stamina 456 Haste 789 Mastery'
+                    'Requires Level <!--rlvl-->80<span class="moneygold">35</span>Dropped by: Ulgrax</div>')
+            pages = [page * 2] * 200
+        return pages
+
+    @staticmethod
+    def _extract_per_field(html: str) -> None:
+        """The extraction WowItemScraper did before WowItemExtractor: one regex search per field"""
+        scraper = WowItemScraper.__new__(WowItemScraper) # Skips __init__, which would extract everything
+        scraper.html_string = html
+        scraper.extract_name()
+        scraper.extract_item_level()
+        scraper.extract_bind()
+        scraper.extract_gear_slot()
+        scraper.extract_gear_type()
+        scraper.extract_unique()
+        scraper.extract_primary_stats()
+        scraper.extract_secondary_stats()
+        scraper.extract_required_level()
+        scraper.extract_sell_price()
+        scraper.extract_dropped_by()
+        scraper.extract_spec_ids()
+        WowItemScraper.VALID_ONLY_FOR_TANK_SPECS in html
+
+    @staticmethod
+    def _print_result(name: str, pages: List[str], parse: Callable[[str], Any]) -> None:
+        best = float("inf")
+        for _ in range(ItemExtractorBenchmark.REPEATS):
+            start = time.perf_counter()
+            for html in pages:
+                parse(html)
+            best = min(best, time.perf_counter() - start)
+        print(f"{name:<40} {best * 1000:10.2f} ms  {len(pages) / max(best, 1e-9):10.0f} pages/s")
+
+if __name__ == "__main__":
+    ItemExtractorBenchmark.run()
@@ -0,0 +1,57 @@
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from src.sim_world_tour import SimWorldTour
+from src.wow_consts.wow_equip_slot import WowEquipSlot
+from src.wow_consts.wow_spec import WowSpec
+from src.wow_consts.wow_stat_primary import WowStatPrimary
+from src.wow_drop_chance_matrix import WowDropChanceMatrix
+from src.wow_item import WowItem
+from src.wow_item_table import WowItemTable
+
+class SimWorldTourBenchmark:
+    """Simming many loot chances: one full sim per loot chance against one shared drop chance table."""
+
+    ITEM_COUNT = 2000
+    LOOT_CHANCE_COUNT = 50
+
+    @staticmethod
+    def run() -> None:
+        item_table = WowItemTable(SimWorldTourBenchmark.create_items(SimWorldTourBenchmark.ITEM_COUNT))
+        WowDropChanceMatrix(item_table).fill_drop_chances()
+        loot_chances = [index / SimWorldTourBenchmark.LOOT_CHANCE_COUNT for index in range(SimWorldTourBenchmark.LOOT_CHANCE_COUNT)]
+        print(f"Info: {SimWorldTourBenchmark.ITEM_COUNT} items, {len(loot_chances)} loot chances")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            start = time.perf_counter()
+            for loot_chance in loot_chances:
+                SimWorldTour.sim_world_tour(SimWorldTour.HC, item_table, Path(temp_dir), loot_chance)
+            one_sim_per_loot_chance = time.perf_counter() - start
+        start = time.perf_counter()
+        SimWorldTour.sim_world_tour_for_loot_chances(item_table, loot_chances)
+        shared_table = time.perf_counter() - start
+        print(f"{'one sim per loot chance':<30} {one_sim_per_loot_chance * 1000:10.1f} ms")
+        print(f"{'shared drop chance table':<30} {shared_table * 1000:10.1f} ms")
+
+    @staticmethod
+    def create_items(item_count: int, seed: int = 0) -> List[WowItem]:
+        rng = random.Random(seed)
+        all_spec_ids = WowSpec.get_all_spec_ids()
+        gear_slots = WowEquipSlot.get_all_ingame_names()
+        primary_stats = WowStatPrimary.get_all_ingame_names()
+        items: List[WowItem] = []
+        for index in range(item_count):
+            item = WowItem.create_empty()
+            item.item_id = 100000 + index
+            item.gear_slot = rng.choice(gear_slots)
+            item.gear_type = "Plate"
+            item.primary_stats = {stat: 1000 for stat in rng.sample(primary_stats, rng.randint(1, 3))}
+            item.dropped_by = f"Boss {rng.randrange(60)}"
+            item.spec_ids = rng.sample(all_spec_ids, rng.randint(1, len(all_spec_ids)))
+            items.append(item)
+        return items
+
+if __name__ == "__main__":
+    SimWorldTourBenchmark.run()
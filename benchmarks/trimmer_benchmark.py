@@ -0,0 +1,101 @@
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from scrape_utils import ScrapeUtils
+from src.wow_item_scraper import WowItemScraper
+from src.wow_zone_scraper import WowZoneScraper
+
+class TrimmerBenchmark:
+    """Compares the Trimmer engine with the implementation it replaced, on pages from the webcache."""
+
+    REPEATS = 3
+
+    @staticmethod
+    def run(webcache_folder: Path = ScrapeUtils.Html.html_webcache_folder) -> None:
+        WowItemScraper._set_trimmer_ruleset_for_wowhead_item()
+        WowZoneScraper._set_trimmer_ruleset_for_wowhead_zone()
+        pages = TrimmerBenchmark._load_pages(webcache_folder)
+        total_chars = sum(len(html) for _, html in pages)
+        print(f"Info: Benchmarking on {len(pages)} pages ({total_chars} characters)")
+
+        def legacy_lookup() -> None:
+            for url, _ in pages:
+                TrimmerBenchmark._legacy_find_trimmer(url)
+
+        def indexed_lookup() -> None:
+            for url, _ in pages:
+                ScrapeUtils.Trimmer.find_trimmer(url)
+
+        def legacy_strict_trim() -> None:
+            for url, html in pages:
+                trimmer = ScrapeUtils.Trimmer.find_trimmer(url)
+                if trimmer is not None:
+                    TrimmerBenchmark._legacy_trim_start_and_end(html, trimmer.start, trimmer.end)
+
+        def linear_strict_trim() -> None:
+            for url, html in pages:
+                trimmer = ScrapeUtils.Trimmer.find_trimmer(url)
+                if trimmer is not None:
+                    ScrapeUtils.Trimmer.trim_start_and_end(html, trimmer.start, trimmer.end)
+
+        def trim_html() -> None:
+            for url, html in pages:
+                ScrapeUtils.Trimmer.trim_html(url, html)
+
+        benchmarks: List[Tuple[str, Callable[[], None]]] = [
+            ("ruleset lookup (substring scan)", legacy_lookup),
+            ("ruleset lookup (host index)", indexed_lookup),
+            ("trim_start_and_end (per-index startswith)", legacy_strict_trim),
+            ("trim_start_and_end (linear find)", linear_strict_trim),
+            ("trim_html", trim_html),
+        ]
+        for name, benchmark in benchmarks:
+            seconds = TrimmerBenchmark._time_best_of(benchmark)
+            print(f"{name:<45} {seconds * 1000:10.2f} ms  {len(pages) / max(seconds, 1e-9):12.0f} pages/s")
+
+    @staticmethod
+    def _load_pages(webcache_folder: Path) -> List[Tuple[str, str]]:
+        """Read cached wowhead pages, turning their file names back into (approximate) urls"""
+        pages: List[Tuple[str, str]] = []
+        for path in sorted(Path(webcache_folder).glob("wowhead/*.txt")):
+            stem = path.stem
+            for prefix in ("item_", "zone_"):
+                if stem.startswith(prefix):
+                    url = f"https://www.wowhead.com/{prefix[:-1]}={stem[len(prefix):]}"
+                    pages.append((url, ScrapeUtils.Persistence.read_textfile(path)))
+        if not pages:
+            print(f"Info: No cached pages in {webcache_folder}. Using a synthetic page instead.")
+            filler = "<div>lorem ipsum</div>" * 5000
+            html = f'{filler}<h1 class="heading-size-1">Item</h1>{filler}<h2 class="heading-size-2 clear">Related</h2></div>{filler}'
+            pages = [(f"https://www.wowhead.com/item={i}", html) for i in range(20)]
+        return pages
+
+    @staticmethod
+    def _time_best_of(benchmark: Callable[[], None]) -> float:
+        best = float("inf")
+        for _ in range(TrimmerBenchmark.REPEATS):
+            start = time.perf_counter()
+            benchmark()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    @staticmethod
+    def _legacy_find_trimmer(url: str) -> List[ScrapeUtils.Trimmer]:
+        """The lookup used before rulesets were indexed: a substring test against every target_url"""
+        registry: Dict[str, ScrapeUtils.Trimmer] = ScrapeUtils.Trimmer._trimmer_registry
+        return [value for key, value in registry.items() if key in url]
+
+    @staticmethod
+    def _legacy_trim_start_and_end(text_to_trim: str, start: str, end: str) -> str:
+        """The trim_start_and_end used before the linear-time rewrite (error prints left out)"""
+        start_indices = [i for i in range(len(text_to_trim)) if text_to_trim.startswith(start, i)]
+        if len(start_indices) == 1:
+            text_to_trim = text_to_trim[start_indices[0]:]
+        end_indices = [i for i in range(len(text_to_trim)) if text_to_trim.startswith(end, i)]
+        if len(end_indices) == 1:
+            text_to_trim = text_to_trim[:end_indices[-1] + len(end)]
+        return text_to_trim
+
+if __name__ == "__main__":
+    TrimmerBenchmark.run()
@@ -1,4 +1,15 @@
+import argparse
+
 from src.main_wowhead_pipeline import MainWowheadPipeline
 
 if __name__ == "__main__":
-    MainWowheadPipeline.main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape Wowhead and export the loot of each content group as csv files.")
+    parser.add_argument("--jobs", type=int, default=MainWowheadPipeline.jobs,
+                        help="number of pipeline stages to run at the same time (default: %(default)s)")
+    parser.add_argument("--dry-run", action="store_true", help="print the stage graph without running it")
+    args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    MainWowheadPipeline.jobs = args.jobs
+    MainWowheadPipeline.dry_run = args.dry_run
+    MainWowheadPipeline.main()
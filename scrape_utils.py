@@ -1,17 +1,129 @@
+import codecs
+import hashlib
+import json
+import os
+import queue
+import sqlite3
 import string
-from urllib.request import urlopen
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from urllib.request import Request, urlopen
 from urllib.error import URLError, HTTPError
 from urllib.parse import urlparse
 from pathlib import Path
-from typing import Optional, Union, Dict, List
+from typing import Any, Callable, Optional, Union, Dict, List, Iterable, Iterator, TextIO, Tuple
 
 class ScrapeUtils:
     """My personal scraping utils, copy-pasted from another project."""
 
+    class Metrics:
+        """Process-wide counters, timings and stage times of a run, for a json report and a summary."""
+
+        _lock = threading.Lock()
+        _started_at: float = time.perf_counter()
+        _counters: Dict[str, float] = {}
+        _timings: Dict[str, List[float]] = {} # Name -> [count, total, min, max] in seconds
+        _stages: Dict[str, Dict[str, float]] = {}
+
+        @staticmethod
+        def increment(name: str, amount: float = 1) -> None:
+            """Add amount to the counter called name, which starts at 0."""
+            with ScrapeUtils.Metrics._lock:
+                ScrapeUtils.Metrics._counters[name] = ScrapeUtils.Metrics._counters.get(name, 0) + amount
+
+        @staticmethod
+        def observe(name: str, seconds: float) -> None:
+            """Add one duration to the timing called name."""
+            with ScrapeUtils.Metrics._lock:
+                timing = ScrapeUtils.Metrics._timings.get(name)
+                if timing is None:
+                    ScrapeUtils.Metrics._timings[name] = [1, seconds, seconds, seconds]
+                else:
+                    timing[0] += 1
+                    timing[1] += seconds
+                    timing[2] = min(timing[2], seconds)
+                    timing[3] = max(timing[3], seconds)
+
+        @staticmethod
+        @contextmanager
+        def timer(name: str) -> Iterator[None]:
+            """Observe the wall time of the block as the timing called name."""
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                ScrapeUtils.Metrics.observe(name, time.perf_counter() - start)
+
+        @staticmethod
+        @contextmanager
+        def stage(name: str) -> Iterator[None]:
+            """Record the wall and cpu time of a pipeline stage. Cpu time is that of the calling thread."""
+            wall_start = time.perf_counter()
+            cpu_start = time.thread_time()
+            try:
+                yield
+            finally:
+                stage_times = {"wall_seconds": time.perf_counter() - wall_start, "cpu_seconds": time.thread_time() - cpu_start}
+                with ScrapeUtils.Metrics._lock:
+                    ScrapeUtils.Metrics._stages[name] = stage_times
+
+        @staticmethod
+        def get_report() -> Dict[str, Any]:
+            """Run time, stage times, counters and timing statistics since the last reset, sorted by name."""
+            with ScrapeUtils.Metrics._lock:
+                timings = {name: {"count": count, "total_seconds": total, "mean_seconds": total / count,
+                                  "min_seconds": minimum, "max_seconds": maximum}
+                           for name, (count, total, minimum, maximum) in sorted(ScrapeUtils.Metrics._timings.items())}
+                return {
+                    "run_seconds": time.perf_counter() - ScrapeUtils.Metrics._started_at,
+                    "stages": {name: dict(stage_times) for name, stage_times in ScrapeUtils.Metrics._stages.items()},
+                    "counters": dict(sorted(ScrapeUtils.Metrics._counters.items())),
+                    "timings": timings,
+                }
+
+        @staticmethod
+        def write_report(path: Union[Path, str]) -> None:
+            """Write get_report as json, to compare runs."""
+            ScrapeUtils.Persistence.write_textfile(path, json.dumps(ScrapeUtils.Metrics.get_report(), indent=1))
+
+        @staticmethod
+        def print_summary(max_timings: int = 12) -> None:
+            """Print the stages, counters and the timings with the largest total on one screen."""
+            report = ScrapeUtils.Metrics.get_report()
+            print(f"Info: Metrics of a run of {report['run_seconds']:.2f}s")
+            for name, stage_times in report["stages"].items():
+                print(f"  stage {name:<36} wall {stage_times['wall_seconds']:8.3f}s  cpu {stage_times['cpu_seconds']:8.3f}s")
+            for name, value in report["counters"].items():
+                print(f"  {name:<42} {value:>14,.0f}")
+            timings = sorted(report["timings"].items(), key=lambda item: item[1]["total_seconds"], reverse=True)
+            for name, timing in timings[:max_timings]:
+                print(f"  {name:<42} {timing['count']:>6}x  total {timing['total_seconds']:8.3f}s  "
+                      f"mean {timing['mean_seconds'] * 1000:8.2f}ms  max {timing['max_seconds'] * 1000:8.2f}ms")
+
+        @staticmethod
+        def reset() -> None:
+            """Forget every counter, timing and stage time, and restart the run clock."""
+            with ScrapeUtils.Metrics._lock:
+                ScrapeUtils.Metrics._started_at = time.perf_counter()
+                ScrapeUtils.Metrics._counters.clear()
+                ScrapeUtils.Metrics._timings.clear()
+                ScrapeUtils.Metrics._stages.clear()
+
     class Trimmer:
         """Text and HTML trimming rulesets for scraping purposes."""
 
         _trimmer_registry: Dict[str, 'ScrapeUtils.Trimmer'] = {}
+        _trimmer_registry_lock = threading.Lock()
+
+        # Rulesets indexed by host ('wowhead.com'), each holding (path prefix, trimmer) pairs.
+        # Target urls without a host part are kept aside and matched as substrings.
+        _host_index: Dict[str, List[Tuple[str, 'ScrapeUtils.Trimmer']]] = {}
+        _substring_trimmers: List['ScrapeUtils.Trimmer'] = []
 
         def __init__(self, target_url: str, start: str, end: str) -> None:
             """Initialize trimmer configuration."""
@@ -23,25 +135,135 @@ class ScrapeUtils:
         def register_trimming_ruleset(target_url: str, start: str, end: str) -> None:
             """Create and register a trimming ruleset to be used by urls matching target_url"""
             new_trimmer = ScrapeUtils.Trimmer(target_url, start, end)
-            if target_url in ScrapeUtils.Trimmer._trimmer_registry:
-                existing_trimmer = ScrapeUtils.Trimmer._trimmer_registry[target_url]
-                if not ScrapeUtils.Trimmer._is_equal(new_trimmer, existing_trimmer):
+            with ScrapeUtils.Trimmer._trimmer_registry_lock:
+                if target_url in ScrapeUtils.Trimmer._trimmer_registry:
+                    existing_trimmer = ScrapeUtils.Trimmer._trimmer_registry[target_url]
+                    if ScrapeUtils.Trimmer._is_equal(new_trimmer, existing_trimmer):
+                        return
                     print(f"Warning: Existing trimmer with target_url {target_url} was overwritten")
-            ScrapeUtils.Trimmer._trimmer_registry[target_url] = new_trimmer
+                ScrapeUtils.Trimmer._trimmer_registry[target_url] = new_trimmer
+                ScrapeUtils.Trimmer._rebuild_index()
+
+        @staticmethod
+        def unregister_trimming_ruleset(target_url: str) -> None:
+            """Remove the trimming ruleset registered for target_url, if any"""
+            with ScrapeUtils.Trimmer._trimmer_registry_lock:
+                if ScrapeUtils.Trimmer._trimmer_registry.pop(target_url, None) is not None:
+                    ScrapeUtils.Trimmer._rebuild_index()
 
         @staticmethod
         def trim_html(url: str, html: str) -> str:
             """ Find the trimming ruleset that matches the url and apply it on the html """
+            trimmer = ScrapeUtils.Trimmer.find_trimmer(url)
+            if trimmer is not None:
+                trimmed_html = trimmer.trim(html)
+                ScrapeUtils.Metrics.increment("trimmer.trimmed_chars", len(html) - len(trimmed_html))
+                return trimmed_html
+            return html
+
+        @staticmethod
+        def find_trimmer(url: str) -> Optional['ScrapeUtils.Trimmer']:
+            """ Find the trimming ruleset that matches the url, if exactly one does """
+            _, scheme_separator, rest = url.partition("://")
+            host, slash, path = (rest if scheme_separator else url).partition('/')
+            host = host.rpartition('@')[2].partition(':')[0].lower() # Strip user info and port
+            path = slash + path
             matches: List[ScrapeUtils.Trimmer] = []
-            for key, value in ScrapeUtils.Trimmer._trimmer_registry.items():
-                if key in url: # Check the registry for any trimmers with a matching target_url
-                    matches.append(value)
+            # No lock needed: _rebuild_index replaces both structures instead of mutating them
+            host_index = ScrapeUtils.Trimmer._host_index
+            host_parts = host.split('.')
+            for i in range(len(host_parts)): # 'www.wowhead.com', then 'wowhead.com', then 'com'
+                for path_prefix, trimmer in host_index.get('.'.join(host_parts[i:]), []):
+                    if path.startswith(path_prefix):
+                        matches.append(trimmer)
+            for trimmer in ScrapeUtils.Trimmer._substring_trimmers:
+                if trimmer.target_url in url:
+                    matches.append(trimmer)
             if len(matches) == 1: # If exactly one trimmer is found, use that
-                trimmer = matches[0]
-                return ScrapeUtils.Trimmer._trim_start_and_end(html, trimmer.start, trimmer.end)
+                return matches[0]
             if len(matches) > 1: # If not exactly one trimmers is found, do no trimming
                 print(f"Warning: Url {url} matched {len(matches)} trimmers. Trimming was skipped")
-            return html
+            return None
+
+        @staticmethod
+        def trim_directory(folder: Path, pattern: str = "*.txt") -> int:
+            """
+            Re-apply the registered rulesets to every cached page below folder (a webcache folder
+            laid out as <domain>/<sanitized-url>.txt) and rewrite the pages that got shorter.
+            Rulesets without a host are not applied, since file names cannot be turned back into urls.
+            Returns the number of characters trimmed away.
+            """
+            with ScrapeUtils.Trimmer._trimmer_registry_lock:
+                trimmers = list(ScrapeUtils.Trimmer._trimmer_registry.values())
+            valid_chars = f"-_.{string.ascii_letters}{string.digits}" # Same as in Html._generate_filename
+            file_prefixes: List[Tuple[str, str, ScrapeUtils.Trimmer]] = []
+            for trimmer in trimmers:
+                host, _, path_prefix = trimmer.target_url.partition('/')
+                foldername = ScrapeUtils.Html._generate_foldername(f"https://{host}")
+                file_prefix = ''.join(c if c in valid_chars else '_' for c in path_prefix).lstrip('_')
+                if foldername: # An empty path prefix covers every page of the host
+                    file_prefixes.append((foldername, file_prefix, trimmer))
+            trimmed_count = 0
+            for path in sorted(Path(folder).rglob(pattern)):
+                # Like find_trimmer, a ruleset for 'wowhead.com' also matches subdomains ('ptr_wowhead')
+                matches = [trimmer for foldername, file_prefix, trimmer in file_prefixes
+                           if (path.parent.name == foldername or path.parent.name.endswith(f"_{foldername}"))
+                           and path.name.startswith(file_prefix)]
+                if len(matches) != 1:
+                    continue
+                html = ScrapeUtils.Persistence.read_textfile(path)
+                trimmed_html = matches[0].trim(html)
+                if len(trimmed_html) < len(html):
+                    ScrapeUtils.Persistence.write_textfile(path, trimmed_html)
+                    trimmed_count += len(html) - len(trimmed_html)
+            return trimmed_count
+
+        def trim(self, text_to_trim: str) -> str:
+            """Trim away everything before the first 'start' and everything after the last 'end'"""
+            return ScrapeUtils.Trimmer._trim_start_and_end(text_to_trim, self.start, self.end)
+
+        def trim_stream(self, text_chunks: Iterable[str]) -> Optional[str]:
+            """
+            Trim text that arrives in chunks. Text before 'start' is never buffered and
+            reading stops at the first 'end' (_trim_start_and_end keeps up to the last one).
+            Returns None if 'start' never appeared, since the skipped text is gone by then.
+            Counts the characters read but not kept as trimmer.trimmed_chars, like trim_html.
+            Text after 'end' that was never read is not counted.
+            """
+            start, end = self.start, self.end
+            read_chars = 0
+            kept_chunks: List[str] = []
+            pending = "" # Unsearched text, plus a tail that may hold the beginning of a marker
+            found_start = len(start) == 0
+            for chunk in text_chunks:
+                read_chars += len(chunk)
+                pending += chunk
+                if not found_start:
+                    start_index = pending.find(start)
+                    if start_index == -1:
+                        pending = pending[len(pending) - len(start) + 1:] if len(pending) >= len(start) else pending
+                        continue
+                    found_start = True
+                    pending = pending[start_index:]
+                if not end:
+                    continue
+                end_index = pending.find(end)
+                if end_index != -1:
+                    kept_chunks.append(pending[:end_index + len(end)])
+                    return ScrapeUtils.Trimmer._count_trimmed_chars(''.join(kept_chunks), read_chars)
+                split_index = len(pending) - len(end) + 1
+                if split_index > 0:
+                    kept_chunks.append(pending[:split_index])
+                    pending = pending[split_index:]
+            if not found_start:
+                return None
+            kept_chunks.append(pending)
+            return ScrapeUtils.Trimmer._count_trimmed_chars(''.join(kept_chunks), read_chars)
+
+        @staticmethod
+        def _count_trimmed_chars(trimmed_text: str, read_chars: int) -> str:
+            ScrapeUtils.Metrics.increment("trimmer.trimmed_chars", read_chars - len(trimmed_text))
+            return trimmed_text
 
         @staticmethod
         def trim_start_and_end(text_to_trim: str, start: str, end: str) -> str:
@@ -49,32 +271,41 @@ class ScrapeUtils:
 
             def _trim_start(text: str, start: str) -> str:
                 """Trim away everything before 'start' """
-                start_indices = [i for i in range(len(text)) if text.startswith(start, i)]
-                if len(start_indices) == 0:
+                start_index, occurrences = ScrapeUtils.Trimmer._find_single(text, start)
+                if occurrences == 0:
                     print("Error: 'start' string not found in the text.")
                     return text
-                if len(start_indices) > 1:
+                if occurrences > 1:
                     print("Error: 'start' string found multiple times in the text.")
                     return text
-                start_index = start_indices[0]
                 return text[start_index:]
 
             def _trim_end(text: str, end: str) -> str:
                 """Trim away everything after 'end' """
-                end_indices = [i for i in range(len(text)) if text.startswith(end, i)]
-                if len(end_indices) == 0:
+                end_index, occurrences = ScrapeUtils.Trimmer._find_single(text, end)
+                if occurrences == 0:
                     print("Error: 'end' string not found in the text.")
                     return text
-                if len(end_indices) > 1:
+                if occurrences > 1:
                     print("Error: 'end' string found multiple times in the text.")
                     return text
-                end_index = end_indices[-1]
                 return text[:end_index + len(end)]
 
             text_to_trim = _trim_start(text_to_trim, start)
             text_to_trim = _trim_end(text_to_trim, end)
             return text_to_trim
 
+        @staticmethod
+        def _find_single(text: str, marker: str) -> Tuple[int, int]:
+            """Return the first index of marker and whether it occurs 0, 1 or more (2) times, overlaps included"""
+            first_index = text.find(marker)
+            if first_index == -1 or first_index >= len(text): # An empty marker only counts before the last char
+                return -1, 0
+            second_index = text.find(marker, first_index + 1)
+            if second_index == -1 or second_index >= len(text):
+                return first_index, 1
+            return first_index, 2
+
         @staticmethod
         def _trim_start_and_end(text_to_trim: str, start: str, end: str) -> str:
             """Trim away everything before 'start' and everything after 'end'"""
@@ -86,6 +317,20 @@ class ScrapeUtils:
                 text_to_trim = text_to_trim[:end_index + len(end)]
             return text_to_trim
 
+        @staticmethod
+        def _rebuild_index() -> None:
+            """Index the registry by host and path prefix. Must be called with the registry lock held."""
+            host_index: Dict[str, List[Tuple[str, ScrapeUtils.Trimmer]]] = {}
+            substring_trimmers: List[ScrapeUtils.Trimmer] = []
+            for target_url, trimmer in ScrapeUtils.Trimmer._trimmer_registry.items():
+                host, slash, path_prefix = target_url.partition('/')
+                if '.' not in host or ':' in host or '?' in host or '=' in host:
+                    substring_trimmers.append(trimmer)
+                    continue
+                host_index.setdefault(host.lower(), []).append((slash + path_prefix, trimmer))
+            ScrapeUtils.Trimmer._host_index = host_index
+            ScrapeUtils.Trimmer._substring_trimmers = substring_trimmers
+
         @staticmethod
         def _is_equal(trimmer1: 'ScrapeUtils.Trimmer', trimmer2: 'ScrapeUtils.Trimmer') -> bool:
             """Compares if two trimmers are equal in their target_url and ruleset"""
@@ -99,12 +344,27 @@ class ScrapeUtils:
         """Custom persistence and FileIO solution for scraping purposes."""
         # Paths and folders
         _workspace_path: Path = Path.cwd()
+        # If set, writes of content a file already holds are skipped (see use_output_manifest)
+        output_manifest: Optional['ScrapeUtils.OutputManifest'] = None
+        # If set, write_textfile returns at once and a background thread writes (see use_write_behind)
+        write_behind: Optional['ScrapeUtils.WriteBehindQueue'] = None
+        # Folder -> its resolved path, for folders known to exist
+        _resolved_directories: Dict[Path, Path] = {}
 
         @staticmethod
         def read_textfile(path: Union[Path, str], missing_ok: bool = False) -> str:
             """Read a text file, optionally allowing for missing files."""
             path = ScrapeUtils.Persistence._resolve_path(path)
+            write_behind = ScrapeUtils.Persistence.write_behind
+            is_pending_deletion = False
+            if write_behind is not None:
+                pending_content = write_behind.get_pending_content(path)
+                if pending_content is not None: # Not written yet
+                    return pending_content
+                is_pending_deletion = write_behind.is_pending_deletion(path)
             try:
+                if is_pending_deletion: # Not deleted yet
+                    raise FileNotFoundError(f"Queued for deletion: {path}")
                 with open(path, 'r', encoding='utf-8') as file:
                     return file.read()
             except FileNotFoundError:
@@ -123,8 +383,20 @@ class ScrapeUtils:
         def write_textfile(path: Union[Path, str], content: str) -> None:
             """Write content to a text file."""
             path = ScrapeUtils.Persistence._resolve_path(path)
+            write_behind = ScrapeUtils.Persistence.write_behind
+            if write_behind is not None:
+                if not content:
+                    print(f"Warning: Empty file created at {path}")
+                write_behind.write_textfile(path, content)
+                return
+            manifest = ScrapeUtils.Persistence.output_manifest
+            if manifest is not None:
+                content_hash = manifest.hash_content(content)
+                if manifest.is_unchanged(path, content_hash):
+                    manifest.record(path, content_hash, changed=False)
+                    return
             try:
-                with open(path, 'w', encoding='utf-8') as file:
+                with ScrapeUtils.Persistence._open_for_writing(path) as file:
                     if content:
                         file.write(content)
                     else:
@@ -135,6 +407,126 @@ class ScrapeUtils:
             except IOError as e:
                 print(f"Error: IO error occurred while writing to {path}: {e}")
                 raise
+            if manifest is not None:
+                manifest.record(path, content_hash, changed=True)
+
+        @staticmethod
+        @contextmanager
+        def open_textfile_atomic(path: Union[Path, str]) -> Iterator[TextIO]:
+            """Stream content to a temporary file that replaces path only once the block completes."""
+            path = ScrapeUtils.Persistence._resolve_path(path)
+            temp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            manifest = ScrapeUtils.Persistence.output_manifest
+            try:
+                with ScrapeUtils.Persistence._open_for_writing(temp_path) as file:
+                    yield file
+                if manifest is not None:
+                    content_hash = manifest.hash_file(temp_path)
+                    if manifest.is_unchanged(path, content_hash):
+                        temp_path.unlink()
+                        manifest.record(path, content_hash, changed=False)
+                        return
+                os.replace(temp_path, path)
+                if manifest is not None:
+                    manifest.record(path, content_hash, changed=True)
+            except PermissionError:
+                print(f"Error: Permission denied when writing to {path}")
+                temp_path.unlink(missing_ok=True)
+                raise
+            except BaseException:
+                temp_path.unlink(missing_ok=True)
+                raise
+
+        @staticmethod
+        def use_output_manifest(manifest_path: Optional[Union[Path, str]] = None) -> 'ScrapeUtils.OutputManifest':
+            """Skip writing files whose content is unchanged, tracked by content hash in manifest_path."""
+            if manifest_path is None:
+                manifest_path = ScrapeUtils.OutputManifest.DEFAULT_FILENAME
+            manifest = ScrapeUtils.OutputManifest(manifest_path)
+            ScrapeUtils.Persistence.output_manifest = manifest
+            return manifest
+
+        @staticmethod
+        def use_write_behind(max_queued: int = 256) -> 'ScrapeUtils.WriteBehindQueue':
+            """Queue write_textfile calls for a background thread. Call flush() at stage boundaries."""
+            ScrapeUtils.Persistence.stop_write_behind()
+            write_behind = ScrapeUtils.WriteBehindQueue(max_queued)
+            ScrapeUtils.Persistence.write_behind = write_behind
+            return write_behind
+
+        @staticmethod
+        def flush() -> None:
+            """Wait for every queued write. Raises the first error of a queued write since the last flush."""
+            if ScrapeUtils.Persistence.write_behind is not None:
+                ScrapeUtils.Persistence.write_behind.flush()
+
+        @staticmethod
+        def stop_write_behind() -> None:
+            """Flush and go back to writing on the calling thread."""
+            write_behind = ScrapeUtils.Persistence.write_behind
+            if write_behind is not None:
+                ScrapeUtils.Persistence.write_behind = None
+                write_behind.close()
+
+        @staticmethod
+        def set_modified_time(path: Union[Path, str], timestamp: float) -> None:
+            """Set the mtime of an existing file, after any queued write of it."""
+            path = ScrapeUtils.Persistence._resolve_path(path)
+            write_behind = ScrapeUtils.Persistence.write_behind
+            if write_behind is not None and write_behind.get_pending_content(path) is not None:
+                write_behind.set_modified_time(path, timestamp)
+            elif path.exists():
+                os.utime(path, (timestamp, timestamp))
+
+        @staticmethod
+        def delete_file(path: Union[Path, str]) -> None:
+            """Delete a file if it exists, after any queued write of it."""
+            path = ScrapeUtils.Persistence._resolve_path(path)
+            write_behind = ScrapeUtils.Persistence.write_behind
+            if write_behind is not None:
+                write_behind.delete_file(path)
+                return
+            path.unlink(missing_ok=True)
+
+        @staticmethod
+        def has_content(path: Union[Path, str]) -> bool:
+            """Check if a text file is not empty, counting writes that are still queued."""
+            path = ScrapeUtils.Persistence._resolve_path(path)
+            write_behind = ScrapeUtils.Persistence.write_behind
+            if write_behind is not None:
+                pending_content = write_behind.get_pending_content(path)
+                if pending_content is not None:
+                    return len(pending_content) > 0
+                if write_behind.is_pending_deletion(path):
+                    return False
+            return path.is_file() and path.stat().st_size > 0
+
+        @staticmethod
+        def get_modified_time(path: Union[Path, str]) -> Optional[float]:
+            """The mtime of a file, or the one it gets from queued writes. None if it does not exist."""
+            path = ScrapeUtils.Persistence._resolve_path(path)
+            write_behind = ScrapeUtils.Persistence.write_behind
+            if write_behind is not None:
+                pending_modified_time = write_behind.get_pending_modified_time(path)
+                if pending_modified_time is not None:
+                    return pending_modified_time
+                if write_behind.get_pending_content(path) is not None:
+                    return time.time() # Gets about this mtime when the queued write is done
+                if write_behind.is_pending_deletion(path):
+                    return None
+            try:
+                return path.stat().st_mtime
+            except FileNotFoundError:
+                return None
+
+        @staticmethod
+        def _open_for_writing(path: Path) -> TextIO:
+            """Open path for writing, creating its folder again if it was removed after it was cached."""
+            try:
+                return open(path, 'w', encoding='utf-8')
+            except FileNotFoundError:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                return open(path, 'w', encoding='utf-8')
 
         @staticmethod
         def _resolve_path(path: Union[Path, str]) -> Path:
@@ -144,10 +536,387 @@ class ScrapeUtils:
             if not path.is_absolute():
                 path = ScrapeUtils.Persistence._workspace_path / path
             directory = path.parent
-            if not directory.exists():
-                directory.mkdir(parents=True, exist_ok=True)
-            resolved_path = path.resolve()
-            return resolved_path
+            resolved_directory = ScrapeUtils.Persistence._resolved_directories.get(directory)
+            if resolved_directory is None:
+                if not directory.exists():
+                    directory.mkdir(parents=True, exist_ok=True)
+                resolved_directory = ScrapeUtils.Persistence._resolved_directories[directory] = directory.resolve()
+            return resolved_directory / path.name
+
+    class WriteBehindQueue:
+        """Bounded queue of writes, done in order by one background thread. Errors are raised by the next flush."""
+
+        def __init__(self, max_queued: int = 256) -> None:
+            self._queue: queue.Queue = queue.Queue(max_queued) # Blocks writers while full
+            self._lock = threading.Lock()
+            self._pending_contents: Dict[Path, str] = {}
+            self._pending_modified_times: Dict[Path, float] = {}
+            self._pending_deletions: Dict[Path, object] = {} # Path -> token of its last queued deletion
+            self._errors: List[BaseException] = []
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+
+        def write_textfile(self, path: Path, content: str) -> None:
+            """Queue an atomic write of content to the resolved path."""
+            with self._lock:
+                self._pending_contents[path] = content
+                self._pending_deletions.pop(path, None)
+            self._queue.put(lambda: self._write_textfile(path, content))
+
+        def submit(self, job: Callable[[], None]) -> None:
+            """Queue any other file operation, done after the writes queued before it."""
+            self._queue.put(job)
+
+        def set_modified_time(self, path: Path, timestamp: float) -> None:
+            """Queue setting the mtime of the resolved path, after the writes queued before it."""
+            with self._lock:
+                self._pending_modified_times[path] = timestamp
+            self._queue.put(lambda: self._set_modified_time(path, timestamp))
+
+        def delete_file(self, path: Path) -> None:
+            """Queue deleting the resolved path (if it exists), after the writes queued before it."""
+            token = object()
+            with self._lock:
+                self._pending_contents.pop(path, None)
+                self._pending_modified_times.pop(path, None)
+                self._pending_deletions[path] = token
+            self._queue.put(lambda: self._delete_file(path, token))
+
+        def is_pending_deletion(self, path: Path) -> bool:
+            with self._lock:
+                return path in self._pending_deletions
+
+        def get_pending_content(self, path: Path) -> Optional[str]:
+            with self._lock:
+                return self._pending_contents.get(path)
+
+        def get_pending_modified_time(self, path: Path) -> Optional[float]:
+            with self._lock:
+                return self._pending_modified_times.get(path)
+
+        def flush(self) -> None:
+            self._queue.join()
+            with self._lock:
+                errors, self._errors = self._errors, []
+            if errors:
+                print(f"Error: {len(errors)} queued writes failed, the first with: {errors[0]}")
+                raise errors[0]
+
+        def close(self) -> None:
+            try:
+                self.flush()
+            finally:
+                self._queue.put(None)
+                self._thread.join()
+
+        def _run(self) -> None:
+            while True:
+                job = self._queue.get()
+                try:
+                    if job is None:
+                        return
+                    job()
+                except Exception as e:
+                    with self._lock:
+                        self._errors.append(e)
+                finally:
+                    self._queue.task_done()
+
+        def _write_textfile(self, path: Path, content: str) -> None:
+            try:
+                with ScrapeUtils.Persistence.open_textfile_atomic(path) as file:
+                    file.write(content)
+            finally:
+                with self._lock:
+                    if self._pending_contents.get(path) is content: # Unless written again in the meantime
+                        del self._pending_contents[path]
+
+        def _delete_file(self, path: Path, token: object) -> None:
+            try:
+                path.unlink(missing_ok=True)
+            finally:
+                with self._lock:
+                    if self._pending_deletions.get(path) is token: # Unless written or deleted again in the meantime
+                        del self._pending_deletions[path]
+
+        def _set_modified_time(self, path: Path, timestamp: float) -> None:
+            try:
+                os.utime(path, (timestamp, timestamp))
+            finally:
+                with self._lock:
+                    if self._pending_modified_times.get(path) == timestamp:
+                        del self._pending_modified_times[path]
+
+    class OutputManifest:
+        """Content hashes of the files written through Persistence, and which of them changed during this run."""
+
+        DEFAULT_FILENAME = "output_manifest.json"
+
+        def __init__(self, manifest_path: Union[Path, str]) -> None:
+            """Load the hashes saved by an earlier run, if any."""
+            self.manifest_path = ScrapeUtils.Persistence._resolve_path(manifest_path)
+            self.changed_paths: List[str] = []
+            self.unchanged_paths: List[str] = []
+            self._lock = threading.Lock()
+            self._entries: Dict[str, Dict[str, Any]] = {}
+            manifest_str = ScrapeUtils.Persistence.read_textfile(self.manifest_path, missing_ok=True)
+            if manifest_str:
+                try:
+                    self._entries = json.loads(manifest_str)["files"]
+                except (ValueError, KeyError, TypeError):
+                    print(f"Warning: Ignoring unreadable output manifest {self.manifest_path}")
+
+        @staticmethod
+        def hash_content(content: str) -> str:
+            """Hash of the bytes of content written in text mode, which turns each newline into os.linesep."""
+            if os.linesep != '\n':
+                content = content.replace('\n', os.linesep)
+            return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+        @staticmethod
+        def hash_file(path: Path) -> str:
+            """Hash of the bytes in path, the same as hash_content of the text it was written from."""
+            return hashlib.sha256(path.read_bytes()).hexdigest()
+
+        def is_unchanged(self, path: Path, content_hash: str) -> bool:
+            """Check if path holds the content of content_hash. The file is only read if it changed since it was recorded."""
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                return False
+            with self._lock:
+                entry = self._entries.get(self._get_key(path))
+            if entry is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                return entry["sha256"] == content_hash
+            try:
+                return self.hash_file(path) == content_hash
+            except OSError:
+                return False
+
+        def record(self, path: Path, content_hash: str, changed: bool) -> None:
+            """Remember the hash of path, which was just written (changed) or left as it is."""
+            stat = path.stat()
+            key = self._get_key(path)
+            with self._lock:
+                self._entries[key] = {"sha256": content_hash, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+                if changed:
+                    self.changed_paths.append(key)
+                else:
+                    self.unchanged_paths.append(key)
+
+        def get_changed_paths(self) -> List[str]:
+            """Files written with new content during this run, relative to the workspace where possible."""
+            with self._lock:
+                return sorted(set(self.changed_paths))
+
+        def save(self) -> None:
+            """Store the hashes for the next run, with the changed files of this run for downstream consumers."""
+            with self._lock:
+                manifest = {"changed": sorted(set(self.changed_paths)), "files": dict(sorted(self._entries.items()))}
+            # Written directly, the manifest does not track itself
+            temp_path = self.manifest_path.with_name(f".{self.manifest_path.name}.{os.getpid()}.tmp")
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(manifest, file, indent=1)
+            os.replace(temp_path, self.manifest_path)
+
+        def _get_key(self, path: Path) -> str:
+            try:
+                return path.relative_to(ScrapeUtils.Persistence._workspace_path.resolve()).as_posix()
+            except ValueError:
+                return path.as_posix()
+
+    @dataclass
+    class HttpResponse:
+        """Status, body and cache validators of an HTTP response (status 0 means no response)."""
+        status: int
+        html: str
+        etag: str = ""
+        last_modified: str = ""
+
+    @dataclass
+    class WebcacheMetadata:
+        """When a cached page was fetched, and the validators needed to revalidate it."""
+        fetched_at: float
+        etag: str = ""
+        last_modified: str = ""
+
+    class WebcacheBackend(ABC):
+        """Interface for the on-disk part of the webcache. Pages are stored trimmed."""
+
+        @abstractmethod
+        def read(self, url: str, path: Optional[Path] = None) -> str:
+            """Return the cached page for url, or an empty string if it is not cached."""
+
+        @abstractmethod
+        def write(self, url: str, html: str, path: Optional[Path] = None,
+                  metadata: Optional['ScrapeUtils.WebcacheMetadata'] = None) -> None:
+            """Store the page for url, fetched now unless metadata says otherwise."""
+
+        @abstractmethod
+        def contains(self, url: str, path: Optional[Path] = None) -> bool:
+            """Check if a non-empty page is stored for url."""
+
+        @abstractmethod
+        def read_metadata(self, url: str, path: Optional[Path] = None) -> Optional['ScrapeUtils.WebcacheMetadata']:
+            """Return the metadata of the page stored for url, or None if it is not cached."""
+
+        @abstractmethod
+        def write_metadata(self, url: str, metadata: 'ScrapeUtils.WebcacheMetadata', path: Optional[Path] = None) -> None:
+            """Update the metadata of an already stored page without rewriting the page."""
+
+    class FileWebcache(WebcacheBackend):
+        """Webcache backend with one text file per url: webcache/<domain>/<sanitized-url>.txt"""
+
+        # fetched_at is the mtime of the page file. Validators, if any, go in a small sidecar file.
+        _metadata_file_ext: str = ".meta"
+
+        def read(self, url: str, path: Optional[Path] = None) -> str:
+            if path is None:
+                path = ScrapeUtils.Html._get_path_for_cached_html(url)
+            return ScrapeUtils.Persistence.read_textfile(path, missing_ok=True)
+
+        def write(self, url: str, html: str, path: Optional[Path] = None,
+                  metadata: Optional['ScrapeUtils.WebcacheMetadata'] = None) -> None:
+            if path is None:
+                path = ScrapeUtils.Html._get_path_for_cached_html(url)
+            ScrapeUtils.Persistence.write_textfile(path, html)
+            if metadata is not None:
+                self.write_metadata(url, metadata, path)
+
+        def contains(self, url: str, path: Optional[Path] = None) -> bool:
+            if path is None:
+                path = ScrapeUtils.Html._get_path_for_cached_html(url)
+            return ScrapeUtils.Persistence.has_content(path)
+
+        def read_metadata(self, url: str, path: Optional[Path] = None) -> Optional['ScrapeUtils.WebcacheMetadata']:
+            if path is None:
+                path = ScrapeUtils.Html._get_path_for_cached_html(url)
+            modified_time = ScrapeUtils.Persistence.get_modified_time(path)
+            if modified_time is None:
+                return None
+            metadata = ScrapeUtils.WebcacheMetadata(modified_time)
+            validators_str = ScrapeUtils.Persistence.read_textfile(self._get_metadata_path(path), missing_ok=True)
+            if validators_str:
+                validators = json.loads(validators_str)
+                metadata.etag = validators.get("etag", "")
+                metadata.last_modified = validators.get("last_modified", "")
+            return metadata
+
+        def write_metadata(self, url: str, metadata: 'ScrapeUtils.WebcacheMetadata', path: Optional[Path] = None) -> None:
+            if path is None:
+                path = ScrapeUtils.Html._get_path_for_cached_html(url)
+            metadata_path = self._get_metadata_path(path)
+            if metadata.etag or metadata.last_modified:
+                validators = {"etag": metadata.etag, "last_modified": metadata.last_modified}
+                ScrapeUtils.Persistence.write_textfile(metadata_path, json.dumps(validators))
+            else: # Also drops validators whose write is still queued
+                ScrapeUtils.Persistence.delete_file(metadata_path)
+            ScrapeUtils.Persistence.set_modified_time(path, metadata.fetched_at)
+
+        def _get_metadata_path(self, path: Path) -> Path:
+            return path.with_name(f"{path.name}{self._metadata_file_ext}")
+
+    class SqliteWebcache(WebcacheBackend):
+        """
+        Webcache backend storing every page in one indexed sqlite file, keyed by the exact url.
+        Pages imported from the file-per-url webcache are keyed by their file path, as file names are not urls.
+        """
+
+        DEFAULT_FILENAME = "webcache.sqlite3"
+        _INSERT_ROW_SQL = "INSERT OR REPLACE INTO webcache (url, html, fetched_at, etag, last_modified, html_length) VALUES (?, ?, ?, ?, ?, ?)"
+        # Rows of the url itself go before the row imported under its file key
+        _SELECT_ROW_SQL = "SELECT {columns} FROM webcache WHERE url IN (?, ?) ORDER BY url = ? DESC LIMIT 1"
+
+        def __init__(self, db_path: Union[Path, str], compression_level: int = 6) -> None:
+            """Open (or create) the container file. The path argument of read/write is ignored."""
+            self.db_path = ScrapeUtils.Persistence._resolve_path(db_path)
+            self.compression_level = compression_level
+            self._lock = threading.Lock()
+            self._connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            with self._lock:
+                self._connection.execute("PRAGMA journal_mode=WAL")
+                self._connection.execute("PRAGMA synchronous=NORMAL")
+                self._connection.execute(
+                    "CREATE TABLE IF NOT EXISTS webcache (url TEXT PRIMARY KEY, html BLOB NOT NULL)")
+                columns = {row[1] for row in self._connection.execute("PRAGMA table_info(webcache)")}
+                for column, column_type in (("fetched_at", "REAL"), ("etag", "TEXT"), ("last_modified", "TEXT"),
+                                            ("html_length", "INTEGER")):
+                    if column not in columns: # Containers created before revalidation (or html_length) support lack these
+                        self._connection.execute(f"ALTER TABLE webcache ADD COLUMN {column} {column_type}")
+                self._connection.commit()
+
+        def read(self, url: str, path: Optional[Path] = None) -> str:
+            row = self._select_row("html", url)
+            if row is None:
+                return ""
+            return zlib.decompress(row[0]).decode('utf-8')
+
+        def write(self, url: str, html: str, path: Optional[Path] = None,
+                  metadata: Optional['ScrapeUtils.WebcacheMetadata'] = None) -> None:
+            if not html:
+                print(f"Warning: Empty page stored for {url}")
+            if metadata is None:
+                metadata = ScrapeUtils.WebcacheMetadata(time.time())
+            with self._lock:
+                self._connection.execute(ScrapeUtils.SqliteWebcache._INSERT_ROW_SQL, self._create_row(url, html, metadata))
+                self._connection.commit()
+
+        def contains(self, url: str, path: Optional[Path] = None) -> bool:
+            row = self._select_row("html_length", url)
+            if row is None:
+                return False
+            if row[0] is None: # Stored before html_length was added
+                return len(self.read(url)) > 0
+            return row[0] > 0
+
+        def read_metadata(self, url: str, path: Optional[Path] = None) -> Optional['ScrapeUtils.WebcacheMetadata']:
+            row = self._select_row("fetched_at, etag, last_modified", url)
+            if row is None:
+                return None
+            fetched_at, etag, last_modified = row
+            return ScrapeUtils.WebcacheMetadata(fetched_at or 0.0, etag or "", last_modified or "")
+
+        def write_metadata(self, url: str, metadata: 'ScrapeUtils.WebcacheMetadata', path: Optional[Path] = None) -> None:
+            with self._lock:
+                self._connection.execute(
+                    "UPDATE webcache SET fetched_at = ?, etag = ?, last_modified = ? WHERE url IN (?, ?)",
+                    (metadata.fetched_at, metadata.etag, metadata.last_modified, url, ScrapeUtils.SqliteWebcache._get_file_key(url)))
+                self._connection.commit()
+
+        def import_file_webcache(self, folder: Optional[Path] = None) -> int:
+            """Copy every non-empty page of the file-per-url webcache in folder. Returns the number of pages imported."""
+            if folder is None:
+                folder = ScrapeUtils.Html.html_webcache_folder
+            file_webcache = ScrapeUtils.FileWebcache()
+            rows = []
+            for path in sorted(folder.rglob(f"*{ScrapeUtils.Html._default_webcache_file_ext}")):
+                html = file_webcache.read("", path)
+                metadata = file_webcache.read_metadata("", path)
+                if html and metadata is not None:
+                    rows.append(self._create_row(path.relative_to(folder).as_posix(), html, metadata))
+            with self._lock:
+                self._connection.executemany(ScrapeUtils.SqliteWebcache._INSERT_ROW_SQL, rows)
+                self._connection.commit()
+            return len(rows)
+
+        def close(self) -> None:
+            with self._lock:
+                self._connection.close()
+
+        def _select_row(self, columns: str, url: str) -> Optional[tuple]:
+            sql = ScrapeUtils.SqliteWebcache._SELECT_ROW_SQL.format(columns=columns)
+            with self._lock:
+                return self._connection.execute(sql, (url, ScrapeUtils.SqliteWebcache._get_file_key(url), url)).fetchone()
+
+        @staticmethod
+        def _get_file_key(url: str) -> str:
+            """The key of a page imported from the file-per-url webcache: its file path, relative to the webcache folder"""
+            path = ScrapeUtils.Html._get_path_for_cached_html(url)
+            return path.relative_to(ScrapeUtils.Html.html_webcache_folder).as_posix()
+
+        def _create_row(self, url: str, html: str, metadata: 'ScrapeUtils.WebcacheMetadata') -> tuple:
+            compressed = zlib.compress(html.encode('utf-8'), self.compression_level)
+            return (url, compressed, metadata.fetched_at, metadata.etag, metadata.last_modified, len(html))
 
     class Html:
         """HTML handling and caching utility for scraping purposes."""
@@ -155,19 +924,43 @@ class ScrapeUtils:
         html_webcache_folder: Path = Path.cwd() / "webcache"
         feature_flag_read_webcache: bool = True
         feature_flag_write_webcache: bool = True
+        # Never send a request: pages that are missing from the caches or expired are returned as empty
+        feature_flag_cache_only: bool = False
 
         # Default values:
         _default_webcache_file_ext: str = ".txt"
 
+        # Disk cache backend (file-per-url unless another backend is set)
+        webcache_backend: Optional['ScrapeUtils.WebcacheBackend'] = None
+
+        # Apply the url's trimming ruleset while downloading, instead of after the whole page is read
+        feature_flag_stream_trimming: bool = True
+        _stream_chunk_size: int = 16 * 1024
+
+        # Concurrency settings used by fetch_urls
+        concurrent_workers: int = 8
+        max_connections_per_host: int = 4
+
+        # Time-to-live in seconds per url pattern. Disk cache entries of urls matching no pattern never expire.
+        _ttl_policies: Dict[str, float] = {}
+
         # In-memory cache
         _webcache: Dict[str, str] = {}
+        _webcache_lock = threading.Lock()
+
+        # One semaphore per host, limiting simultaneous connections to that host
+        _host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        _host_semaphores_lock = threading.Lock()
 
         @staticmethod
         def fetch_urls(urls: List[str],
                     paths: Optional[Dict[str,Path]] = None,
-                    timeout: Union[int,float] = 10) -> Dict[str, str]:
-            """Call fetch_url for multiple urls"""
-            html_dct: Dict[str, str] = {}
+                    timeout: Union[int,float] = 10,
+                    workers: Optional[int] = None) -> Dict[str, str]:
+            """Call fetch_url for multiple urls, concurrently if more than one worker is allowed"""
+            if workers is None:
+                workers = ScrapeUtils.Html.concurrent_workers
+            url_paths: Dict[str, Optional[Path]] = {}
             for url in urls:
                 path = None
                 if paths is not None:
@@ -175,66 +968,220 @@ class ScrapeUtils:
                         path = paths[url]
                     else:
                         print(f"Warning: Path for url {url} not found in paths dictionary")
-                html = ScrapeUtils.Html.fetch_url(url, path, timeout)
-                html_dct[url] = html
+                url_paths[url] = path
+            html_dct: Dict[str, str] = {}
+            if workers <= 1 or len(url_paths) <= 1:
+                for url, path in url_paths.items():
+                    html_dct[url] = ScrapeUtils.Html.fetch_url(url, path, timeout)
+                return html_dct
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {url: executor.submit(ScrapeUtils.Html.fetch_url, url, path, timeout)
+                           for url, path in url_paths.items()}
+                for url, future in futures.items():
+                    html_dct[url] = future.result()
             return html_dct
 
         @staticmethod
         def fetch_url(url: str, path: Optional[Path] = None, timeout: Union[int,float] = 10) -> str:
-            """Scrape HTML content from a given URL. Uses cached content if available."""
-            cached_html = ScrapeUtils.Html.try_get_cached_html(url, path)
+            """Scrape HTML content from a given URL. Uses cached content if available and not expired."""
+            with ScrapeUtils.Html._webcache_lock:
+                if ScrapeUtils.Html._webcache.get(url, ""):
+                    ScrapeUtils.Metrics.increment("html.memory_hits")
+                    return ScrapeUtils.Html._webcache[url]
+            cached_html = ScrapeUtils.Html._search_url_in_local_webcache(url, path=path)
+            if ScrapeUtils.Html.feature_flag_cache_only and (not cached_html or ScrapeUtils.Html.is_expired(url, path)):
+                ScrapeUtils.Metrics.increment("html.cache_only_misses")
+                return ""
+            if cached_html and ScrapeUtils.Html.is_expired(url, path):
+                ScrapeUtils.Metrics.increment("html.revalidations")
+                return ScrapeUtils.Html._revalidate(url, cached_html, path, timeout)
             if cached_html:
+                ScrapeUtils.Metrics.increment("html.disk_hits")
+                with ScrapeUtils.Html._webcache_lock:
+                    ScrapeUtils.Html._webcache[url] = cached_html
                 return cached_html
-            html = ScrapeUtils.Html._send_request(url, timeout=timeout)
-            ScrapeUtils.Html.cache_html_for_later(url, html, path)
-            return html
+            ScrapeUtils.Metrics.increment("html.network_fetches")
+            response = ScrapeUtils.Html._send_request(url, timeout=timeout)
+            ScrapeUtils.Html.cache_html_for_later(url, response.html, path, ScrapeUtils.Html._create_metadata(response))
+            return response.html
 
         @staticmethod
-        def cache_html_for_later(url: str, html: str, path: Optional[Path] = None) -> None:
+        def cache_html_for_later(url: str, html: str, path: Optional[Path] = None,
+                                 metadata: Optional['ScrapeUtils.WebcacheMetadata'] = None) -> None:
             """Cache HTML content in memory and optionally on disk."""
             trimmed_html = ScrapeUtils.Trimmer.trim_html(url, html)
-            ScrapeUtils.Html._webcache[url] = trimmed_html
+            with ScrapeUtils.Html._webcache_lock:
+                ScrapeUtils.Html._webcache[url] = trimmed_html
             if ScrapeUtils.Html.feature_flag_write_webcache:
-                ScrapeUtils.Html._write_html_to_disk(url, trimmed_html, path=path)
+                ScrapeUtils.Html._write_html_to_disk(url, trimmed_html, path=path, metadata=metadata)
+
+        @staticmethod
+        def register_ttl_policy(url_pattern: str, ttl_seconds: float) -> None:
+            """Let disk cache entries of urls containing url_pattern expire after ttl_seconds"""
+            ScrapeUtils.Html._ttl_policies[url_pattern] = ttl_seconds
+
+        @staticmethod
+        def get_ttl(url: str) -> Optional[float]:
+            """Return the ttl of the longest url pattern found in url, or None if the url never expires"""
+            matching_patterns = [pattern for pattern in ScrapeUtils.Html._ttl_policies if pattern in url]
+            if not matching_patterns:
+                return None
+            return ScrapeUtils.Html._ttl_policies[max(matching_patterns, key=len)]
+
+        @staticmethod
+        def is_expired(url: str, path: Optional[Path] = None) -> bool:
+            """Check if the disk cache entry of url is older than the ttl of its url pattern"""
+            ttl = ScrapeUtils.Html.get_ttl(url)
+            if ttl is None:
+                return False
+            metadata = ScrapeUtils.Html.get_webcache_backend().read_metadata(url, path)
+            if metadata is None:
+                return True
+            return time.time() - metadata.fetched_at > ttl
 
         @staticmethod
         def try_get_cached_html(url: str, path: Optional[Path] = None) -> str:
-            """Attempt to retrieve cached HTML from in-memory cache or disk cache."""
-            if url in ScrapeUtils.Html._webcache:
-                return ScrapeUtils.Html._webcache[url]
+            """Attempt to retrieve cached HTML from in-memory cache or disk cache. Expired disk entries count as missing."""
+            with ScrapeUtils.Html._webcache_lock:
+                if url in ScrapeUtils.Html._webcache:
+                    return ScrapeUtils.Html._webcache[url]
             cached_html = ScrapeUtils.Html._search_url_in_local_webcache(url, path=path)
-            if cached_html:
-                ScrapeUtils.Html._webcache[url] = cached_html
+            if cached_html and not ScrapeUtils.Html.is_expired(url, path):
+                with ScrapeUtils.Html._webcache_lock:
+                    ScrapeUtils.Html._webcache[url] = cached_html
                 return cached_html
             return ""
 
+        @staticmethod
+        def is_cached(url: str, path: Optional[Path] = None) -> bool:
+            """Check if a url can be served from the in-memory or disk cache without a network request."""
+            with ScrapeUtils.Html._webcache_lock:
+                if ScrapeUtils.Html._webcache.get(url, ""):
+                    return True
+            if not ScrapeUtils.Html.feature_flag_read_webcache:
+                return False
+            backend = ScrapeUtils.Html.get_webcache_backend()
+            return backend.contains(url, path) and not ScrapeUtils.Html.is_expired(url, path)
+
+        @staticmethod
+        def get_webcache_backend() -> 'ScrapeUtils.WebcacheBackend':
+            if ScrapeUtils.Html.webcache_backend is None:
+                ScrapeUtils.Html.webcache_backend = ScrapeUtils.FileWebcache()
+            return ScrapeUtils.Html.webcache_backend
+
+        @staticmethod
+        def use_sqlite_webcache(db_path: Optional[Path] = None) -> 'ScrapeUtils.SqliteWebcache':
+            """Switch the disk cache to a single sqlite file (default: inside html_webcache_folder)"""
+            if db_path is None:
+                db_path = ScrapeUtils.Html.html_webcache_folder / ScrapeUtils.SqliteWebcache.DEFAULT_FILENAME
+            backend = ScrapeUtils.SqliteWebcache(db_path)
+            ScrapeUtils.Html.webcache_backend = backend
+            return backend
+
         @staticmethod
         def _search_url_in_local_webcache(url: str, path: Optional[Path] = None) -> str:
             """Search for cached HTML content on disk for a given URL."""
             if ScrapeUtils.Html.feature_flag_read_webcache:
-                if path is None:
-                    path = ScrapeUtils.Html._get_path_for_cached_html(url)
-                html = ScrapeUtils.Persistence.read_textfile(path, missing_ok=True)
+                html = ScrapeUtils.Html.get_webcache_backend().read(url, path)
                 if html is not None:
                     return html
             return ""
 
         @staticmethod
-        def _send_request(url: str, timeout: Union[int,float] = 10) -> str:
-            """Send an HTTP GET request to the specified URL and return the response text."""
+        def _revalidate(url: str, cached_html: str, path: Optional[Path], timeout: Union[int,float]) -> str:
+            """Send a conditional request for an expired cache entry. On 304 the cached page is kept as is."""
+            backend = ScrapeUtils.Html.get_webcache_backend()
+            metadata = backend.read_metadata(url, path)
+            headers: Dict[str, str] = {}
+            if metadata is not None and metadata.etag:
+                headers['If-None-Match'] = metadata.etag
+            if metadata is not None and metadata.last_modified:
+                headers['If-Modified-Since'] = metadata.last_modified
+            response = ScrapeUtils.Html._send_request(url, timeout=timeout, headers=headers)
+            if response.status == 304 or not response.html:
+                if response.status == 304 and ScrapeUtils.Html.feature_flag_write_webcache:
+                    refreshed_metadata = ScrapeUtils.Html._create_metadata(response)
+                    refreshed_metadata.etag = refreshed_metadata.etag or headers.get('If-None-Match', "")
+                    refreshed_metadata.last_modified = refreshed_metadata.last_modified or headers.get('If-Modified-Since', "")
+                    backend.write_metadata(url, refreshed_metadata, path)
+                elif response.status != 304:
+                    print(f"Warning: Revalidation of {url} failed. Using the expired cache entry.")
+                with ScrapeUtils.Html._webcache_lock:
+                    ScrapeUtils.Html._webcache[url] = cached_html
+                return cached_html
+            ScrapeUtils.Html.cache_html_for_later(url, response.html, path, ScrapeUtils.Html._create_metadata(response))
+            return response.html
+
+        @staticmethod
+        def _create_metadata(response: 'ScrapeUtils.HttpResponse') -> 'ScrapeUtils.WebcacheMetadata':
+            return ScrapeUtils.WebcacheMetadata(time.time(), response.etag, response.last_modified)
+
+        @staticmethod
+        def _send_request(url: str, timeout: Union[int,float] = 10,
+                          headers: Optional[Dict[str, str]] = None,
+                          stream: Optional[bool] = None) -> 'ScrapeUtils.HttpResponse':
+            """Send an HTTP GET request to the specified URL and return the response (trimmed when streamed)."""
+            if stream is None:
+                stream = ScrapeUtils.Html.feature_flag_stream_trimming
+            trimmer = ScrapeUtils.Trimmer.find_trimmer(url) if stream else None
+            request = Request(url, headers=headers or {})
+            host = urlparse(url).hostname or ""
             try:
-                with urlopen(url, timeout=timeout) as response:
-                    return response.read().decode('utf-8')
-            except (URLError, HTTPError) as e:
+                with ScrapeUtils.Html._get_host_semaphore(url), ScrapeUtils.Metrics.timer(f"html.latency.{host}"):
+                    with urlopen(request, timeout=timeout) as response:
+                        if trimmer is None:
+                            body = response.read()
+                            ScrapeUtils.Metrics.increment("html.bytes_fetched", len(body))
+                            html = body.decode('utf-8')
+                            return ScrapeUtils.Html._create_response(response.status, html, response.headers)
+                        # Returning before the body is fully read closes the connection
+                        optional_html = trimmer.trim_stream(ScrapeUtils.Html._read_text_chunks(response))
+                        if optional_html is not None:
+                            return ScrapeUtils.Html._create_response(response.status, optional_html, response.headers)
+            except HTTPError as e:
+                if e.code == 304:
+                    return ScrapeUtils.Html._create_response(e.code, "", e.headers)
                 print(f"Error: A url or http error occurred: {e}")
-                return ""
+                return ScrapeUtils.HttpResponse(e.code, "")
+            except URLError as e:
+                print(f"Error: A url or http error occurred: {e}")
+                return ScrapeUtils.HttpResponse(0, "")
+            print(f"Info: Trimming start marker not found in {url}. Refetching without streaming.")
+            return ScrapeUtils.Html._send_request(url, timeout, headers, stream=False)
+
+        @staticmethod
+        def _read_text_chunks(response: Any) -> Iterator[str]:
+            """Read and decode a response body one chunk at a time."""
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            while True:
+                chunk = response.read(ScrapeUtils.Html._stream_chunk_size)
+                if not chunk:
+                    break
+                ScrapeUtils.Metrics.increment("html.bytes_fetched", len(chunk))
+                yield decoder.decode(chunk)
+            yield decoder.decode(b'', final=True)
+
+        @staticmethod
+        def _create_response(status: int, html: str, headers: Any) -> 'ScrapeUtils.HttpResponse':
+            etag = headers.get('ETag', "") if headers is not None else ""
+            last_modified = headers.get('Last-Modified', "") if headers is not None else ""
+            return ScrapeUtils.HttpResponse(status, html, etag, last_modified)
 
         @staticmethod
-        def _write_html_to_disk(url: str, html: str, path: Optional[Path] = None) -> None:
+        def _get_host_semaphore(url: str) -> threading.BoundedSemaphore:
+            """Get (or create) the semaphore that limits concurrent connections to the url's host."""
+            host = urlparse(url).netloc
+            with ScrapeUtils.Html._host_semaphores_lock:
+                if host not in ScrapeUtils.Html._host_semaphores:
+                    limit = max(1, ScrapeUtils.Html.max_connections_per_host)
+                    ScrapeUtils.Html._host_semaphores[host] = threading.BoundedSemaphore(limit)
+                return ScrapeUtils.Html._host_semaphores[host]
+
+        @staticmethod
+        def _write_html_to_disk(url: str, html: str, path: Optional[Path] = None,
+                                metadata: Optional['ScrapeUtils.WebcacheMetadata'] = None) -> None:
             """Write HTML content to disk cache."""
-            if path is None:
-                path = ScrapeUtils.Html._get_path_for_cached_html(url)
-            ScrapeUtils.Persistence.write_textfile(path, html)
+            ScrapeUtils.Html.get_webcache_backend().write(url, html, path, metadata)
 
         @staticmethod
         def _get_path_for_cached_html(url: str) -> Path:
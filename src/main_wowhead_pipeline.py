@@ -1,8 +1,13 @@
-from typing import List, Callable
+from pathlib import Path
+from typing import Dict, List, Callable
 
 from src.output_validation import OutputValidation
+from src.pipeline_stage_graph import PipelineStageGraph
 from src.wow_content_group import WowContentGroup
 from src.wow_content_group_factory import WowContentGroupFactory
+from src.wow_crawl_planner import WowCrawlPlanner
+from src.wow_item_table import WowItemTable
+from scrape_utils import ScrapeUtils
 
 class MainWowheadPipeline:
 
@@ -11,36 +16,218 @@ class MainWowheadPipeline:
         WowContentGroupFactory.create_tww_s1_mplus,
     ]
     validation_passed: List[bool] = []
+    plan_only: bool = False
+    # Load each content group from its snapshot (if usable) and skip straight to export and analysis
+    warm_start: bool = False
+    use_sqlite_webcache: bool = False
+    # Also write a csv per spec next to the class csvs
+    export_per_spec_csvs: bool = False
+    # Leave files with unchanged content untouched, and list the changed ones in the output manifest
+    skip_unchanged_outputs: bool = False
+    # Write webcache pages, csvs and sim json on a background thread, flushed at the end of each stage
+    write_behind: bool = False
+    # Trials per spec and loot category of the Monte Carlo sim (0 skips it), and the seed that makes it reproducible
+    monte_carlo_trials: int = 0
+    monte_carlo_seed: int = 0
+    # Stages of the stage graph run at the same time (see main.py --jobs), and dry_run only prints the graph
+    jobs: int = 1
+    dry_run: bool = False
+    # Url pattern -> seconds before a cached page is revalidated, e.g. {"wowhead.com/item=": 7 * 24 * 3600}
+    webcache_ttl_policies: Dict[str, float] = {}
+    # Counters, timings and stage times of the last run, to compare runs
+    metrics_report_path: Path = Path.cwd() / OutputValidation.BASE_OUTPUT_FOLDER / "metrics.json"
 
     @staticmethod
     def main() -> None:
-        content_groups: List['WowContentGroup'] = []
-        for factory in MainWowheadPipeline.factories:
-            print("Starting code execution...")
-            content_group: WowContentGroup = factory()
-            content_group.cascade_scrape_zones_and_its_items()
+        print("Starting code execution...")
+        ScrapeUtils.Metrics.reset()
+        if MainWowheadPipeline.use_sqlite_webcache:
+            ScrapeUtils.Html.use_sqlite_webcache()
+        if MainWowheadPipeline.skip_unchanged_outputs:
+            ScrapeUtils.Persistence.use_output_manifest()
+        if MainWowheadPipeline.write_behind:
+            ScrapeUtils.Persistence.use_write_behind()
+        for url_pattern, ttl_seconds in MainWowheadPipeline.webcache_ttl_policies.items():
+            ScrapeUtils.Html.register_ttl_policy(url_pattern, ttl_seconds)
+        stages_started = False
+        try:
+            if MainWowheadPipeline.plan_only:
+                MainWowheadPipeline.plan_crawl()
+                return
+            content_groups: List['WowContentGroup'] = [factory() for factory in MainWowheadPipeline.factories]
 
-            print("Calculating drop chances for each item")
-            content_group.calculate_drop_chance_for_all_wow_items()
+            warm_groups: List['WowContentGroup'] = []
+            if MainWowheadPipeline.warm_start:
+                warm_groups = [group for group in content_groups if group.load_snapshot()]
+            cold_groups = [group for group in content_groups if group not in warm_groups]
 
-            print("Simming world tour...")
-            content_group.sim_world_tour()
-            content_group.create_gearslot_statistics()
+            planner = WowCrawlPlanner(cold_groups)
+            graph = MainWowheadPipeline.create_stage_graph(content_groups, warm_groups, planner)
+            if MainWowheadPipeline.dry_run:
+                graph.print_graph()
+                return
+            stages_started = True
+            results = graph.run(MainWowheadPipeline.jobs)
+            output_folders = [group.output_folder for group in content_groups]
+            output_folders.append(WowContentGroup._convert_group_name_to_folder(WowContentGroup.COMBINED_NAME))
+            MainWowheadPipeline.validation_passed.extend(results[f"{output_folder}.validate"] for output_folder in output_folders)
 
-            print("Generating csv files...")
-            content_group.export_items_to_csv_for_all_specs_and_classes()
+            print(f"Validation passed summary: {MainWowheadPipeline.validation_passed}")
+        finally:
+            MainWowheadPipeline.finish_run(write_reports=stages_started)
 
-            print("Validating that each boss has items...")
-            content_group.validate_that_each_boss_has_loot()
+    @staticmethod
+    def finish_run(write_reports: bool) -> None:
+        """Write the files still queued, also after a failed stage, then the output manifest and the metrics report"""
+        try:
+            ScrapeUtils.Persistence.stop_write_behind()
+        finally:
+            if write_reports:
+                MainWowheadPipeline.save_output_manifest()
+                ScrapeUtils.Metrics.write_report(MainWowheadPipeline.metrics_report_path)
+                ScrapeUtils.Metrics.print_summary()
+
+    @staticmethod
+    def plan_crawl() -> None:
+        """Print every url of a run and which ones need the network. Zone lists are read from the cache too"""
+        print("Planning crawl without fetching anything...")
+        ScrapeUtils.Html.feature_flag_cache_only = True
+        try:
+            planner = WowCrawlPlanner([factory() for factory in MainWowheadPipeline.factories])
+            planner.plan(fetch_missing=False)
+            planner.print_report()
+        finally:
+            ScrapeUtils.Html.feature_flag_cache_only = False
+
+    @staticmethod
+    def create_stage_graph(content_groups: List[WowContentGroup], warm_groups: List[WowContentGroup],
+                           planner: WowCrawlPlanner) -> PipelineStageGraph:
+        """
+        The stages of a run. Stages of different groups only meet at the combined csv, so with several jobs
+        one group can sim while another scrapes, and group exports overlap the combined csv preparation.
+        """
+        graph = PipelineStageGraph()
+        cold_groups = [group for group in content_groups if group not in warm_groups]
+        if cold_groups:
+            graph.add_stage("prefetch", lambda: MainWowheadPipeline._prefetch(planner), outputs=["webcache"])
+        for content_group in content_groups:
+            MainWowheadPipeline._add_content_group_stages(graph, content_group, content_group in warm_groups)
+        combined_folder = WowContentGroup._convert_group_name_to_folder(WowContentGroup.COMBINED_NAME)
+        combined_item_tables: List[WowItemTable] = [] # Handed from the prepare stage to the export stage
+        graph.add_stage(f"{combined_folder}.prepare",
+                        lambda: combined_item_tables.append(WowContentGroup.create_combined_item_table(content_groups)),
+                        inputs=[f"{group.output_folder}.gearslot_statistics" for group in content_groups],
+                        outputs=[f"{combined_folder}.item_table"])
+        graph.add_stage(f"{combined_folder}.export", lambda: MainWowheadPipeline._export_combined(combined_item_tables[0]),
+                        inputs=[f"{combined_folder}.item_table"], outputs=[f"{combined_folder}.csv"])
+        graph.add_stage(f"{combined_folder}.validate", lambda: OutputValidation.validate(combined_folder),
+                        inputs=[f"{combined_folder}.csv"])
+        return graph
+
+    @staticmethod
+    def _add_content_group_stages(graph: PipelineStageGraph, content_group: WowContentGroup, is_warm: bool) -> None:
+        folder = content_group.output_folder
+        if is_warm:
+            graph.add_stage(f"{folder}.load_snapshot", lambda: MainWowheadPipeline._write_snapshot_sim(content_group),
+                            outputs=[f"{folder}.items", f"{folder}.drop_chances", f"{folder}.world_tour_sim"])
+        else:
+            graph.add_stage(f"{folder}.scrape", lambda: MainWowheadPipeline._scrape(content_group),
+                            inputs=["webcache"], outputs=[f"{folder}.items"])
+            graph.add_stage(f"{folder}.drop_chances", lambda: MainWowheadPipeline._calculate_drop_chances(content_group),
+                            inputs=[f"{folder}.items"], outputs=[f"{folder}.drop_chances"])
+            graph.add_stage(f"{folder}.sim_world_tour", lambda: MainWowheadPipeline._sim_world_tour(content_group),
+                            inputs=[f"{folder}.drop_chances"], outputs=[f"{folder}.world_tour_sim"])
+        gearslot_inputs = [f"{folder}.world_tour_sim"]
+        if MainWowheadPipeline.monte_carlo_trials > 0:
+            graph.add_stage(f"{folder}.sim_monte_carlo", lambda: MainWowheadPipeline._sim_monte_carlo(content_group),
+                            inputs=[f"{folder}.drop_chances"], outputs=[f"{folder}.monte_carlo_sim"])
+            gearslot_inputs.append(f"{folder}.monte_carlo_sim")
+        graph.add_stage(f"{folder}.gearslot_statistics", content_group.create_gearslot_statistics,
+                        inputs=gearslot_inputs, outputs=[f"{folder}.gearslot_statistics"])
+        graph.add_stage(f"{folder}.export", lambda: MainWowheadPipeline._export(content_group),
+                        inputs=[f"{folder}.gearslot_statistics"], outputs=[f"{folder}.csv"])
+        graph.add_stage(f"{folder}.validate", lambda: MainWowheadPipeline._validate(content_group),
+                        inputs=[f"{folder}.csv"])
+
+    @staticmethod
+    def _prefetch(planner: WowCrawlPlanner) -> None:
+        print("Prefetching every zone and item page...")
+        planner.plan()
+        planner.prefetch()
+        ScrapeUtils.Persistence.flush()
+
+    @staticmethod
+    def _write_snapshot_sim(content_group: WowContentGroup) -> None:
+        print(f"Loaded {content_group.group_name} from its snapshot")
+        content_group.write_world_tour_sim()
+        ScrapeUtils.Persistence.flush()
+
+    @staticmethod
+    def _scrape(content_group: WowContentGroup) -> None:
+        print(f"Scraping {content_group.group_name}...")
+        content_group.cascade_scrape_zones_and_its_items()
+
+    @staticmethod
+    def _calculate_drop_chances(content_group: WowContentGroup) -> None:
+        print("Calculating drop chances for each item")
+        content_group.calculate_drop_chance_for_all_wow_items()
+
+    @staticmethod
+    def _sim_world_tour(content_group: WowContentGroup) -> None:
+        print("Simming world tour...")
+        content_group.sim_world_tour()
+        content_group.save_snapshot()
+        ScrapeUtils.Persistence.flush()
+
+    @staticmethod
+    def _sim_monte_carlo(content_group: WowContentGroup) -> None:
+        print("Running Monte Carlo sim...")
+        content_group.sim_monte_carlo(MainWowheadPipeline.monte_carlo_trials, MainWowheadPipeline.monte_carlo_seed)
+        ScrapeUtils.Persistence.flush()
+
+    @staticmethod
+    def _export(content_group: WowContentGroup) -> None:
+        print("Generating csv files...")
+        content_group.export_items_to_csv_for_all_specs_and_classes(MainWowheadPipeline.export_per_spec_csvs)
+        ScrapeUtils.Persistence.flush()
 
-            print("Validating that output matches its copy in test folder.")
-            is_valid = OutputValidation.validate(content_group.output_folder)
-            MainWowheadPipeline.validation_passed.append(is_valid)
+    @staticmethod
+    def _validate(content_group: WowContentGroup) -> bool:
+        print("Validating that each boss has items...")
+        content_group.validate_that_each_boss_has_loot()
 
-            print("Finished!\n")
-            content_groups.append(content_group)
+        print("Validating that output matches its copy in test folder.")
+        is_valid = OutputValidation.validate(content_group.output_folder)
+        print("Finished!\n")
+        return is_valid
 
+    @staticmethod
+    def _export_combined(item_table: WowItemTable) -> None:
         print("Creating combined csv of both content groups...\n")
-        WowContentGroup.export_csv_for_two_groups(content_groups)
+        WowContentGroup.export_combined_item_table(item_table, MainWowheadPipeline.export_per_spec_csvs)
+        ScrapeUtils.Persistence.flush()
+
+    @staticmethod
+    def save_output_manifest() -> None:
+        """Report and store which outputs changed, if unchanged outputs are skipped"""
+        manifest = ScrapeUtils.Persistence.output_manifest
+        if manifest is None:
+            return
+        manifest.save()
+        changed_paths = manifest.get_changed_paths()
+        written_count = len(set(changed_paths).union(manifest.unchanged_paths))
+        print(f"Info: {len(changed_paths)} of {written_count} outputs changed, listed in {manifest.manifest_path}")
 
-        print(f"Validation passed summary: {MainWowheadPipeline.validation_passed}")
\ No newline at end of file
+    @staticmethod
+    def update_golden_manifest() -> None:
+        """Accept the current output of every content group and the combined output as the new golden output"""
+        output_folders = [factory().output_folder for factory in MainWowheadPipeline.factories]
+        output_folders.append(WowContentGroup._convert_group_name_to_folder(WowContentGroup.COMBINED_NAME))
+        OutputValidation.update_golden_manifest(output_folders)
+
+    @staticmethod
+    def import_file_webcache_to_sqlite() -> None:
+        """Copy every page of the file-per-url webcache into the sqlite webcache"""
+        sqlite_webcache = ScrapeUtils.Html.use_sqlite_webcache()
+        imported_count = sqlite_webcache.import_file_webcache()
+        print(f"Info: Imported {imported_count} pages of {ScrapeUtils.Html.html_webcache_folder} into {sqlite_webcache.db_path}")
@@ -1,6 +1,11 @@
+import difflib
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict, Iterable, List, Optional
 
-from src.wow_item_csv_exporter import WowItemCsvExporter
 from scrape_utils import ScrapeUtils
 
 class OutputValidation:
@@ -8,35 +13,108 @@ class OutputValidation:
     TEST_FOLDER = "tests"
     BASE_TEST_OUTPUT_FOLDER = "test_output"
     BASE_OUTPUT_FOLDER = "output"
+    # Hash of every golden output file, by its path relative to the output folder
+    GOLDEN_MANIFEST_NAME = "golden_manifest.json"
+    HASH_CHUNK_SIZE = 1 << 20
+    MAX_HASH_WORKERS = min(8, os.cpu_count() or 1)
+    MAX_DIFF_LINES = 40
 
     @staticmethod
-    def validate(item_csv: str) -> bool:
-        test_folder: Path = Path.cwd() / OutputValidation.TEST_FOLDER / OutputValidation.BASE_TEST_OUTPUT_FOLDER
-        output_folder: Path = Path.cwd() / OutputValidation.BASE_OUTPUT_FOLDER
-        subfolder = WowItemCsvExporter.ITEMS_FOR_SPEC_FOLDER
-        csv_to_validate = WowItemCsvExporter.ALL_COLUMNS_CSV_NAME
-        real_out = ScrapeUtils.Persistence.read_textfile(output_folder / item_csv / subfolder / csv_to_validate)
-        test_out = ScrapeUtils.Persistence.read_textfile(test_folder / item_csv / subfolder / csv_to_validate)
-        out_match = real_out == test_out
-        if not out_match:
-            print("Warning: output does not match expected output!")
-            #OutputValidation.print_differences(real_out1, test_out1)
+    def validate(output_folder: str) -> bool:
+        """Compare every golden file of output_folder by hash, and diff the ones that differ"""
+        golden_hashes = {path: golden_hash for path, golden_hash in OutputValidation.read_golden_manifest().items()
+                         if path.startswith(f"{output_folder}/")}
+        if not golden_hashes:
+            print(f"Warning: The golden manifest has no files for {output_folder}")
             return False
-        else:
-            print("Validation was passed.")
-            return True
-
-    @staticmethod
-    def print_differences(actual: str, expected: str) -> None:
-        expected_lines = expected.splitlines()
-        actual_lines = actual.splitlines()
-        for i, (expected_line, actual_line) in enumerate(zip(expected_lines, actual_lines), start=1):
-            if expected_line != actual_line:
-                print(f"Line {i} differs:")
-                print(f"Expected: {expected_line}")
-                print(f"Actual:   {actual_line}")
-                break
-        if len(expected_lines) != len(actual_lines):
-            print("File lengths differ.")
-            print(f"Expected file length: {len(expected_lines)} lines.")
-            print(f"Actual file length: {len(actual_lines)} lines.")
+        output_path = OutputValidation._get_output_path()
+        actual_hashes = OutputValidation.hash_files(output_path, golden_hashes.keys())
+        mismatches = [path for path, golden_hash in golden_hashes.items() if actual_hashes[path] != golden_hash]
+        for path in mismatches:
+            if actual_hashes[path] is None:
+                print(f"Warning: Expected output {path} is missing!")
+                continue
+            print(f"Warning: output {path} does not match expected output!")
+            golden_copy_path = OutputValidation._get_test_output_path() / path
+            if golden_copy_path.exists():
+                OutputValidation.print_differences(output_path / path, golden_copy_path)
+        untracked = set(OutputValidation._find_output_files(output_path, output_folder)) - golden_hashes.keys()
+        if untracked:
+            print(f"Info: {len(untracked)} outputs of {output_folder} are not in the golden manifest")
+        if mismatches:
+            return False
+        print(f"Validation was passed for {len(golden_hashes)} files.")
+        return True
+
+    @staticmethod
+    def update_golden_manifest(output_folders: Iterable[str]) -> None:
+        """Replace the golden hashes and golden copies of output_folders with their current output"""
+        output_path = OutputValidation._get_output_path()
+        test_output_path = OutputValidation._get_test_output_path()
+        golden_hashes = OutputValidation.read_golden_manifest()
+        for output_folder in output_folders:
+            golden_hashes = {path: golden_hash for path, golden_hash in golden_hashes.items() if not path.startswith(f"{output_folder}/")}
+            paths = OutputValidation._find_output_files(output_path, output_folder)
+            if not paths:
+                print(f"Warning: No output found for {output_folder}")
+            golden_hashes.update(OutputValidation.hash_files(output_path, paths))
+            for path in paths: # Kept next to the manifest, to diff against when validation fails
+                content = ScrapeUtils.Persistence.read_textfile(output_path / path)
+                ScrapeUtils.Persistence.write_textfile(test_output_path / path, content)
+        manifest = {"files": dict(sorted(golden_hashes.items()))}
+        manifest_path = test_output_path / OutputValidation.GOLDEN_MANIFEST_NAME
+        ScrapeUtils.Persistence.write_textfile(manifest_path, json.dumps(manifest, indent=1) + "\n")
+        print(f"Info: Golden manifest now holds {len(golden_hashes)} files")
+
+    @staticmethod
+    def read_golden_manifest() -> Dict[str, str]:
+        manifest_path = OutputValidation._get_test_output_path() / OutputValidation.GOLDEN_MANIFEST_NAME
+        manifest_str = ScrapeUtils.Persistence.read_textfile(manifest_path, missing_ok=True)
+        if not manifest_str:
+            print(f"Warning: No golden manifest at {manifest_path}")
+            return {}
+        return json.loads(manifest_str)["files"]
+
+    @staticmethod
+    def hash_files(base_path: Path, paths: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Hash of each of paths (relative to base_path) in parallel, None for missing files"""
+        paths = list(paths)
+        with ThreadPoolExecutor(max_workers=OutputValidation.MAX_HASH_WORKERS) as executor:
+            hashes = executor.map(lambda path: OutputValidation.hash_file(base_path / path), paths)
+            return dict(zip(paths, hashes))
+
+    @staticmethod
+    def hash_file(path: Path) -> Optional[str]:
+        """Hash of the text of path, read in chunks. Line endings are normalized, as they differ per platform"""
+        content_hash = hashlib.sha256()
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                for chunk in iter(lambda: file.read(OutputValidation.HASH_CHUNK_SIZE), ''):
+                    content_hash.update(chunk.encode('utf-8'))
+        except FileNotFoundError:
+            return None
+        return content_hash.hexdigest()
+
+    @staticmethod
+    def print_differences(actual_path: Path, expected_path: Path) -> None:
+        with open(actual_path, 'r', encoding='utf-8') as actual, open(expected_path, 'r', encoding='utf-8') as expected:
+            diff = difflib.unified_diff(expected.readlines(), actual.readlines(), str(expected_path), str(actual_path))
+            for line_count, line in enumerate(diff):
+                if line_count >= OutputValidation.MAX_DIFF_LINES:
+                    print("...")
+                    break
+                print(line, end='' if line.endswith('\n') else '\n')
+
+    @staticmethod
+    def _find_output_files(output_path: Path, output_folder: str) -> List[str]:
+        """Every output of output_folder, relative to output_path. Temporary and hidden files are left out"""
+        return sorted(path.relative_to(output_path).as_posix() for path in (output_path / output_folder).rglob("*")
+                      if path.is_file() and not path.name.startswith("."))
+
+    @staticmethod
+    def _get_output_path() -> Path:
+        return Path.cwd() / OutputValidation.BASE_OUTPUT_FOLDER
+
+    @staticmethod
+    def _get_test_output_path() -> Path:
+        return Path.cwd() / OutputValidation.TEST_FOLDER / OutputValidation.BASE_TEST_OUTPUT_FOLDER
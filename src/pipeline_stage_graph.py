@@ -0,0 +1,96 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Set
+
+from scrape_utils import ScrapeUtils
+
+@dataclass
+class PipelineStage:
+    """A named step of the pipeline, which can run once every stage producing one of its inputs has run."""
+    name: str
+    run: Callable[[], Any]
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+
+    def run_timed(self) -> Any:
+        """Run, recording the wall and cpu time of the stage in ScrapeUtils.Metrics"""
+        with ScrapeUtils.Metrics.stage(self.name):
+            return self.run()
+
+
+class PipelineStageGraph:
+    """Dependency graph of PipelineStages, connected by the names of what they produce and use."""
+
+    def __init__(self):
+        self.stages: List[PipelineStage] = []
+        self._producers: Dict[str, str] = {}
+
+    def add_stage(self, name: str, run: Callable[[], Any], inputs: Iterable[str] = (), outputs: Iterable[str] = ()) -> None:
+        if any(stage.name == name for stage in self.stages):
+            raise ValueError(f"Stage {name} was added twice")
+        stage = PipelineStage(name, run, list(inputs), list(outputs))
+        for output in stage.outputs:
+            if output in self._producers:
+                raise ValueError(f"{output} is produced by both {self._producers[output]} and {name}")
+            self._producers[output] = name
+        self.stages.append(stage)
+
+    def get_dependencies(self, stage: PipelineStage) -> List[str]:
+        """Names of the stages producing the inputs of stage"""
+        dependencies: List[str] = []
+        for input_name in stage.inputs:
+            producer = self._producers.get(input_name)
+            if producer is None:
+                raise ValueError(f"Stage {stage.name} needs {input_name}, which no stage produces")
+            if producer not in dependencies:
+                dependencies.append(producer)
+        return dependencies
+
+    def get_execution_order(self) -> List[PipelineStage]:
+        """The order of a single job: each time, the first added stage whose dependencies have run"""
+        dependencies = {stage.name: set(self.get_dependencies(stage)) for stage in self.stages}
+        order: List[PipelineStage] = []
+        done: Set[str] = set()
+        pending = list(self.stages)
+        while pending:
+            ready = next((stage for stage in pending if dependencies[stage.name] <= done), None)
+            if ready is None:
+                raise ValueError(f"Stages {[stage.name for stage in pending]} depend on each other")
+            pending.remove(ready)
+            order.append(ready)
+            done.add(ready.name)
+        return order
+
+    def print_graph(self) -> None:
+        """Dry run: print each stage with what it waits for, in the order of a single job"""
+        order = self.get_execution_order()
+        print(f"Info: {len(order)} stages")
+        for index, stage in enumerate(order, start=1):
+            print(f"{index:>3}. {stage.name:<36} after: {', '.join(self.get_dependencies(stage)) or '-'}")
+            print(f"     {'':<36} in: {', '.join(stage.inputs) or '-'}  out: {', '.join(stage.outputs) or '-'}")
+
+    def run(self, jobs: int = 1) -> Dict[str, Any]:
+        """
+        Run every stage, up to jobs at the same time on a thread pool, and return the result of each by name.
+        A failed stage lets the running stages finish, starts no new ones and is raised.
+        """
+        order = self.get_execution_order()
+        results: Dict[str, Any] = {}
+        if jobs <= 1:
+            for stage in order:
+                results[stage.name] = stage.run_timed()
+            return results
+        dependencies = {stage.name: set(self.get_dependencies(stage)) for stage in order}
+        done: Set[str] = set()
+        running: Dict[Future, PipelineStage] = {}
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            while order or running:
+                for stage in [stage for stage in order if dependencies[stage.name] <= done][:jobs - len(running)]:
+                    order.remove(stage)
+                    running[executor.submit(stage.run_timed)] = stage
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stage = running.pop(future)
+                    results[stage.name] = future.result()
+                    done.add(stage.name)
+        return results
@@ -0,0 +1,131 @@
+import json
+import math
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.sim_world_tour import SimWorldTour
+from src.wow_item_table import WowItemTable
+from scrape_utils import ScrapeUtils
+
+# class abbr -> loot category abbr -> spec abbr -> drop chance of each matching item (fraction)
+DropChanceTable = Dict[str, Dict[str, Dict[str, List[float]]]]
+# class abbr -> loot category abbr -> spec abbr -> {world tours until the first drop: trial count}
+RunHistograms = Dict[str, Dict[str, Dict[str, Dict[int, int]]]]
+
+class SimMonteCarlo:
+    """
+    Simulate many players doing world tours until an item of each loot category drops for their spec.
+    Every item drops independently with loot chance x its drop chance, as in SimWorldTour.
+    Trials are split in a fixed number of seeded shards, so results do not depend on the worker count.
+    """
+
+    FILE_SUFFIX = ".montecarlo.json"
+    SHARD_COUNT = 16
+    # Workers are spawned, not forked: the sim runs on a thread of the stage graph, next to stages holding locks
+    PROCESS_START_METHOD = "spawn"
+
+    @staticmethod
+    def sim_monte_carlo(item_table: WowItemTable, sim_path: Path, trials: int, seed: int = 0,
+                        loot_chance: float = SimWorldTour.LOOT_CHANCE, season_runs: int = 20,
+                        max_runs: int = 1000, workers: Optional[int] = None) -> Dict[str, Dict[str, Dict[str, Dict[str, Optional[float]]]]]:
+        """Write sim/<Class>.montecarlo.json with percentiles of the world tours needed per spec and loot category"""
+        drop_chance_table = SimMonteCarlo.create_drop_chance_table(item_table, loot_chance)
+        shard_trials = [trials // SimMonteCarlo.SHARD_COUNT + (1 if shard < trials % SimMonteCarlo.SHARD_COUNT else 0)
+                        for shard in range(SimMonteCarlo.SHARD_COUNT)]
+        shard_args = [(drop_chance_table, shard_trials[shard], seed * SimMonteCarlo.SHARD_COUNT + shard, max_runs)
+                      for shard in range(SimMonteCarlo.SHARD_COUNT)]
+        if workers == 1:
+            shard_histograms = [SimMonteCarlo._simulate_shard(*args) for args in shard_args]
+        else:
+            mp_context = multiprocessing.get_context(SimMonteCarlo.PROCESS_START_METHOD)
+            with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as executor:
+                shard_histograms = list(executor.map(SimMonteCarlo._simulate_shard, *zip(*shard_args)))
+        histograms = SimMonteCarlo._merge_histograms(shard_histograms)
+
+        all_class_results: Dict[str, Dict[str, Dict[str, Dict[str, Optional[float]]]]] = {}
+        for class_abbr, class_histograms in histograms.items():
+            class_results = {category_abbr: {spec_abbr: SimMonteCarlo._summarize(histogram, season_runs, max_runs)
+                                              for spec_abbr, histogram in category_histograms.items()}
+                             for category_abbr, category_histograms in class_histograms.items()}
+            json_str = json.dumps(class_results, indent=4)
+            ScrapeUtils.Persistence.write_textfile(sim_path / f"{class_abbr}{SimMonteCarlo.FILE_SUFFIX}", json_str)
+            all_class_results[class_abbr] = class_results
+        return all_class_results
+
+    @staticmethod
+    def create_drop_chance_table(item_table: WowItemTable, loot_chance: float) -> DropChanceTable:
+        """Per item drop probabilities per world tour, for the loot categories where the class has items"""
+        drop_chance_table: DropChanceTable = {}
+        for wow_class, class_table in SimWorldTour.create_drop_chance_table(item_table).items():
+            class_drop_chances: Dict[str, Dict[str, List[float]]] = {}
+            for loot_category, category_table in class_table.items():
+                if any(category_table.values()):
+                    class_drop_chances[loot_category.get_abbr()] = {
+                        spec_abbr: [loot_chance * drop_chance for drop_chance in drop_chances]
+                        for spec_abbr, drop_chances in category_table.items()}
+            drop_chance_table[wow_class.get_abbr()] = class_drop_chances
+        return drop_chance_table
+
+    @staticmethod
+    def _simulate_shard(drop_chance_table: DropChanceTable, trials: int, seed: int, max_runs: int) -> RunHistograms:
+        """
+        The world tour in which an item first drops is geometric, so it is drawn directly per item
+        (inverse transform) instead of rolling every tour. A loot category drops at the earliest of its items.
+        """
+        rng = random.Random(seed)
+        never = max_runs + 1
+        histograms: RunHistograms = {}
+        for class_abbr, class_drop_chances in drop_chance_table.items():
+            histograms[class_abbr] = {}
+            for category_abbr, category_drop_chances in class_drop_chances.items():
+                histograms[class_abbr][category_abbr] = {}
+                for spec_abbr, drop_chances in category_drop_chances.items():
+                    # Items that never drop (loot chance 0) are left out, like the ones that always drop
+                    log_chances_of_no_drop = [math.log1p(-drop_chance) for drop_chance in drop_chances if 0 < drop_chance < 1]
+                    always_drops = any(drop_chance >= 1 for drop_chance in drop_chances)
+                    histogram: Dict[int, int] = {}
+                    for _ in range(trials):
+                        first_drop = 1 if always_drops else never
+                        for log_chance_of_no_drop in log_chances_of_no_drop:
+                            runs = 1 + int(math.log(1.0 - rng.random()) / log_chance_of_no_drop)
+                            if runs < first_drop:
+                                first_drop = runs
+                        histogram[first_drop] = histogram.get(first_drop, 0) + 1
+                    histograms[class_abbr][category_abbr][spec_abbr] = histogram
+        return histograms
+
+    @staticmethod
+    def _merge_histograms(shard_histograms: List[RunHistograms]) -> RunHistograms:
+        merged: RunHistograms = {}
+        for shard_histogram in shard_histograms:
+            for class_abbr, class_histograms in shard_histogram.items():
+                merged_class = merged.setdefault(class_abbr, {})
+                for category_abbr, category_histograms in class_histograms.items():
+                    merged_category = merged_class.setdefault(category_abbr, {})
+                    for spec_abbr, histogram in category_histograms.items():
+                        merged_histogram = merged_category.setdefault(spec_abbr, {})
+                        for runs, count in histogram.items():
+                            merged_histogram[runs] = merged_histogram.get(runs, 0) + count
+        return merged
+
+    @staticmethod
+    def _summarize(histogram: Dict[int, int], season_runs: int, max_runs: int) -> Dict[str, Optional[float]]:
+        """Percentiles of world tours until the first drop (None if beyond max_runs) and the chance within a season"""
+        trials = sum(histogram.values())
+        sorted_runs: List[Tuple[int, int]] = sorted(histogram.items())
+        summary: Dict[str, Optional[float]] = {}
+        for name, percentile in (("p50", 0.5), ("p90", 0.9)):
+            needed = math.ceil(percentile * trials)
+            seen = 0
+            summary[name] = None
+            for runs, count in sorted_runs:
+                seen += count
+                if seen >= needed:
+                    summary[name] = runs if runs <= max_runs else None
+                    break
+        within_season = sum(count for runs, count in sorted_runs if runs <= season_runs)
+        summary["season_chance"] = round(100 * within_season / trials, 1) if trials else None
+        return summary
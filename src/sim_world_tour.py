@@ -8,6 +8,7 @@ from src.wow_consts.wow_loot_category import WowLootCategory
 from src.wow_consts.wow_spec import WowSpec
 from src.wow_zone_fixer import WowZoneFixer
 from src.wow_item import WowItem
+from src.wow_item_table import WowItemTable
 from scrape_utils import ScrapeUtils
 
 class SimWorldTour:
@@ -24,64 +25,103 @@ class SimWorldTour:
     M0_CSV_VALUE = "m0 week"
     DEFAULT_GROUP_CATEGORY_VALUE = ""
 
+    LOOT_CHANCE = 0.2  # Chance of loot per player per boss
+
+    # Class -> loot category -> spec, class or ITEM_AVAILABLE_COUNT -> whole percent or item count
+    WorldTourSim = Dict[str, Dict[str, Dict[str, int]]]
+
     @staticmethod
-    def sim_world_tour(abbr: str, all_items: List['WowItem'], sim_path: Path) -> Dict[str, Dict[str, Dict[str, str]]]:
+    def sim_world_tour(abbr: str, item_table: WowItemTable, sim_path: Path,
+                       loot_chance: float = LOOT_CHANCE) -> 'SimWorldTour.WorldTourSim':
         """Sim each spec looting 1 of each item available to them and calculate slot drop rates"""
-        # Warning: high levels of indentation. Viewer discretion is adviced!
-        all_class_drop_rates: Dict[str, Dict[str, Dict[str, str]]] = {}
+        with ScrapeUtils.Metrics.timer("sim_world_tour.seconds"):
+            drop_chance_table = SimWorldTour.create_drop_chance_table(item_table)
+            all_class_drop_rates = SimWorldTour.sim_world_tour_from_table(drop_chance_table, loot_chance)
+            SimWorldTour.write_world_tour_sim(abbr, all_class_drop_rates, sim_path)
+            return all_class_drop_rates
+
+    @staticmethod
+    def sim_world_tour_for_loot_chances(item_table: WowItemTable,
+                                        loot_chances: List[float]) -> Dict[float, 'SimWorldTour.WorldTourSim']:
+        """Sim the world tour once per loot chance. The items are only filtered once."""
+        drop_chance_table = SimWorldTour.create_drop_chance_table(item_table)
+        return {loot_chance: SimWorldTour.sim_world_tour_from_table(drop_chance_table, loot_chance)
+                for loot_chance in loot_chances}
+
+    @staticmethod
+    def create_drop_chance_table(item_table: WowItemTable) -> Dict[WowClass, Dict[WowLootCategory, Dict[str, List[float]]]]:
+        """For each class, loot category and spec: the (non-zero) drop chance of each matching item, as a fraction"""
+        drop_chance_table: Dict[WowClass, Dict[WowLootCategory, Dict[str, List[float]]]] = {}
         for wow_class in WowClass.get_all():
-            loot_chance = 0.2  # Chance of loot per player per boss
-            class_drop_rates: Dict[str, Dict[str, str]] = {}
+            class_table: Dict[WowLootCategory, Dict[str, List[float]]] = {}
             for loot_category in WowLootCategory.get_all():
                 slot = loot_category.get_equip_slot()
-                spec_drop_rates: Dict[str, str] = {}
-                best_chance = 0.0
-                class_items_considered = 0
+                category_table: Dict[str, List[float]] = {}
                 for spec_id in WowSpec.get_all_spec_ids_for_class(wow_class):
                     abbr_name = WowSpec.get_abbr_from_id(spec_id)
+                    drop_chance_floats: List[float] = []
+                    for row in item_table.get_rows_for_spec_and_gear_slot(spec_id, slot.get_ingame_name()):
+                        matching_mainstat = loot_category.get_mainstat() is None or item_table.has_mainstat(row, loot_category.get_mainstat())
+                        matching_role = loot_category.get_equip_slot() != WowEquipSlot.TRINKET or item_table.has_role(row, loot_category.get_role())
+                        if matching_mainstat and matching_role:
+                            drop_chance = item_table.get_drop_chance(row, abbr_name)
+                            if drop_chance > 0:
+                                drop_chance_floats.append(drop_chance / 100)
+                    category_table[abbr_name] = drop_chance_floats
+                class_table[loot_category] = category_table
+            drop_chance_table[wow_class] = class_table
+        return drop_chance_table
+
+    @staticmethod
+    def sim_world_tour_from_table(drop_chance_table: Dict[WowClass, Dict[WowLootCategory, Dict[str, List[float]]]],
+                                  loot_chance: float = LOOT_CHANCE) -> 'SimWorldTour.WorldTourSim':
+        """Calculate slot drop rates from a create_drop_chance_table table"""
+        all_class_drop_rates: SimWorldTour.WorldTourSim = {}
+        for wow_class, class_table in drop_chance_table.items():
+            class_drop_rates: Dict[str, Dict[str, int]] = {}
+            for loot_category, category_table in class_table.items():
+                spec_drop_rates: Dict[str, int] = {}
+                best_chance = 0.0
+                class_items_considered = 0
+                for abbr_name, drop_chance_floats in category_table.items():
                     chance_of_no_drops = 1.0
-                    items_considered = 0
-                    for item in list(WowItem.get_all_items_for_spec(spec_id, all_items)):
-                        matching_slot = item.gear_slot == slot.get_ingame_name()
-                        matching_mainstat = loot_category.get_mainstat() is None or item.has_mainstat(loot_category.get_mainstat())
-                        matching_role = loot_category.get_equip_slot() != WowEquipSlot.TRINKET or item.has_role(loot_category.get_role())
-                        if matching_slot and matching_mainstat and matching_role:
-                            drop_chance = item.drop_chances[abbr_name].rstrip('%')
-                            try:
-                                drop_chance_float = float(drop_chance) / 100
-                            except ValueError:
-                                print(f"Warning: drop chance {drop_chance} is not numeric")
-                                continue
-                            chance_item_not_dropping = 1 - (loot_chance * drop_chance_float)
-                            if drop_chance_float > 0:
-                                chance_of_no_drops *= chance_item_not_dropping
-                                items_considered += 1
+                    for drop_chance_float in drop_chance_floats: # Multiplied in item order, so rounding never changes
+                        chance_of_no_drops *= 1 - (loot_chance * drop_chance_float)
                     chance_of_at_least_one = (1 - chance_of_no_drops) * 100
                     best_chance = max(best_chance, chance_of_at_least_one)
-                    class_items_considered = max(items_considered, class_items_considered)
-
-                    spec_drop_rates[abbr_name] = f"{chance_of_at_least_one:.0f}%" #({items_considered} items)
-                spec_drop_rates[SimWorldTour.ITEM_AVAILABLE_COUNT] = SimWorldTour._format_item_availability(class_items_considered, abbr)
-                spec_drop_rates[wow_class.get_abbr()] = f"{best_chance:.0f}%"
-                for value in spec_drop_rates.values():
-                    if value not in ("0%", SimWorldTour._format_item_availability(0, abbr)):
-                        class_drop_rates[loot_category.get_abbr()] = spec_drop_rates
-
-            json_str = json.dumps(class_drop_rates, indent=4)
-            path = sim_path / f"{wow_class.get_abbr()}.json"
-            ScrapeUtils.Persistence.write_textfile(path, json_str)
+                    class_items_considered = max(len(drop_chance_floats), class_items_considered)
+
+                    spec_drop_rates[abbr_name] = round(chance_of_at_least_one) #({items_considered} items)
+                spec_drop_rates[SimWorldTour.ITEM_AVAILABLE_COUNT] = class_items_considered
+                spec_drop_rates[wow_class.get_abbr()] = round(best_chance)
+                if any(value != 0 for value in spec_drop_rates.values()):
+                    class_drop_rates[loot_category.get_abbr()] = spec_drop_rates
             all_class_drop_rates[wow_class.get_abbr()] = class_drop_rates
         return all_class_drop_rates
 
     @staticmethod
-    def create_gearslot_statistics(abbr: str, world_tour_sim: Dict[str, Dict[str, Dict[str, str]]]) -> List[WowItem]:
+    def write_world_tour_sim(abbr: str, world_tour_sim: 'SimWorldTour.WorldTourSim', sim_path: Path) -> None:
+        """Write one json file per class of a simmed world tour, with '12%' drop rates"""
+        for class_abbr, class_drop_rates in world_tour_sim.items():
+            SimWorldTour._write_class_drop_rates(abbr, class_abbr, class_drop_rates, sim_path)
+
+    @staticmethod
+    def _write_class_drop_rates(abbr: str, class_abbr: str, class_drop_rates: Dict[str, Dict[str, int]], sim_path: Path) -> None:
+        formatted_drop_rates = {loot_category: {key: SimWorldTour._format_sim_value(key, value, abbr) for key, value in spec_drop_rates.items()}
+                                for loot_category, spec_drop_rates in class_drop_rates.items()}
+        json_str = json.dumps(formatted_drop_rates, indent=4)
+        path = sim_path / f"{class_abbr}.json"
+        ScrapeUtils.Persistence.write_textfile(path, json_str)
+
+    @staticmethod
+    def create_gearslot_statistics(abbr: str, world_tour_sim: 'SimWorldTour.WorldTourSim') -> List[WowItem]:
         """Create a 'fake' WowItem that summarizes the findings of SimWorldTour"""
         formatted_abbr = SimWorldTour._format_group_abbr(abbr)
         gearslot_statistics: List[WowItem] = []
         for wow_class, loot_category_drop_chances in world_tour_sim.items():
             for loot_category, spec_drop_chances in loot_category_drop_chances.items():
                 empty_item = WowItem.create_empty()
-                empty_item.spec_ids.clear() #Is populated by all spec_ids by default if none was scraped
+                spec_ids: List[int] = [] # Not every spec, which create_empty gives when none was scraped
                 empty_item.name = f"{loot_category} items for ({wow_class})"
                 empty_item.week = abbr
                 empty_item.boss = ""
@@ -89,18 +129,27 @@ class SimWorldTour:
                 empty_item.dropped_in = formatted_abbr
                 empty_item.gear_slot = WowLootCategory.convert_abbr_to_ingame_equipslot(loot_category)
                 empty_item.gear_type = formatted_abbr
-                empty_item.from_ = spec_drop_chances.get(SimWorldTour.ITEM_AVAILABLE_COUNT, SimWorldTour._format_item_availability(-999, abbr))
+                empty_item.from_ = SimWorldTour._format_item_availability(spec_drop_chances.get(SimWorldTour.ITEM_AVAILABLE_COUNT, -999), abbr)
                 for spec_abbr, drop_chance in spec_drop_chances.items():
                     # spec drop chance dict contains wow class and total item count. Ignore those.
                     if spec_abbr == wow_class:
                         empty_item.drop_chances[wow_class] = drop_chance
                     if spec_abbr != wow_class and spec_abbr != SimWorldTour.ITEM_AVAILABLE_COUNT:
                         empty_item.drop_chances[spec_abbr] = drop_chance
-                        spec_id = WowSpec.get_item_id_from_abbr(spec_abbr)
-                        empty_item.spec_ids.append(spec_id)
+                        spec_ids.append(WowSpec.get_item_id_from_abbr(spec_abbr))
+                # The spec_names column of these rows has always listed every spec, which create_empty gives
+                empty_item.spec_names_override = empty_item.spec_names
+                empty_item.spec_ids = spec_ids
                 gearslot_statistics.append(empty_item)
+        WowItem.share_drop_chance_table(gearslot_statistics)
         return gearslot_statistics
 
+    @staticmethod
+    def _format_sim_value(key: str, value: int, group_abbr: str) -> str:
+        if key == SimWorldTour.ITEM_AVAILABLE_COUNT:
+            return SimWorldTour._format_item_availability(value, group_abbr)
+        return f"{value}%"
+
     @staticmethod
     def _format_group_abbr(group_abbr: str) -> str:
         """Quick and dirty implementation to put HC first and M0 last in alphabetical sorting"""
@@ -1,49 +1,78 @@
-from enum import Enum
-from typing import List, Optional, TypeVar, Type
+from enum import Enum, EnumMeta
+from types import MappingProxyType
+from typing import Any, FrozenSet, List, Mapping, Optional, Tuple, TypeVar, Type
 
 WowEnumT = TypeVar('WowEnumT', bound='WowEnumBase')
 
-class WowEnumBase(Enum):
+class WowEnumMeta(EnumMeta):
+    """Metaclass of the WoW enums. Builds the lookup tables of each enum once, when its class is created"""
+
+    def __new__(metacls, cls, bases, classdict, **kwds):
+        enum_class = super().__new__(metacls, cls, bases, classdict, **kwds)
+        enum_class._build_lookups()
+        return enum_class
+
+
+class WowEnumBase(Enum, metaclass=WowEnumMeta):
     """Base class for all WoW enums."""
 
+    _members: Tuple[Any, ...]
+    _abbrs: Tuple[str, ...]
+    _ingame_names: Tuple[Any, ...]
+    _abbr_by_member: Mapping[Any, str]
+    _member_by_abbr: Mapping[str, Any]
+    _member_by_ingame_name: Mapping[Any, Any]
+    _abbrs_and_ingame_names: FrozenSet[Any]
+
+    @classmethod
+    def _build_lookups(cls) -> None:
+        """Frozen lookup tables, built by WowEnumMeta. Enums with lookups of their own extend this"""
+        cls._members = tuple(cls)
+        cls._abbr_by_member = MappingProxyType({member: WowEnumBase._create_abbr(member.name) for member in cls._members})
+        cls._abbrs = tuple(cls._abbr_by_member.values())
+        cls._ingame_names = tuple(member.get_ingame_name() for member in cls._members)
+        member_by_abbr = {}
+        member_by_ingame_name = {}
+        for member, abbr, ingame_name in zip(cls._members, cls._abbrs, cls._ingame_names):
+            member_by_abbr.setdefault(abbr, member) # The first member wins, as with the linear scans before
+            member_by_ingame_name.setdefault(ingame_name, member)
+        cls._member_by_abbr = MappingProxyType(member_by_abbr)
+        cls._member_by_ingame_name = MappingProxyType(member_by_ingame_name)
+        cls._abbrs_and_ingame_names = frozenset(cls._abbrs + cls._ingame_names)
+
+    @staticmethod
+    def _create_abbr(name: str) -> str:
+        return ''.join(word.capitalize() for word in name.split('_'))
+
     @classmethod
     def get_all(cls: Type[WowEnumT]) -> List[WowEnumT]:
-        return list(cls)
+        return list(cls._members)
 
     @classmethod
     def get_all_abbrs(cls) -> List[str]:
-        abbreviations: List[str] = []
-        for enum in cls:
-            abbreviations.append(enum.get_abbr())
-        return abbreviations
+        return list(cls._abbrs)
 
     @classmethod
     def get_all_ingame_names(cls) -> List[str]:
-        ingame_names: List[str] = []
-        for enum in cls:
-            ingame_names.append(enum.get_ingame_name())
-        return ingame_names
+        return list(cls._ingame_names)
 
     @classmethod
     def get_from_ingame_name(cls: Type[WowEnumT], ingame_name: str) -> Optional[WowEnumT]:
-        for enum in cls:
-            if enum.get_ingame_name() == ingame_name:
-                return enum
-        return None
+        return cls._member_by_ingame_name.get(ingame_name)
 
     @classmethod
     def get_from_abbr(cls: Type[WowEnumT], abbr: str) -> WowEnumT:
-        for enum in cls:
-            if enum.get_abbr() == abbr:
-                return enum
-        raise ValueError(f"No enum matched the abbr {abbr}")
+        member = cls._member_by_abbr.get(abbr)
+        if member is None:
+            raise ValueError(f"No enum matched the abbr {abbr}")
+        return member
 
 
     def get_abbr(self) -> str:
-        return ''.join(word.capitalize() for word in self.name.split('_'))
+        return type(self)._abbr_by_member[self]
 
     def get_ingame_name(self) -> str:
         return self.value
 
     def is_in_enum_set(self, value: str) -> bool:
-        return value in self.get_all_abbrs() or value in self.get_all_ingame_names()
\ No newline at end of file
+        return value in type(self)._abbrs_and_ingame_names
@@ -3,7 +3,8 @@ from .wow_enum_base import WowEnumBase
 from .wow_role import WowRole
 from .wow_stat_primary import WowStatPrimary
 from dataclasses import dataclass
-from typing import List
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Tuple
 
 @dataclass
 class WowSpecData:
@@ -69,12 +70,47 @@ class WowSpec(WowEnumBase):
     WARRIOR_FURY = WowSpecData(72, "Fury", WowClass.WARRIOR, WowRole.DPS, WowStatPrimary.STR)
     WARRIOR_PROT = WowSpecData(73, "Protection", WowClass.WARRIOR, WowRole.TANK, WowStatPrimary.STR)
 
+    @classmethod
+    def _build_lookups(cls) -> None:
+        super()._build_lookups()
+        spec_by_id: Dict[int, 'WowSpec'] = {}
+        spec_ids_by_class: Dict[WowClass, List[int]] = {}
+        spec_ids_by_role: Dict[WowRole, List[int]] = {}
+        spec_ids_by_mainstat: Dict[WowStatPrimary, List[int]] = {}
+        for spec in cls._members:
+            spec_by_id.setdefault(spec.value.spec_id, spec)
+            spec_ids_by_class.setdefault(spec.value.wowclass, []).append(spec.value.spec_id)
+            spec_ids_by_role.setdefault(spec.value.role, []).append(spec.value.spec_id)
+            spec_ids_by_mainstat.setdefault(spec.value.mainstat, []).append(spec.value.spec_id)
+        cls._spec_by_id = MappingProxyType(spec_by_id)
+        cls._spec_ids = tuple(spec.value.spec_id for spec in cls._members)
+        cls._spec_ids_by_class = MappingProxyType({key: tuple(value) for key, value in spec_ids_by_class.items()})
+        cls._spec_ids_by_role = MappingProxyType({key: tuple(value) for key, value in spec_ids_by_role.items()})
+        cls._spec_ids_by_mainstat = MappingProxyType({key: tuple(value) for key, value in spec_ids_by_mainstat.items()})
+        # Spec sets are bitmasks with bit n for the nth spec, interned so items with the same specs share one mask
+        cls._mask_by_spec_id = MappingProxyType({spec_id: 1 << cls._spec_ids.index(spec_id) for spec_id in spec_by_id})
+        cls._masks_by_class = MappingProxyType({key: cls._create_mask(value) for key, value in cls._spec_ids_by_class.items()})
+        cls._masks_by_role = MappingProxyType({key: cls._create_mask(value) for key, value in cls._spec_ids_by_role.items()})
+        cls._masks_by_mainstat = MappingProxyType({key: cls._create_mask(value) for key, value in cls._spec_ids_by_mainstat.items()})
+        cls._all_specs_mask = cls._create_mask(cls._spec_ids)
+        cls._interned_masks: Dict[int, int] = {}
+        cls._spec_ids_by_mask: Dict[int, Tuple[int, ...]] = {}
+        cls._interned_spec_ids: Dict[Tuple[int, ...], Tuple[int, ...]] = {}
+        cls._abbrs_by_spec_ids: Dict[Tuple[int, ...], Tuple[str, ...]] = {}
+
+    @classmethod
+    def _create_mask(cls, spec_ids: Iterable[int]) -> int:
+        mask = 0
+        for spec_id in spec_ids:
+            mask |= cls._mask_by_spec_id[spec_id]
+        return mask
+
     @classmethod
     def get_spec_from_id(cls, spec_id: int) -> 'WowSpec':
-        for spec in cls:
-            if spec.value.spec_id == spec_id:
-                return spec
-        raise ValueError(f"No spec found with id {spec_id}")
+        spec = cls._spec_by_id.get(spec_id)
+        if spec is None:
+            raise ValueError(f"No spec found with id {spec_id}")
+        return spec
 
     @classmethod
     def get_abbr_from_id(cls, spec_id: int) -> str:
@@ -86,34 +122,76 @@ class WowSpec(WowEnumBase):
 
     @classmethod
     def get_all_spec_ids(cls) -> List[int]:
-        spec_ids: List[int] = []
-        for enum in cls:
-            spec_ids.append(enum.value.spec_id)
-        return spec_ids
+        return list(cls._spec_ids)
 
     @classmethod
     def get_all_spec_ids_for_class(cls, wowclass: WowClass) -> List[int]:
-        spec_list: List[int] = []
-        for spec in cls:
-            if spec.value.wowclass == wowclass:
-                spec_list.append(spec.get_spec_id())
-        return spec_list
+        return list(cls._spec_ids_by_class.get(wowclass, ()))
 
     @classmethod
     def get_all_spec_ids_for_role(cls, role: WowRole) -> List[int]:
-        spec_list: List[int] = []
-        for spec in cls:
-            if spec.value.role == role:
-                spec_list.append(spec.get_spec_id())
-        return spec_list
+        return list(cls._spec_ids_by_role.get(role, ()))
 
     @classmethod
     def get_all_spec_ids_for_mainstat(cls, mainstat: WowStatPrimary) -> List[int]:
-        spec_list: List[int] = []
-        for spec in cls:
-            if spec.value.mainstat == mainstat:
-                spec_list.append(spec.get_spec_id())
-        return spec_list
+        return list(cls._spec_ids_by_mainstat.get(mainstat, ()))
+
+    @classmethod
+    def get_mask_from_spec_ids(cls, spec_ids: Iterable[int]) -> int:
+        """Interned bitmask of spec_ids. Raises ValueError for unknown spec ids"""
+        try:
+            return cls.intern_mask(cls._create_mask(spec_ids))
+        except KeyError as e:
+            raise ValueError(f"No spec found with id {e.args[0]}") from None
+
+    @classmethod
+    def intern_mask(cls, mask: int) -> int:
+        return cls._interned_masks.setdefault(mask, mask)
+
+    @classmethod
+    def get_spec_ids_from_mask(cls, mask: int) -> List[int]:
+        """The spec ids in mask, in WowSpec order"""
+        spec_ids = cls._spec_ids_by_mask.get(mask)
+        if spec_ids is None:
+            spec_ids = cls._spec_ids_by_mask[mask] = tuple(spec_id for index, spec_id in enumerate(cls._spec_ids) if mask >> index & 1)
+        return list(spec_ids)
+
+    @classmethod
+    def intern_spec_ids(cls, spec_ids: Iterable[int]) -> Tuple[int, ...]:
+        """spec_ids as a tuple in their own order, shared by every item listing the same specs in that order"""
+        spec_ids = tuple(spec_ids)
+        return cls._interned_spec_ids.setdefault(spec_ids, spec_ids)
+
+    @classmethod
+    def get_abbrs_from_spec_ids(cls, spec_ids: Tuple[int, ...]) -> Tuple[str, ...]:
+        """The abbrs of spec_ids in their own order, made once per distinct spec_ids"""
+        abbrs = cls._abbrs_by_spec_ids.get(spec_ids)
+        if abbrs is None:
+            abbrs = cls._abbrs_by_spec_ids[spec_ids] = tuple(cls.get_abbr_from_id(spec_id) for spec_id in spec_ids)
+        return abbrs
+
+    @classmethod
+    def has_spec_id(cls, mask: int, spec_id: int) -> bool:
+        return mask & cls._mask_by_spec_id.get(spec_id, 0) != 0
+
+    @classmethod
+    def get_all_specs_mask(cls) -> int:
+        return cls._all_specs_mask
+
+    @classmethod
+    def get_mask_for_class(cls, wowclass: WowClass) -> int:
+        return cls._masks_by_class.get(wowclass, 0)
+
+    @classmethod
+    def get_mask_for_role(cls, role: WowRole) -> int:
+        return cls._masks_by_role.get(role, 0)
+
+    @classmethod
+    def get_mask_for_mainstat(cls, mainstat: WowStatPrimary) -> int:
+        return cls._masks_by_mainstat.get(mainstat, 0)
+
+    def get_mask(self) -> int:
+        return type(self)._mask_by_spec_id[self.value.spec_id]
 
     def get_spec_id(self) -> int:
         return self.value.spec_id
@@ -1,13 +1,21 @@
+import os
+import pickle
 import re
 from pathlib import Path
-from typing import List, Dict
+from typing import Any, List, Dict, Set
 
+from src.wow_drop_chance_matrix import WowDropChanceMatrix
 from src.wow_item import WowItem
+from src.wow_item_index import WowItemIndex
+from src.wow_item_table import WowItemTable
+from src.wow_item_scraper import WowItemScraper
 from src.wow_zone import WowZone
 from src.wow_content_group_scraper import WowContentGroupScraper
 from src.wow_item_csv_exporter import WowItemCsvExporter
 from src.output_validation import OutputValidation
+from src.sim_monte_carlo import SimMonteCarlo
 from src.sim_world_tour import SimWorldTour
+from scrape_utils import ScrapeUtils
 
 class WowContentGroup:
     """Represents a set of WoW zones (m+ dungeon pool or similar)."""
@@ -17,6 +25,9 @@ class WowContentGroup:
 
     COMBINED_NAME = "all"
 
+    # Bump SNAPSHOT_VERSION whenever WowZone, WowNpc, WowItem or the world tour sim change shape, so old snapshots are ignored
+    SNAPSHOT_VERSION = 6
+
     def __init__(self, group_name: str, group_abbr: str, zone_ids: List[int], wowhead_zone_subpage: str = ""):
         """Initialize WowZoneGroup with zone list and HTML content."""
         self.group_name = group_name
@@ -24,56 +35,133 @@ class WowContentGroup:
         self.output_folder = WowContentGroup._convert_group_name_to_folder(group_name)
         self.output_path = WowContentGroup._create_output_path(group_name)
         self.zone_ids = zone_ids
+        self.wowhead_zone_subpage = wowhead_zone_subpage
         if len(zone_ids) == 0:
             self.zone_ids = WowContentGroupScraper.scrape_zone_ids(wowhead_zone_subpage)
         self.wow_zones: List[WowZone] = []
-        self.world_tour_sim: Dict[str, Dict[str, Dict[str, str]]] = {}
+        self.world_tour_sim: SimWorldTour.WorldTourSim = {}
         self.gearslot_statistics: List[WowItem] = []
+        self.item_index = WowItemIndex()
+        self.item_table = WowItemTable()
 
     def cascade_scrape_zones_and_its_items(self) -> None:
         for zone_id in self.zone_ids:
             wow_zone = WowZone(zone_id)
             self.wow_zones.append(wow_zone)
+        self.build_item_index()
+
+    def build_item_index(self) -> None:
+        """
+        Index the items of every zone. Lookups by spec, slot, category, boss or zone go through this index.
+        Drop chances, the sims and the export run on the columnar item table, which the zone items share drop chances with.
+        """
+        self.item_index = WowItemIndex(self.get_all_wow_items())
+        self.item_table = WowItemTable(self.item_index.all_items)
 
     def get_all_wow_items(self) -> List[WowItem]:
         all_items: List[WowItem] = []
         for zone in self.wow_zones:
             all_items.extend(zone.get_all_wow_items())
-        return list(set(all_items))
+        return list(dict.fromkeys(all_items))
 
     def calculate_drop_chance_for_all_wow_items(self) -> None:
-        all_items = self.get_all_wow_items()
-        for item in all_items:
-            item.calculate_drop_chance_per_spec(all_items)
+        WowDropChanceMatrix(self.item_table).fill_drop_chances()
 
     def sim_world_tour(self) -> None:
-        all_items = self.get_all_wow_items()
         world_tour_path = self.output_path / SimWorldTour.WORLD_TOUR_FOLDER
-        self.world_tour_sim = SimWorldTour.sim_world_tour(self.group_abbr, all_items, world_tour_path)
+        self.world_tour_sim = SimWorldTour.sim_world_tour(self.group_abbr, self.item_table, world_tour_path)
+
+    def sim_monte_carlo(self, trials: int, seed: int = 0) -> None:
+        """Write Monte Carlo distributions of world tours needed per slot next to the world tour sim files"""
+        world_tour_path = self.output_path / SimWorldTour.WORLD_TOUR_FOLDER
+        SimMonteCarlo.sim_monte_carlo(self.item_table, world_tour_path, trials, seed)
+
+    def write_world_tour_sim(self) -> None:
+        """Write the sim files of a world tour loaded from a snapshot"""
+        world_tour_path = self.output_path / SimWorldTour.WORLD_TOUR_FOLDER
+        SimWorldTour.write_world_tour_sim(self.group_abbr, self.world_tour_sim, world_tour_path)
+
+    def save_snapshot(self) -> None:
+        """Save zones, bosses, items with their drop chances and the world tour sim as one binary file"""
+        snapshot: Dict[str, Any] = {
+            "snapshot_version": WowContentGroup.SNAPSHOT_VERSION,
+            "parser_version": WowItemScraper.PARSER_VERSION,
+            "zone_ids": self.zone_ids,
+            "wow_zones": self.wow_zones,
+            "world_tour_sim": self.world_tour_sim,
+        }
+        # Written to a temporary file first, so a run that dies while dumping keeps the previous snapshot
+        path = ScrapeUtils.Persistence._resolve_path(self._get_snapshot_path())
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(temp_path, 'wb') as file:
+                pickle.dump(snapshot, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+    def load_snapshot(self) -> bool:
+        """Load what save_snapshot saved. Returns False if there is no usable snapshot for this group"""
+        path = self._get_snapshot_path()
+        if not path.is_file():
+            return False
+        try:
+            with open(path, 'rb') as file:
+                snapshot: Dict[str, Any] = pickle.load(file)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            print(f"Warning: Snapshot {path} could not be loaded and is ignored: {e}")
+            return False
+        if snapshot.get("snapshot_version") != WowContentGroup.SNAPSHOT_VERSION \
+                or snapshot.get("parser_version") != WowItemScraper.PARSER_VERSION:
+            print(f"Info: Snapshot {path} is from another version and is ignored")
+            return False
+        if snapshot["zone_ids"] != self.zone_ids:
+            print(f"Info: Snapshot {path} has other zones than {self.group_name} and is ignored")
+            return False
+        self.wow_zones = snapshot["wow_zones"]
+        self.world_tour_sim = snapshot["world_tour_sim"]
+        self.build_item_index()
+        return True
+
+    def _get_snapshot_path(self) -> Path:
+        return WowZone.folder / f"{self.output_folder}.pickle"
 
     def create_gearslot_statistics(self) -> None:
+        """The new item table rebinds the drop chances of all indexed items, the zone items too, to its rows"""
         self.gearslot_statistics = SimWorldTour.create_gearslot_statistics(self.group_abbr, self.world_tour_sim)
+        self.item_index.add_items(self.gearslot_statistics)
+        self.item_table = WowItemTable(self.item_index.all_items)
 
-    def export_items_to_csv_for_all_specs_and_classes(self) -> None:
-        all_items = self.get_all_wow_items() + self.gearslot_statistics
+    def export_items_to_csv_for_all_specs_and_classes(self, per_spec: bool = False) -> None:
         path = self.output_path / WowItemCsvExporter.ITEMS_FOR_SPEC_FOLDER
-        WowItemCsvExporter.export_items_to_csv_for_all_specs_and_classes(all_items, path)
+        WowItemCsvExporter.export_items_to_csv_for_all_specs_and_classes(self.item_table, path, per_spec)
+
+    @staticmethod
+    def export_csv_for_two_groups(groups: List['WowContentGroup'], per_spec: bool = False) -> None:
+        WowContentGroup.export_combined_item_table(WowContentGroup.create_combined_item_table(groups), per_spec)
 
     @staticmethod
-    def export_csv_for_two_groups(groups: List['WowContentGroup']) -> None:
+    def create_combined_item_table(groups: List['WowContentGroup']) -> WowItemTable:
+        """Item table of the items and gearslot statistics of groups, each item id once. Rebinds their drop chances to it"""
         all_unique_items: List[WowItem] = []
+        seen_item_ids: Set[int] = set()
         for group in groups:
             for item in group.get_all_wow_items() + group.gearslot_statistics:
-                if not item.is_duplicate(all_unique_items):
+                if item.item_id == WowItem.EMPTY_ITEM_ID or item.item_id not in seen_item_ids: # As WowItem.is_duplicate
+                    seen_item_ids.add(item.item_id)
                     all_unique_items.append(item)
         WowItem.validate_each_hardcoded_item_spec_exists_in_items(all_unique_items)
+        return WowItemTable(all_unique_items)
+
+    @staticmethod
+    def export_combined_item_table(item_table: WowItemTable, per_spec: bool = False) -> None:
         path = WowContentGroup._create_output_path(WowContentGroup.COMBINED_NAME)
-        WowItemCsvExporter.export_items_to_csv_for_all_specs_and_classes(all_unique_items, path)
+        WowItemCsvExporter.export_items_to_csv_for_all_specs_and_classes(item_table, path, per_spec)
 
     def validate_that_each_boss_has_loot(self) -> None:
-        all_items = self.get_all_wow_items()
         for zone in self.wow_zones:
-            zone.validate_that_each_boss_has_loot(all_items)
+            zone.validate_that_each_boss_has_loot(self.item_index.get_items_for_zone(zone.zone_name))
 
     @staticmethod
     def _convert_group_name_to_folder(group_name: str) -> str:
@@ -12,8 +12,9 @@ class WowContentGroupFactory:
         zone_ids: List[int] = []
         wowhead_suburl = "war-within/dungeons"
         content_group = WowContentGroup(group_name, group_abbr, zone_ids, wowhead_suburl)
-        #Remove fake dungeon zzoldPriory
-        content_group.zone_ids.remove(15055)
+        #Remove fake dungeon zzoldPriory (the zone list is empty when a crawl is planned before it was ever fetched)
+        if 15055 in content_group.zone_ids:
+            content_group.zone_ids.remove(15055)
         return content_group
 
     @staticmethod
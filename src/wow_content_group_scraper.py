@@ -7,17 +7,24 @@ from scrape_utils import ScrapeUtils
 class WowContentGroupScraper:
     """Scrapes data from wowhead for a wow content group."""
 
+    _is_trimmer_ruleset_registered = False
+
     @staticmethod
     def scrape_zone_ids(wowhead_zone_subpage: str) -> List[int]:
         """Scrape zone id data from Wowhead and save it."""
         WowContentGroupScraper._set_trimmer_ruleset_for_content_group()
-        url = f"https://www.wowhead.com/zones/{wowhead_zone_subpage}"
+        url = WowContentGroupScraper.get_wowhead_zone_list_url(wowhead_zone_subpage)
         html_content = ScrapeUtils.Html.fetch_url(url)
         if len(html_content) == 0:
             print(f"Warning: html_content is Empty for zone_list {wowhead_zone_subpage}")
         zone_ids = list(WowContentGroupScraper._extract_zone_ids(html_content).keys())
         return zone_ids
 
+    @staticmethod
+    def get_wowhead_zone_list_url(wowhead_zone_subpage: str) -> str:
+        """Url of a wowhead zone list, e.g. the 'war-within/dungeons' subpage. It is also the webcache key of the page."""
+        return f"https://www.wowhead.com/zones/{wowhead_zone_subpage}"
+
     @staticmethod
     def _extract_zone_ids(html: str) -> Dict[int, str]:
         zone_data = {}
@@ -36,7 +43,10 @@ class WowContentGroupScraper:
     @staticmethod
     def _set_trimmer_ruleset_for_content_group() -> None:
         """In ScrapeUtils.Trimmer, register trimming ruleset for wowhead.com/zones"""
+        if WowContentGroupScraper._is_trimmer_ruleset_registered:
+            return
         target_url = "wowhead.com/zones"
         html_start = '<script type="text/javascript">//'
         html_end = '//]]></script>'
-        ScrapeUtils.Trimmer.register_trimming_ruleset(target_url, html_start, html_end)
\ No newline at end of file
+        ScrapeUtils.Trimmer.register_trimming_ruleset(target_url, html_start, html_end)
+        WowContentGroupScraper._is_trimmer_ruleset_registered = True
\ No newline at end of file
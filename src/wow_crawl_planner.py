@@ -0,0 +1,100 @@
+from typing import Dict, List
+
+from src.wow_content_group import WowContentGroup
+from src.wow_content_group_scraper import WowContentGroupScraper
+from src.wow_item_scraper import WowItemScraper
+from src.wow_registry import WowRegistry
+from src.wow_zone_fixer import WowZoneFixer
+from src.wow_zone_scraper import WowZoneScraper
+from scrape_utils import ScrapeUtils
+
+class WowCrawlPlanner:
+    """Resolves every url needed by a run up front, so they can be fetched in one bulk I/O phase."""
+
+    CACHE_HIT = "cache_hit"
+    NETWORK = "network"
+    UNRESOLVED_ZONES = "unresolved_zones"
+    UNRESOLVED_ZONE_LISTS = "unresolved_zone_lists"
+
+    def __init__(self, content_groups: List[WowContentGroup]):
+        self.content_groups = content_groups
+        self.zone_list_urls: List[str] = []
+        self.zone_ids: List[int] = []
+        self.item_ids_per_zone: Dict[int, List[int]] = {}
+        self.unresolved_zone_ids: List[int] = []
+        self.unresolved_zone_list_urls: List[str] = []
+
+    def plan(self, fetch_missing: bool = True) -> None:
+        """Resolve zone list pages, zone pages and item ids (after WowZoneFixer overrides)"""
+        self.zone_list_urls.clear()
+        self.zone_ids.clear()
+        self.item_ids_per_zone.clear()
+        self.unresolved_zone_ids.clear()
+        self.unresolved_zone_list_urls.clear()
+        for group in self.content_groups:
+            if group.wowhead_zone_subpage:
+                url = WowContentGroupScraper.get_wowhead_zone_list_url(group.wowhead_zone_subpage)
+                if url not in self.zone_list_urls:
+                    self.zone_list_urls.append(url)
+                if not group.zone_ids and url not in self.unresolved_zone_list_urls: # Zone list page not cached
+                    self.unresolved_zone_list_urls.append(url)
+            for zone_id in group.zone_ids:
+                if zone_id not in self.zone_ids:
+                    self.zone_ids.append(zone_id)
+        if fetch_missing:
+            WowZoneScraper.prefetch_wowhead_zones(self.zone_ids)
+        for zone_id in self.zone_ids:
+            optional_fixed_item_list = WowZoneFixer.try_fix_item_list(zone_id)
+            if optional_fixed_item_list is not None:
+                self.item_ids_per_zone[zone_id] = optional_fixed_item_list
+                continue
+            url = WowZoneScraper.get_wowhead_zone_url(zone_id)
+            html_content = ScrapeUtils.Html.try_get_cached_html(url)
+            if not html_content:
+                self.unresolved_zone_ids.append(zone_id)
+                continue
+            self.item_ids_per_zone[zone_id] = list(WowRegistry.get_zone(zone_id, html_content).item_ids)
+
+    def prefetch(self) -> None:
+        """Fetch every planned item page as one bulk batch (zone pages are fetched by plan)"""
+        WowItemScraper.prefetch_wowhead_items(self.get_all_item_ids())
+
+    def get_all_item_ids(self) -> List[int]:
+        all_item_ids: Dict[int, None] = {}
+        for item_ids in self.item_ids_per_zone.values():
+            all_item_ids.update(dict.fromkeys(item_ids))
+        return list(all_item_ids)
+
+    def get_all_urls(self) -> List[str]:
+        urls = list(self.zone_list_urls)
+        urls.extend(WowZoneScraper.get_wowhead_zone_url(zone_id) for zone_id in self.zone_ids)
+        urls.extend(WowItemScraper.get_wowhead_item_url(item_id) for item_id in self.get_all_item_ids())
+        return urls
+
+    def create_report(self) -> Dict[str, List[str]]:
+        """Split the planned urls into cache hits and urls that would go to the network"""
+        report: Dict[str, List[str]] = {
+            WowCrawlPlanner.CACHE_HIT: [],
+            WowCrawlPlanner.NETWORK: [],
+            WowCrawlPlanner.UNRESOLVED_ZONES: [str(zone_id) for zone_id in self.unresolved_zone_ids],
+            WowCrawlPlanner.UNRESOLVED_ZONE_LISTS: list(self.unresolved_zone_list_urls),
+        }
+        for url in self.get_all_urls():
+            if ScrapeUtils.Html.is_cached(url):
+                report[WowCrawlPlanner.CACHE_HIT].append(url)
+            else:
+                report[WowCrawlPlanner.NETWORK].append(url)
+        return report
+
+    def print_report(self) -> None:
+        report = self.create_report()
+        cache_hits = report[WowCrawlPlanner.CACHE_HIT]
+        network = report[WowCrawlPlanner.NETWORK]
+        print(f"Info: Crawl plan has {len(cache_hits) + len(network)} urls: "
+              f"{len(cache_hits)} cache hits and {len(network)} network requests")
+        for url in network:
+            print(f"Network: {url}")
+        for url in report[WowCrawlPlanner.UNRESOLVED_ZONE_LISTS]:
+            print(f"Info: Zone ids of {url} are unknown until it is fetched")
+        for zone_id in report[WowCrawlPlanner.UNRESOLVED_ZONES]:
+            print(f"Info: Item ids for zone {zone_id} are unknown until its zone page is fetched")
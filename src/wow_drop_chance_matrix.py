@@ -0,0 +1,73 @@
+from typing import Dict, List, Optional, Set
+
+from src.wow_consts.wow_class import WowClass
+from src.wow_consts.wow_spec import WowSpec
+from src.wow_drop_chances import WowDropChanceTable
+from src.wow_item_table import WowItemTable
+from scrape_utils import ScrapeUtils
+
+class WowDropChanceMatrix:
+    """
+    Spec x boss matrix of how many different items each boss drops for each spec, built once for a
+    WowItemTable. Fills the same drop chances as WowItem.calculate_drop_chance_per_spec, by lookup,
+    straight into the drop chance table of the item table.
+    """
+
+    def __init__(self, item_table: WowItemTable):
+        self.item_table = item_table
+        self.spec_ids = WowSpec.get_all_spec_ids()
+        self.spec_abbrs = [WowSpec.get_abbr_from_id(spec_id) for spec_id in self.spec_ids]
+        self.rows_per_spec: List[Set[int]] = [] # [spec row] -> item table rows for that spec
+        self.item_counts: List[List[int]] = [] # [spec row][boss column], a boss column is its href name code
+        self._build()
+
+    def _build(self) -> None:
+        item_ids = self.item_table.item_ids
+        boss_codes = self.item_table.boss_href_names.codes
+        boss_count = len(self.item_table.boss_href_names.values)
+        for spec_id in self.spec_ids:
+            rows = self.item_table.get_rows_for_spec(spec_id)
+            self.rows_per_spec.append(set(rows))
+            # An item id seen on several rows (and bosses) counts once, for the boss of the last one seen
+            boss_per_item_id: Dict[int, int] = {}
+            for row in rows:
+                boss_per_item_id[item_ids[row]] = boss_codes[row]
+            counts = [0] * boss_count
+            for boss_code in boss_per_item_id.values():
+                counts[boss_code] += 1
+            self.item_counts.append(counts)
+
+    def fill_drop_chances(self) -> None:
+        """Set the per spec and per class drop chances of every row"""
+        with ScrapeUtils.Metrics.timer("drop_chances.fill_seconds"):
+            self._fill_drop_chances()
+
+    def _fill_drop_chances(self) -> None:
+        class_rows = [(WowDropChanceTable.COLUMN_INDICES[wow_class.get_abbr()],
+                       [self.spec_ids.index(spec_id) for spec_id in WowSpec.get_all_spec_ids_for_class(wow_class)])
+                      for wow_class in WowClass.get_all()]
+        spec_columns = [WowDropChanceTable.COLUMN_INDICES[spec_abbr] for spec_abbr in self.spec_abbrs]
+        width = len(WowDropChanceTable.COLUMNS)
+        values = self.item_table.drop_chances.values
+        boss_codes = self.item_table.boss_href_names.codes
+        for item_row in range(self.item_table.row_count):
+            offset = item_row * width
+            boss_code = boss_codes[item_row]
+            drop_chances: List[Optional[int]] = []
+            for row, spec_column in enumerate(spec_columns):
+                drop_chance: Optional[int] = 0
+                if item_row in self.rows_per_spec[row]:
+                    item_count = self.item_counts[row][boss_code]
+                    if item_count > 0:
+                        drop_chance = 100 // item_count
+                    else:
+                        previous_drop_chance = values[offset + spec_column]
+                        drop_chance = previous_drop_chance if previous_drop_chance >= 0 else None
+                        print("Error: This should not be possible!")
+                values[offset + spec_column] = drop_chance if drop_chance is not None else WowDropChanceTable.MISSING
+                drop_chances.append(drop_chance)
+            for class_column, rows in class_rows:
+                class_drop_chances = [drop_chances[row] for row in rows]
+                if None in class_drop_chances: # A spec without drop chance fails, as in WowItem.calculate_drop_chance_per_class
+                    raise KeyError(self.spec_abbrs[rows[class_drop_chances.index(None)]])
+                values[offset + class_column] = max(class_drop_chances)
@@ -0,0 +1,84 @@
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.wow_consts.wow_class import WowClass
+from src.wow_consts.wow_spec import WowSpec
+
+class WowDropChanceTable:
+    """
+    Drop chances (whole percent) of many items as one flat array: a row per item, a column per spec, then per class.
+    Items of a content group share one table, so their drop chances are a single 2-D block of bytes.
+    """
+
+    COLUMNS: List[str] = [spec.get_abbr() for spec in WowSpec.get_all()] + [wow_class.get_abbr() for wow_class in WowClass.get_all()]
+    COLUMN_INDICES: Dict[str, int] = {abbr: index for index, abbr in enumerate(COLUMNS)}
+    MISSING = -1 # Never set
+    HIDDEN = -2 # Set, but left blank in the csv because it equals the class drop chance
+
+    def __init__(self, row_count: int):
+        self.row_count = row_count
+        self.values = array('b', [WowDropChanceTable.MISSING]) * (row_count * len(WowDropChanceTable.COLUMNS))
+
+    @staticmethod
+    def share(rows: Iterable['WowDropChances']) -> List['WowDropChances']:
+        """Copy rows of any tables into one new table. Returns the new rows, in the same order"""
+        old_rows = list(rows)
+        table = WowDropChanceTable(len(old_rows))
+        width = len(WowDropChanceTable.COLUMNS)
+        new_rows: List[WowDropChances] = []
+        for row, old_row in enumerate(old_rows):
+            old_offset = old_row.row * width
+            table.values[row * width:(row + 1) * width] = old_row.table.values[old_offset:old_offset + width]
+            new_rows.append(WowDropChances(table, row))
+        return new_rows
+
+
+class WowDropChances:
+    """Drop chances (whole percent) of one item per spec and class abbr: a row of a WowDropChanceTable"""
+
+    def __init__(self, table: Optional[WowDropChanceTable] = None, row: int = 0):
+        self.table = table if table is not None else WowDropChanceTable(1)
+        self.row = row
+        self.offset = row * len(WowDropChanceTable.COLUMNS)
+
+    def __getitem__(self, abbr: str) -> int:
+        """Raises KeyError if the drop chance of abbr is not set or hidden"""
+        value = self.table.values[self.offset + WowDropChanceTable.COLUMN_INDICES[abbr]]
+        if value < 0:
+            raise KeyError(abbr)
+        return value
+
+    def __setitem__(self, abbr: str, drop_chance: int) -> None:
+        self.table.values[self.offset + WowDropChanceTable.COLUMN_INDICES[abbr]] = drop_chance
+
+    def __contains__(self, abbr: str) -> bool:
+        return self.table.values[self.offset + WowDropChanceTable.COLUMN_INDICES[abbr]] >= 0
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, WowDropChances):
+            return NotImplemented
+        return self.items() == other.items()
+
+    def get(self, abbr: str) -> Optional[int]:
+        """The drop chance of abbr, or None if it is not set or hidden"""
+        value = self.table.values[self.offset + WowDropChanceTable.COLUMN_INDICES[abbr]]
+        return value if value >= 0 else None
+
+    def hide(self, abbr: str) -> None:
+        self.table.values[self.offset + WowDropChanceTable.COLUMN_INDICES[abbr]] = WowDropChanceTable.HIDDEN
+
+    def clear(self) -> None:
+        for column in range(len(WowDropChanceTable.COLUMNS)):
+            self.table.values[self.offset + column] = WowDropChanceTable.MISSING
+
+    def items(self) -> List[Tuple[str, Optional[int]]]:
+        """Every set drop chance in column order. Hidden ones are None"""
+        items: List[Tuple[str, Optional[int]]] = []
+        for column, abbr in enumerate(WowDropChanceTable.COLUMNS):
+            value = self.table.values[self.offset + column]
+            if value != WowDropChanceTable.MISSING:
+                items.append((abbr, value if value >= 0 else None))
+        return items
+
+    def as_dict(self) -> Dict[str, Optional[int]]:
+        return dict(self.items())
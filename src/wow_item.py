@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Optional, Set, Dict, Any, List, Iterable
+from typing import Optional, Set, Dict, Any, List, Iterable, Tuple
 
 from src.wow_npc import WowNpc
 from src.wow_consts.wow_equip_type_armor import WowEquipTypeArmor
@@ -9,8 +9,10 @@ from src.wow_consts.wow_role import WowRole
 from src.wow_consts.wow_class import WowClass
 from src.wow_consts.wow_spec import WowSpec
 from src.wow_consts.wow_stat_primary import WowStatPrimary
+from src.wow_drop_chances import WowDropChances, WowDropChanceTable
 from src.wow_item_scraper import WowItemScraper
 from src.wow_item_fixer import WowItemFixer
+from src.wow_registry import WowRegistry
 
 class WowItem:
     """Represents a WoW item with data scraped from Wowhead."""
@@ -36,11 +38,13 @@ class WowItem:
     COLUMN_SPEC_IDS = 'spec_ids'
     COLUMN_SPEC_NAMES = 'spec_names'
 
+    spec_names_override: Optional[Tuple[str, ...]] = None # Set only on rows whose spec_names differ from spec_ids
+
     def __init__(self, item_id: int, scrape_from_wowhead: bool = True):
         """Initialize WowItem by scraping data via WowItemScraper"""
         self.item_id = item_id
         if scrape_from_wowhead:
-            scraper = WowItemScraper.scrape_wowhead_item(item_id)
+            scraper = WowRegistry.get_item(item_id, WowItem.json_folder) # Shared with other groups, not changed
         else:
             scraper = WowItemScraper.create_empty(item_id)
         self.name = scraper.name
@@ -54,8 +58,7 @@ class WowItem:
         self.required_level = scraper.required_level
         self.sell_price = scraper.sell_price
         self.dropped_by = scraper.dropped_by
-        self.spec_ids = scraper.spec_ids
-        self.spec_names = scraper.spec_names
+        self.spec_ids = scraper.spec_ids # Also sets spec_mask
         self.mainstat = scraper.mainstat
         self.distribution = scraper.distribution
         self.stats = scraper.stats
@@ -64,7 +67,7 @@ class WowItem:
         self.from_ = WowItem.UNINITIALIZED_VALUE # 'from' is a keyword in Python, so using 'from_'
         self.week = WowItem.UNINITIALIZED_VALUE
         self.boss = WowItem.UNINITIALIZED_VALUE
-        self.drop_chances: Dict[str, str] = {}
+        self.drop_chances = WowDropChances()
         self.check_if_any_hardcoded_values_exist_for_this_item()
         self.loot_category = self.set_loot_category()
 
@@ -94,7 +97,26 @@ class WowItem:
                     self.gear_type = WowLootCategory.get_trinket_gear_type(wow_role)
                     self.stats = WowLootCategory.get_trinket_category(self.gear_type, self.stats)
                 self.spec_ids = spec_ids
-                self.spec_names = WowItemScraper.extract_spec_names(spec_ids)
+
+    @property
+    def spec_ids(self) -> Tuple[int, ...]:
+        """The spec ids in the order of the item page, for the csv. spec_mask holds the same specs, for spec checks"""
+        return self._spec_ids
+
+    @spec_ids.setter
+    def spec_ids(self, spec_ids: Iterable[int]) -> None:
+        self._spec_ids = WowSpec.intern_spec_ids(spec_ids)
+        self.spec_mask = WowSpec.get_mask_from_spec_ids(self._spec_ids)
+
+    @property
+    def spec_names(self) -> Tuple[str, ...]:
+        """The abbrs of spec_ids, shared by every item with the same spec_ids, unless spec_names_override is set"""
+        if self.spec_names_override is not None:
+            return self.spec_names_override
+        return WowSpec.get_abbrs_from_spec_ids(self._spec_ids)
+
+    def has_spec_id(self, spec_id: int) -> bool:
+        return WowSpec.has_spec_id(self.spec_mask, spec_id)
 
     def create_csv_row_data(self) -> Dict[str, Any]:
         row_data = {
@@ -122,24 +144,21 @@ class WowItem:
             WowItem.COLUMN_SPEC_NAMES: ', '.join(map(str, self.spec_names)), #Moved to end
         }
         # Add each drop chance as a separate column
-        for key, value in self.drop_chances.items():
-            row_data[key] = value
+        for key, drop_chance in self.drop_chances.items():
+            row_data[key] = WowItem.DROP_CHANCE_REPLACEMENT if drop_chance is None else f"{drop_chance}%"
         return row_data
 
     @staticmethod
-    def get_all_items_for_spec(spec_id: int, all_items: List['WowItem']) -> Set['WowItem']:
-        items: Set['WowItem'] = set()
-        for item in all_items:
-            if not item.is_mount_or_quest_item():
-                spec_ids: List[int] = []
-                for scraped_spec_id in item.spec_ids:
-                    if isinstance(scraped_spec_id, int):
-                        spec_ids.append(scraped_spec_id)
-                    else:
-                        print(f"{scraped_spec_id} is not an int. It is type {type(scraped_spec_id)}")
-                if spec_id in spec_ids:
-                    items.add(item)
-        return items
+    def share_drop_chance_table(items: List['WowItem']) -> WowDropChanceTable:
+        """Move the drop chances of items into one table, with a row per item. Rebinds drop_chances of each item"""
+        for item, drop_chances in zip(items, WowDropChanceTable.share(item.drop_chances for item in items)):
+            item.drop_chances = drop_chances
+        return items[0].drop_chances.table if items else WowDropChanceTable(0)
+
+    @staticmethod
+    def get_all_items_for_spec(spec_id: int, all_items: List['WowItem']) -> List['WowItem']:
+        """Linear scan over all_items. Content groups look this up in their WowItemIndex instead"""
+        return [item for item in all_items if not item.is_mount_or_quest_item() and item.has_spec_id(spec_id)]
 
     @staticmethod
     def get_all_items_for_spec_and_slot(spec_id: int, slot_name: str, all_items: List['WowItem']) -> Set['WowItem']:
@@ -179,10 +198,10 @@ class WowItem:
             item_id_to_boss_mappings: Dict[int, str] = {}
             items = WowItem.get_all_items_for_spec(spec_id, all_items)
             if self not in items:
-                self.drop_chances[spec_abbr] = f"{0}%"
+                self.drop_chances[spec_abbr] = 0
             else:
                 for item in items:
-                    if spec_id in item.spec_ids:
+                    if item.has_spec_id(spec_id):
                         if not item.is_mount_or_quest_item():
                             href_name = WowNpc.convert_display_name_to_href_name(item.dropped_by)
                             item_id_to_boss_mappings[item.item_id] = href_name
@@ -197,7 +216,7 @@ class WowItem:
                 # Finally, update the drop chance of self
                 self_boss = WowNpc.convert_display_name_to_href_name(self.dropped_by)
                 if self_boss in boss_count_dict:
-                    self.drop_chances[spec_abbr] = f"{100 // boss_count_dict[self_boss]}%"
+                    self.drop_chances[spec_abbr] = 100 // boss_count_dict[self_boss]
                 else:
                     print("Error: This should not be possible!")
         self.calculate_drop_chance_per_class()
@@ -205,28 +224,15 @@ class WowItem:
     def calculate_drop_chance_per_class(self) -> None:
         for wow_class in WowClass.get_all():
             class_spec_ids = WowSpec.get_all_spec_ids_for_class(wow_class)
-            drop_chances: List[int] = []
-            for class_spec_id in class_spec_ids:
-                spec_abbr = WowSpec.get_abbr_from_id(class_spec_id)
-                drop_chance_str = self.drop_chances[spec_abbr].rstrip('%')
-                try:
-                    drop_chances.append(int(drop_chance_str))
-                except ValueError:
-                    print(f"Warning: {drop_chance_str} could not be parsed to a number")
-            self.drop_chances[wow_class.get_abbr()] = f"{max(drop_chances)}%"
+            drop_chances = [self.drop_chances[WowSpec.get_abbr_from_id(class_spec_id)] for class_spec_id in class_spec_ids]
+            self.drop_chances[wow_class.get_abbr()] = max(drop_chances)
 
     def prettify_table_by_removing_duplicate_droprates(self) -> None:
-        replacement = WowItem.DROP_CHANCE_REPLACEMENT
+        """Hide spec drop chances equal to the class drop chance. They are written as DROP_CHANCE_REPLACEMENT"""
         for spec in WowSpec.get_all():
-            wow_class = spec.get_class()
-            spec_ids_for_class = WowSpec.get_all_spec_ids_for_class(wow_class)
-            for spec_id in spec_ids_for_class:
-                class_spec = WowSpec.get_spec_from_id(spec_id)
-                if class_spec.get_abbr() in self.drop_chances:
-                    drop_chance = self.drop_chances[class_spec.get_abbr()]
-                    if not drop_chance == replacement:
-                        if self.drop_chances[wow_class.get_abbr()] == drop_chance:
-                            self.drop_chances[class_spec.get_abbr()] = replacement
+            drop_chance = self.drop_chances.get(spec.get_abbr())
+            if drop_chance is not None and self.drop_chances[spec.get_class().get_abbr()] == drop_chance:
+                self.drop_chances.hide(spec.get_abbr())
 
     def is_mount_or_quest_item(self) -> bool:
         return self.gear_slot == "" or self.gear_slot is None or self.gear_type == "Cosmetic"
@@ -250,8 +256,7 @@ class WowItem:
         specs_within_mainstat = WowSpec.get_all_spec_ids_for_mainstat(mainstat)
         for spec_id in specs_within_mainstat:
             spec = WowSpec.get_spec_from_id(spec_id)
-            drop_chance = self.drop_chances[spec.get_abbr()].rstrip('%')
-            if drop_chance == 0 or drop_chance == "0":
+            if self.drop_chances[spec.get_abbr()] == 0:
                 return False
         return True
 
@@ -259,8 +264,7 @@ class WowItem:
         specs_within_role = WowSpec.get_all_spec_ids_for_role(role)
         for spec_id in specs_within_role:
             spec = WowSpec.get_spec_from_id(spec_id)
-            drop_chance = self.drop_chances[spec.get_abbr()].rstrip('%')
-            if drop_chance == 0 or drop_chance == "0":
+            if self.drop_chances[spec.get_abbr()] == 0:
                 return False
         return True
 
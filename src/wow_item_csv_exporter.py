@@ -1,13 +1,14 @@
 import csv
-from copy import deepcopy
-from io import StringIO
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Set, Dict, List
+from typing import Any, Set, Dict, List, Optional, TextIO, Tuple
 
 from src.wow_consts.wow_class import WowClass
 from src.wow_consts.wow_loot_category import WowLootCategory
 from src.wow_consts.wow_spec import WowSpec
 from src.wow_item import WowItem
+from src.wow_item_table import WowItemTable
 from scrape_utils import ScrapeUtils
 
 class WowItemCsvExporter:
@@ -16,106 +17,165 @@ class WowItemCsvExporter:
     ALL_ITEMS_CSV_NAME = "all_items.csv"
     ALL_COLUMNS_CSV_NAME = "all_columns.csv"
 
+    MAX_WRITERS = min(8, os.cpu_count() or 1)
+
+    _LOOT_CATEGORY_ORDER: Dict[str, int] = {category.name: index for index, category in enumerate(WowLootCategory)}
+
     @staticmethod
-    def export_items_to_csv_for_all_specs_and_classes(all_items: List[WowItem], csv_path: Path) -> None:
+    def export_items_to_csv_for_all_specs_and_classes(item_table: WowItemTable, csv_path: Path, per_spec: bool = False) -> None:
+        """Write a csv per class (and per spec if per_spec) plus all_items.csv and all_columns.csv, concurrently"""
+        with ScrapeUtils.Metrics.timer("csv_exporter.export_seconds"):
+            WowItemCsvExporter._export_all_csvs(item_table, csv_path, per_spec)
+
+    @staticmethod
+    def _export_all_csvs(item_table: WowItemTable, csv_path: Path, per_spec: bool) -> None:
         all_spec_ids = WowSpec.get_all_spec_ids()
+        csv_rows = WowItemCsvExporter._create_csv_rows(item_table)
+        sorted_rows = sorted(csv_rows, key=lambda row: csv_rows[row][0]) # Shared by all files, which filter it
+        # Cell values of each row, formatted once for the spec and class files and once for all_columns.csv
+        formatted_rows = {is_all_columns: {row: WowItemCsvExporter._format_row_data(row_data, is_all_columns)
+                                           for row, (_, row_data) in csv_rows.items()}
+                          for is_all_columns in (False, True)}
+        all_columns = list(item_table.get_item(0).create_csv_row_data().keys()) if item_table.row_count else []
+        row_groups = WowItemCsvExporter._group_rows_by_spec_mask(item_table, sorted_rows)
+        positions = [0] * item_table.row_count
+        for position, row in enumerate(sorted_rows):
+            positions[row] = position
+        # (spec ids, rows, path, all columns, empty rows) per file
+        files: List[Tuple[List[int], List[int], Path, bool, bool]] = []
         for wow_class in WowClass.get_all():
             class_spec_ids = WowSpec.get_all_spec_ids_for_class(wow_class)
-            #for spec_id in class_spec_ids:
-                #file_name = f"{WowSpec.get_abbr_from_id(spec_id)}.csv"
-                #file_csv_path = csv_path / file_name
-                #WowItemCsvExporter._export_items_to_csv([spec_id], file_csv_path, all_items)
-            wow_class_csv_path = csv_path / f"{wow_class.get_abbr()}.csv"
-            WowItemCsvExporter._export_items_to_csv(class_spec_ids, wow_class_csv_path, all_items)
-        all_specs_csv_path = csv_path / WowItemCsvExporter.ALL_ITEMS_CSV_NAME
-        WowItemCsvExporter._export_items_to_csv(all_spec_ids, all_specs_csv_path, all_items, empty_rows=False)
-        all_columns_csv_path = csv_path / WowItemCsvExporter.ALL_COLUMNS_CSV_NAME
-        WowItemCsvExporter._export_items_to_csv(all_spec_ids, all_columns_csv_path, all_items, all_columns=True, empty_rows=False)
+            if per_spec:
+                for spec_id in class_spec_ids:
+                    spec_rows = WowItemCsvExporter._join_row_groups(row_groups, positions, [spec_id])
+                    files.append(([spec_id], spec_rows, csv_path / f"{WowSpec.get_abbr_from_id(spec_id)}.csv", False, True))
+            class_rows = WowItemCsvExporter._join_row_groups(row_groups, positions, class_spec_ids)
+            files.append((class_spec_ids, class_rows, csv_path / f"{wow_class.get_abbr()}.csv", False, True))
+        # Every exported row has a spec, so the aggregate files hold all of them
+        files.append((all_spec_ids, sorted_rows, csv_path / WowItemCsvExporter.ALL_ITEMS_CSV_NAME, False, False))
+        files.append((all_spec_ids, sorted_rows, csv_path / WowItemCsvExporter.ALL_COLUMNS_CSV_NAME, True, False))
+        with ThreadPoolExecutor(max_workers=WowItemCsvExporter.MAX_WRITERS) as executor:
+            futures = [executor.submit(WowItemCsvExporter._export_items_to_csv, spec_ids, rows, file_path,
+                                       formatted_rows[is_all_columns], all_columns if is_all_columns else None, empty_rows)
+                       for spec_ids, rows, file_path, is_all_columns, empty_rows in files]
+            for future in futures:
+                future.result()
 
     @staticmethod
-    def _export_items_to_csv(spec_ids: List[int], csv_path: Path, all_items: List[WowItem], all_columns: bool = False, empty_rows: bool = True) -> None:
-        original_items = set()
-        for spec_id in spec_ids:
-            original_items.update(WowItem.get_all_items_for_spec(spec_id, all_items))
-        if not original_items:
+    def _group_rows_by_spec_mask(item_table: WowItemTable, sorted_rows: List[int]) -> Dict[int, List[int]]:
+        """The rows of sorted_rows per spec mask, in their order. Items of a zone share few masks (one per armor type etc.)"""
+        row_groups: Dict[int, List[int]] = {}
+        spec_masks = item_table.spec_masks
+        for row in sorted_rows:
+            mask = spec_masks[row]
+            row_group = row_groups.get(mask)
+            if row_group is None:
+                row_group = row_groups[mask] = []
+            row_group.append(row)
+        return row_groups
+
+    @staticmethod
+    def _join_row_groups(row_groups: Dict[int, List[int]], positions: List[int], spec_ids: List[int]) -> List[int]:
+        """The rows of any of spec_ids, back in sorted order. The groups are sorted runs, which the sort merges"""
+        spec_mask = WowSpec.get_mask_from_spec_ids(spec_ids)
+        rows = [row for mask, row_group in row_groups.items() if mask & spec_mask for row in row_group]
+        rows.sort(key=positions.__getitem__)
+        return rows
+
+    @staticmethod
+    def _create_csv_rows(item_table: WowItemTable) -> Dict[int, Tuple[Tuple[Any, ...], Dict[str, Any]]]:
+        """Sort key and prettified csv row data of every exported item table row, made once for all csv files"""
+        rows = item_table.get_rows_for_specs(WowSpec.get_all_spec_ids())
+        # Row views without mounts and quest items. Views share the drop chances of item_table, so they get
+        # their own copy to prettify, which must not hide values in item_table
+        items: List[WowItem] = item_table.get_items(rows)
+        WowItem.share_drop_chance_table(items)
+        csv_rows: Dict[int, Tuple[Tuple[Any, ...], Dict[str, Any]]] = {}
+        for row, item in zip(rows, items):
+            item.prettify_table_by_removing_duplicate_droprates()
+            csv_rows[row] = (WowItemCsvExporter._get_sort_key(item), item.create_csv_row_data())
+        return csv_rows
+
+    @staticmethod
+    def _format_row_data(row_data: Dict[str, Any], all_columns: bool) -> Dict[str, Any]:
+        formatted_row_data = dict(row_data)
+        for key, value in row_data.items():
+            if isinstance(value, list):  # Convert lists to strings for CSV compatibility
+                formatted_row_data[key] = ', '.join(map(str, value))
+            # For slot statistics items, replace id with slot category name
+            if key == WowItem.COLUMN_ITEM_ID and str(value) == "0":
+                formatted_row_data[key] = ''
+            # For loot category (a.k.a. Type), dont show loot category on regular items
+            if not all_columns:
+                if key == WowItem.COLUMN_LOOT_CATEGORY and ("(" and ")") not in value:
+                    formatted_row_data[key] = ''
+        return formatted_row_data
+
+    @staticmethod
+    def _export_items_to_csv(spec_ids: List[int], sorted_rows: List[int], csv_path: Path,
+                             formatted_rows: Dict[int, Dict[str, Any]],
+                             all_columns: Optional[List[str]] = None, empty_rows: bool = True) -> None:
+        """Stream sorted_rows, the rows of spec_ids, to csv_path. all_columns replaces the spec columns"""
+        if not sorted_rows:
             print(f"Warning: No items found for csv {csv_path}. Creating CSV anyway...")
-        # Filter out mounts and quest items
-        items: Set[WowItem] = deepcopy(original_items)
-        sorted_items = WowItemCsvExporter._sort_items(items)
+        ScrapeUtils.Metrics.increment("csv_exporter.files")
+        ScrapeUtils.Metrics.increment("csv_exporter.rows", len(sorted_rows))
         columns = WowItemCsvExporter._get_columns_to_use(spec_ids)
 
-        for item in sorted_items:
-            item.prettify_table_by_removing_duplicate_droprates()
+        if all_columns is not None and len(sorted_rows) != 0:
+            columns = all_columns
+        with ScrapeUtils.Persistence.open_textfile_atomic(csv_path) as file:
+            WowItemCsvExporter._write_csv_rows(file, columns, sorted_rows, formatted_rows, empty_rows)
 
-        if all_columns and len(sorted_items) != 0:
-            row_data = all_items[0].create_csv_row_data()
-            columns = list(row_data.keys())
-        csv_content = StringIO()
-        writer = csv.DictWriter(csv_content, fieldnames=columns, lineterminator='\n')
-        writer.writeheader()
+    @staticmethod
+    def _write_csv_rows(file: TextIO, columns: List[str], sorted_rows: List[int], formatted_rows: Dict[int, Dict[str, Any]],
+                        empty_rows: bool) -> None:
+        writer = csv.writer(file, lineterminator='\n')
+        writer.writerow(columns)
+        empty_row = [''] * len(columns)
+        has_week = WowItem.COLUMN_WEEK in columns
 
         write_header_next_week = False
         previous_week = None
         counter = 0
-        for item in sorted_items:  # Write data for each item
-            # Ensure all fields are present, use empty string for missing fields
-            row_data = item.create_csv_row_data()
-            row_data = {key: row_data.get(key, '') for key in columns}
-            for key, value in row_data.items():
-                if isinstance(value, list):  # Convert lists to strings for CSV compatibility
-                    row_data[key] = ', '.join(map(str, value))
-                # For slot statistics items, replace id with slot category name
-                if key == WowItem.COLUMN_ITEM_ID and str(value) == "0":
-                    row_data[key] = ''
-                # For loot category (a.k.a. Type), dont show loot category on regular items
-                if not all_columns:
-                    if key == WowItem.COLUMN_LOOT_CATEGORY and ("(" and ")") not in value:
-                        row_data[key] = ''
-
-            current_week = row_data.get(WowItem.COLUMN_WEEK, '')
+        for row in sorted_rows:  # Write data for each item
+            row_data = formatted_rows[row]
+            current_week = row_data.get(WowItem.COLUMN_WEEK, '') if has_week else ''
             if empty_rows and previous_week is not None and current_week != previous_week:
                 # Write an empty row
-                writer.writerow({key: '' for key in columns})
+                writer.writerow(empty_row)
 
             if write_header_next_week:
                 write_header_next_week = False
-                writer.writerow({key: '' for key in columns})
-                writer.writeheader()
+                writer.writerow(empty_row)
+                writer.writerow(columns)
 
-            writer.writerow(row_data)
+            # Ensure all fields are present, use empty string for missing fields
+            writer.writerow([row_data.get(key, '') for key in columns])
             previous_week = current_week
 
-            if ('(' and ')') in row_data[WowItem.COLUMN_LOOT_CATEGORY]:
+            if ('(' and ')') in row_data.get(WowItem.COLUMN_LOOT_CATEGORY, ''):
                 counter += 1
                 if counter >= 2 and empty_rows:
                     write_header_next_week = True
                     counter = 0
 
-        ScrapeUtils.Persistence.write_textfile(csv_path, csv_content.getvalue())
-
     @staticmethod
-    def _sort_items(sorted_item_list: Set['WowItem']) -> List['WowItem']:
-        loot_category_order: Dict[str, int] = {category.name: index for index, category in enumerate(WowLootCategory)}
-
-        def get_loot_category(item: 'WowItem') -> str:
-            abbr = item.loot_category
-            if "(" and ")" in item.loot_category:
-                abbr = item.loot_category.split()[0]
-            loot_category = WowLootCategory.get_from_abbr(abbr)
-            return loot_category.name if loot_category else ''
-
-        return sorted(
-            list(sorted_item_list),
-            key=lambda x: (
-                loot_category_order.get(get_loot_category(x), len(WowLootCategory.get_all())+1),
-                x.gear_slot or '',  # sort by slot #2 prio
-                x.gear_type or '',  # sort by type #3 prio
-                x.week or '',
-                x.from_ or '',
-                x.boss or '',
-                x.name or '',
-                x.item_id or ''  # Finally sort by id to avoid random row order
-            )
+    def _get_sort_key(item: 'WowItem') -> Tuple[Any, ...]:
+        abbr = item.loot_category
+        if "(" and ")" in item.loot_category:
+            abbr = item.loot_category.split()[0]
+        loot_category = WowLootCategory.get_from_abbr(abbr)
+        loot_category_name = loot_category.name if loot_category else ''
+        return (
+            WowItemCsvExporter._LOOT_CATEGORY_ORDER.get(loot_category_name, len(WowLootCategory.get_all())+1),
+            item.gear_slot or '',  # sort by slot #2 prio
+            item.gear_type or '',  # sort by type #3 prio
+            item.week or '',
+            item.from_ or '',
+            item.boss or '',
+            item.name or '',
+            item.item_id or ''  # Finally sort by id to avoid random row order
         )
 
     @staticmethod
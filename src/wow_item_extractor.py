@@ -0,0 +1,149 @@
+import re
+from typing import Dict, List, Pattern
+
+from src.wow_consts.wow_stat_primary import WowStatPrimary
+from src.wow_consts.wow_stat_secondary import WowStatSecondary
+
+class WowItemExtractor:
+    """
+    Extracts every WowItemScraper field from an item page in a single pass.
+    One precompiled scanner stops only where a field can start (the literal prefix of its pattern),
+    and the field's own precompiled pattern is matched there. The first position where a field's
+    pattern matches is the one re.search would find, so results equal the per-field extract_* methods.
+    """
+
+    UNKNOWN_VALUE = ""
+    BINDS_WHEN_PICKED_UP = "Binds when picked up"
+    UNIQUE_EQUIPPED = "Unique-Equipped"
+    VALID_ONLY_FOR_TANK_SPECS = "Valid only for tank specializations."
+
+    _NAME = re.compile(r'<h1 class="heading-size-1">(.*?)</h1>')
+    _ITEM_LEVEL = re.compile(r'Item Level <!--ilvl-->(\d+)')
+    _GEAR_SLOT = re.compile(r'<table width="100%"><tr><td>(.*?)</td>')
+    _GEAR_TYPE = re.compile(r'<table width="100%"><tr><td>[^<]+</td><th><!--scstart\d+:\d+--><span class="q1">([^<]+)</span><!--scend--></th></tr></table>')
+    _REQUIRED_LEVEL = re.compile(r'Requires Level <!--rlvl-->(\d+)')
+    _MONEY: Dict[str, Pattern[str]] = {
+        coin: re.compile(rf'<span class="money{coin}">(\d+)</span>') for coin in ("gold", "silver", "copper")
+    }
+    _DROPPED_BY = re.compile(r'Dropped by: (.*?)</div>')
+    _SPEC_ID = re.compile(r'<div class="iconsmall spec(\d+)"')
+    _PRIMARY_STATS: Dict[str, Pattern[str]] = {
+        stat: re.compile(rf'\+([0-9,]+) \[?([^\]]*{stat}[^\]]*)\]?') for stat in WowStatPrimary.get_all_ingame_names()
+    }
+    _SECONDARY_STATS: Dict[str, str] = { # Scanner group name -> stat. Values match r'([0-9,]+)\s+{stat}'
+        f"secondary{index}": stat for index, stat in enumerate(WowStatSecondary.get_all_ingame_names())
+    }
+    _DIGITS_AND_COMMAS = frozenset("0123456789,")
+
+    # Every branch consumes only the first character of its anchor and looks ahead for the rest, so no
+    # anchor hides another. Starting every branch with a literal lets re skip to candidate characters quickly.
+    # Secondary stats are anchored on the stat name, since their value is in front of it.
+    _SCANNER = re.compile('|'.join([
+        r'<(?=(?P<name>h1 class="heading-size-1">))',
+        r'I(?=(?P<item_level>tem Level <!--ilvl-->))',
+        r'<(?=(?P<table>table width="100%"><tr><td>))',
+        r'R(?=(?P<required_level>equires Level <!--rlvl-->))',
+        r'<(?=(?P<money>span class="money))',
+        r'D(?=(?P<dropped_by>ropped by: ))',
+        r'<(?=(?P<spec_id>div class="iconsmall spec))',
+        rf'B(?=(?P<bind>{re.escape(BINDS_WHEN_PICKED_UP[1:])}))',
+        rf'U(?=(?P<unique>{re.escape(UNIQUE_EQUIPPED[1:])}))',
+        rf'V(?=(?P<tank>{re.escape(VALID_ONLY_FOR_TANK_SPECS[1:])}))',
+        r'\+(?=(?P<primary>[0-9,]+ ))',
+    ] + [
+        rf'{re.escape(stat[0])}(?=(?P<{group}>{re.escape(stat[1:])}))' for group, stat in _SECONDARY_STATS.items()
+    ]))
+
+    def __init__(self, html_string: str):
+        self.name = WowItemExtractor.UNKNOWN_VALUE
+        self.item_level = WowItemExtractor.UNKNOWN_VALUE
+        self.gear_slot = WowItemExtractor.UNKNOWN_VALUE
+        self.gear_type = WowItemExtractor.UNKNOWN_VALUE
+        self.required_level = WowItemExtractor.UNKNOWN_VALUE
+        self.money: Dict[str, str] = {}
+        self.dropped_by = WowItemExtractor.UNKNOWN_VALUE
+        self.spec_ids: List[int] = []
+        self.is_soulbound = False
+        self.is_unique = False
+        self.is_valid_only_for_tanks = False
+        self.primary_stats: Dict[str, int] = {}
+        self.secondary_stats: Dict[str, int] = {}
+        self._scan(html_string)
+
+    def _scan(self, html: str) -> None:
+        found_name = found_item_level = found_gear_slot = found_gear_type = False
+        found_required_level = found_dropped_by = False
+        primary_values: Dict[str, int] = {}
+        secondary_values: Dict[str, int] = {}
+        for anchor in WowItemExtractor._SCANNER.finditer(html):
+            kind = anchor.lastgroup
+            pos = anchor.start()
+            if kind == "primary":
+                for stat, pattern in WowItemExtractor._PRIMARY_STATS.items():
+                    if stat not in primary_values:
+                        match = pattern.match(html, pos)
+                        if match:
+                            primary_values[stat] = int(match.group(1).replace(',', ''))
+            elif kind in WowItemExtractor._SECONDARY_STATS:
+                stat = WowItemExtractor._SECONDARY_STATS[kind]
+                if stat not in secondary_values:
+                    value = WowItemExtractor._read_value_in_front_of(html, pos)
+                    if value:
+                        secondary_values[stat] = int(value.replace(',', ''))
+            elif kind == "spec_id":
+                match = WowItemExtractor._SPEC_ID.match(html, pos)
+                if match:
+                    self.spec_ids.append(int(match.group(1)))
+            elif kind == "table":
+                if not found_gear_slot:
+                    match = WowItemExtractor._GEAR_SLOT.match(html, pos)
+                    if match:
+                        self.gear_slot, found_gear_slot = match.group(1), True
+                if not found_gear_type:
+                    match = WowItemExtractor._GEAR_TYPE.match(html, pos)
+                    if match:
+                        self.gear_type, found_gear_type = match.group(1), True
+            elif kind == "money":
+                for coin, pattern in WowItemExtractor._MONEY.items():
+                    if coin not in self.money:
+                        match = pattern.match(html, pos)
+                        if match:
+                            self.money[coin] = match.group(1)
+            elif kind == "name" and not found_name:
+                match = WowItemExtractor._NAME.match(html, pos)
+                if match:
+                    self.name, found_name = match.group(1), True
+            elif kind == "item_level" and not found_item_level:
+                match = WowItemExtractor._ITEM_LEVEL.match(html, pos)
+                if match:
+                    self.item_level, found_item_level = match.group(1), True
+            elif kind == "required_level" and not found_required_level:
+                match = WowItemExtractor._REQUIRED_LEVEL.match(html, pos)
+                if match:
+                    self.required_level, found_required_level = match.group(1), True
+            elif kind == "dropped_by" and not found_dropped_by:
+                match = WowItemExtractor._DROPPED_BY.match(html, pos)
+                if match:
+                    self.dropped_by, found_dropped_by = match.group(1), True
+            elif kind == "bind":
+                self.is_soulbound = True
+            elif kind == "unique":
+                self.is_unique = True
+            elif kind == "tank":
+                self.is_valid_only_for_tanks = True
+        # Same key order as the per-stat loops in WowItemScraper
+        self.primary_stats = {stat: primary_values[stat] for stat in WowItemExtractor._PRIMARY_STATS if stat in primary_values}
+        self.secondary_stats = {stat: secondary_values[stat] for stat in WowItemExtractor._SECONDARY_STATS.values() if stat in secondary_values}
+
+    @staticmethod
+    def _read_value_in_front_of(html: str, pos: int) -> str:
+        """Return the [0-9,]+ run that is separated from html[pos] by whitespace, or "" if there is none"""
+        value_end = pos
+        while value_end > 0 and html[value_end - 1].isspace():
+            value_end -= 1
+        if value_end == pos:
+            return WowItemExtractor.UNKNOWN_VALUE
+        value_start = value_end
+        while value_start > 0 and html[value_start - 1] in WowItemExtractor._DIGITS_AND_COMMAS:
+            value_start -= 1
+        return html[value_start:value_end]
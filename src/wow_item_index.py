@@ -0,0 +1,71 @@
+from typing import Dict, Iterable, List, Set
+
+from src.wow_consts.wow_spec import WowSpec
+from src.wow_item import WowItem
+from src.wow_npc import WowNpc
+
+class WowItemIndex:
+    """
+    Items of a content group indexed by spec id, gear slot, loot category, boss and zone.
+    Every lookup returns items in the order they were added, so results (and sorting ties) are reproducible.
+    """
+
+    def __init__(self, items: Iterable[WowItem] = ()):
+        self.all_items: List[WowItem] = []
+        self._indexed_item_ids: Set[int] = set() # id() of every indexed item
+        self._items_by_spec: Dict[int, List[WowItem]] = {}
+        self._items_by_gear_slot: Dict[str, List[WowItem]] = {}
+        self._items_by_loot_category: Dict[str, List[WowItem]] = {}
+        self._items_by_boss: Dict[str, List[WowItem]] = {} # Keyed by href name, as bosses are matched elsewhere
+        self._items_by_zone: Dict[str, List[WowItem]] = {}
+        self._href_names: Dict[str, str] = {}
+        self.add_items(items)
+
+    def add_items(self, items: Iterable[WowItem]) -> None:
+        """Index items that are not indexed yet"""
+        for item in items:
+            if id(item) in self._indexed_item_ids:
+                continue
+            self._indexed_item_ids.add(id(item))
+            self.all_items.append(item)
+            self._items_by_gear_slot.setdefault(item.gear_slot, []).append(item)
+            self._items_by_loot_category.setdefault(item.loot_category, []).append(item)
+            self._items_by_boss.setdefault(self.get_boss_href_name(item), []).append(item)
+            self._items_by_zone.setdefault(item.dropped_in, []).append(item)
+            if item.is_mount_or_quest_item():
+                continue
+            for spec_id in WowSpec.get_spec_ids_from_mask(item.spec_mask):
+                self._items_by_spec.setdefault(spec_id, []).append(item)
+
+    def get_items_for_spec(self, spec_id: int) -> List[WowItem]:
+        """Same items as WowItem.get_all_items_for_spec: no mounts or quest items"""
+        return list(self._items_by_spec.get(spec_id, []))
+
+    def get_items_for_specs(self, spec_ids: Iterable[int]) -> List[WowItem]:
+        """Items for any of spec_ids, each item once"""
+        items: Dict[int, WowItem] = {}
+        for spec_id in spec_ids:
+            for item in self._items_by_spec.get(spec_id, []):
+                items.setdefault(id(item), item)
+        return list(items.values())
+
+    def get_items_for_spec_and_gear_slot(self, spec_id: int, gear_slot: str) -> List[WowItem]:
+        return [item for item in self._items_by_spec.get(spec_id, []) if item.gear_slot == gear_slot]
+
+    def get_items_for_gear_slot(self, gear_slot: str) -> List[WowItem]:
+        return list(self._items_by_gear_slot.get(gear_slot, []))
+
+    def get_items_for_loot_category(self, loot_category: str) -> List[WowItem]:
+        return list(self._items_by_loot_category.get(loot_category, []))
+
+    def get_items_for_boss(self, boss_name: str) -> List[WowItem]:
+        """Items dropped by boss_name, given as display or href name"""
+        return list(self._items_by_boss.get(WowNpc.convert_display_name_to_href_name(boss_name), []))
+
+    def get_items_for_zone(self, zone_name: str) -> List[WowItem]:
+        return list(self._items_by_zone.get(zone_name, []))
+
+    def get_boss_href_name(self, item: WowItem) -> str:
+        if item.dropped_by not in self._href_names:
+            self._href_names[item.dropped_by] = WowNpc.convert_display_name_to_href_name(item.dropped_by)
+        return self._href_names[item.dropped_by]
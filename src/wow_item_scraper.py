@@ -1,5 +1,5 @@
 import re
-from typing import Dict, List, Set, Optional
+from typing import Any, Dict, List, Set, Optional
 
 from src.wow_consts.wow_loot_category import WowLootCategory
 from src.wow_consts.wow_equip_slot import WowEquipSlot
@@ -7,31 +7,48 @@ from src.wow_consts.wow_role import WowRole
 from src.wow_consts.wow_spec import WowSpec
 from src.wow_consts.wow_stat_primary import WowStatPrimary
 from src.wow_consts.wow_stat_secondary import WowStatSecondary
+from src.wow_item_extractor import WowItemExtractor
 from scrape_utils import ScrapeUtils
 
 class WowItemScraper:
     """Scrapes data from Wowhead for specified WowZone"""
 
     UNKNOWN_VALUE = ""
-    VALID_ONLY_FOR_TANK_SPECS = "Valid only for tank specializations."
+    VALID_ONLY_FOR_TANK_SPECS = WowItemExtractor.VALID_ONLY_FOR_TANK_SPECS
+
+    # Bump PARSER_VERSION whenever a change to the parsing changes any field, so WowItemStore re-parses
+    PARSER_VERSION = 1
+    FIELDS = ["name", "item_level", "bind", "gear_slot", "gear_type", "unique", "primary_stats", "secondary_stats",
+              "required_level", "sell_price", "dropped_by", "spec_ids", "mainstat", "distribution",
+              "stats", "is_valid_only_for_tanks"]
+
+    _is_trimmer_ruleset_registered = False
+    feature_flag_single_pass_extractor = True # False runs one regex search per field (the extract_* methods)
 
     def __init__(self, item_id: int, html_string: str):
         """Scrape wowhead data for zone_id"""
+        with ScrapeUtils.Metrics.timer("item_scraper.parse_seconds"):
+            self._parse(item_id, html_string)
+
+    def _parse(self, item_id: int, html_string: str) -> None:
         self.item_id = item_id
         self.html_string = html_string
-        self.name = self.extract_name()
-        self.item_level = self.extract_item_level()
-        self.bind = self.extract_bind()
-        self.gear_slot = self.extract_gear_slot()
-        self.gear_type = self.extract_gear_type()
-        self.unique = self.extract_unique()
-        self.primary_stats = self.extract_primary_stats()
-        self.secondary_stats = self.extract_secondary_stats()
-        self.required_level = self.extract_required_level()
-        self.sell_price = self.extract_sell_price()
-        self.dropped_by = self.extract_dropped_by()
-        self.spec_ids = self.extract_spec_ids()
-        self.spec_names = self.extract_spec_names(self.spec_ids)
+        if WowItemScraper.feature_flag_single_pass_extractor:
+            self.extract_all_in_single_pass()
+        else:
+            self.name = self.extract_name()
+            self.item_level = self.extract_item_level()
+            self.bind = self.extract_bind()
+            self.gear_slot = self.extract_gear_slot()
+            self.gear_type = self.extract_gear_type()
+            self.unique = self.extract_unique()
+            self.primary_stats = self.extract_primary_stats()
+            self.secondary_stats = self.extract_secondary_stats()
+            self.required_level = self.extract_required_level()
+            self.sell_price = self.extract_sell_price()
+            self.dropped_by = self.extract_dropped_by()
+            self.spec_ids = self.extract_spec_ids()
+            self.is_valid_only_for_tanks = WowItemScraper.VALID_ONLY_FOR_TANK_SPECS in self.html_string
         self.mainstat = self.extract_mainstat()
         self.distribution = self.extract_distribution()
         self.stats = self.extract_stats()
@@ -42,31 +59,82 @@ class WowItemScraper:
         empty_html = ""
         return WowItemScraper(item_id, empty_html)
 
+    @classmethod
+    def create_from_fields(cls, item_id: int, html_string: str, fields: Dict[str, Any]) -> 'WowItemScraper':
+        """Recreate a scraper from fields returned by get_fields, without parsing html_string"""
+        scraper = cls.__new__(cls)
+        scraper.item_id = item_id
+        scraper.html_string = html_string
+        for field in WowItemScraper.FIELDS:
+            setattr(scraper, field, fields[field])
+        return scraper
+
+    def get_fields(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in WowItemScraper.FIELDS}
+
     @staticmethod
     def scrape_wowhead_item(item_id: int) -> 'WowItemScraper':
         """Scrape zone data from Wowhead and save it."""
+        html_content = WowItemScraper.fetch_wowhead_item_html(item_id)
+        return WowItemScraper(item_id, html_content)
+
+    @staticmethod
+    def fetch_wowhead_item_html(item_id: int) -> str:
+        """Fetch the trimmed html of an item page, from the webcache if it is there. Empty if the page could not be fetched."""
         WowItemScraper._set_trimmer_ruleset_for_wowhead_item()
-        url = f"https://www.wowhead.com/item={item_id}"
+        url = WowItemScraper.get_wowhead_item_url(item_id)
         html_content = ScrapeUtils.Html.fetch_url(url)
         if len(html_content) == 0:
             print(f"Warning: html_content is Empty for item_id {item_id}")
-        return WowItemScraper(item_id, html_content)
+        return html_content
+
+    @staticmethod
+    def prefetch_wowhead_items(item_ids: List[int]) -> None:
+        """Fetch the html of several items as one concurrent batch, so scraping them hits the cache."""
+        WowItemScraper._set_trimmer_ruleset_for_wowhead_item()
+        urls = [WowItemScraper.get_wowhead_item_url(item_id) for item_id in item_ids]
+        ScrapeUtils.Html.fetch_urls(urls)
+
+    @staticmethod
+    def get_wowhead_item_url(item_id: int) -> str:
+        """Url of a wowhead item page. It is also the webcache key of the page."""
+        return f"https://www.wowhead.com/item={item_id}"
 
     @staticmethod
     def _set_trimmer_ruleset_for_wowhead_item() -> None:
         """In ScrapeUtils.Trimmer, register trimming ruleset for wowhead.com/item"""
+        if WowItemScraper._is_trimmer_ruleset_registered:
+            return
         target_url = "wowhead.com/item="
         html_start = '<h1 class="heading-size-1">'
         html_end = '<h2 class="heading-size-2 clear">Related</h2></div>'
         ScrapeUtils.Trimmer.register_trimming_ruleset(target_url, html_start, html_end)
+        WowItemScraper._is_trimmer_ruleset_registered = True
+
+    def extract_all_in_single_pass(self) -> None:
+        """Fill the same fields as the extract_* methods, with one WowItemExtractor pass over the html"""
+        extractor = WowItemExtractor(self.html_string)
+        self.name = extractor.name
+        self.item_level = int(extractor.item_level) if extractor.item_level else 0
+        self.bind = "Soulbound" if extractor.is_soulbound else "BoE"
+        self.gear_slot = extractor.gear_slot
+        self.gear_type = extractor.gear_type
+        self.unique = extractor.is_unique
+        self.primary_stats = extractor.primary_stats
+        self.secondary_stats = extractor.secondary_stats
+        self.required_level = int(extractor.required_level) if extractor.required_level else 0
+        gold, silver, copper = (extractor.money.get(coin) for coin in ("gold", "silver", "copper"))
+        self.sell_price = f"{gold or 0} gold, {silver or 0} silver, {copper or 0} copper"
+        self.dropped_by = extractor.dropped_by
+        self.spec_ids = extractor.spec_ids if extractor.spec_ids else WowSpec.get_all_spec_ids()
+        self.is_valid_only_for_tanks = extractor.is_valid_only_for_tanks
 
     def check_if_trinket_is_valid_only_for_tanks(self) -> None:
-        if WowItemScraper.VALID_ONLY_FOR_TANK_SPECS not in self.html_string:
+        if not self.is_valid_only_for_tanks:
             if self.gear_slot == WowEquipSlot.TRINKET.get_ingame_name():
                 self.gear_type = WowLootCategory.get_trinket_gear_type()
         else:
             self.spec_ids = WowSpec.get_all_spec_ids_for_role(WowRole.TANK)
-            self.spec_names = WowItemScraper.extract_spec_names(self.spec_ids)
             self.gear_type = WowLootCategory.get_trinket_gear_type(WowRole.TANK)
             self.stats = WowLootCategory.get_trinket_category(self.gear_type, self.stats)
             if self.gear_slot != WowEquipSlot.TRINKET.get_ingame_name():
@@ -138,10 +206,6 @@ class WowItemScraper:
             spec_ids.append(int(match))
         return spec_ids if spec_ids else WowSpec.get_all_spec_ids()
 
-    @staticmethod
-    def extract_spec_names(spec_ids: List[int]) -> List[str]:
-        return [WowSpec.get_abbr_from_id(spec_id) for spec_id in spec_ids]
-
     def extract_mainstat(self) -> str:
         primary_stats = self.primary_stats.keys()
         all_stats = {WowStatPrimary.AGI.get_ingame_name(), WowStatPrimary.STR.get_ingame_name(), WowStatPrimary.INT.get_ingame_name()}
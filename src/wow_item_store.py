@@ -0,0 +1,55 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.wow_item_scraper import WowItemScraper
+from scrape_utils import ScrapeUtils
+
+class WowItemStore:
+    """
+    Parsed WowItemScraper fields, stored as one compact JSON record per item.
+    A record is only used if it was parsed from the same trimmed html by the same parser version.
+    """
+
+    enabled: bool = True
+
+    @staticmethod
+    def load_or_scrape(item_id: int, folder: Path) -> WowItemScraper:
+        """Fetch the item page and return its stored fields, or parse the page and store them"""
+        html_content = WowItemScraper.fetch_wowhead_item_html(item_id)
+        if not WowItemStore.enabled or not html_content:
+            return WowItemScraper(item_id, html_content)
+        html_hash = WowItemStore.hash_html(html_content)
+        record = WowItemStore.read_record(item_id, folder)
+        if record is not None and record.get("html_hash") == html_hash \
+                and record.get("parser_version") == WowItemScraper.PARSER_VERSION:
+            return WowItemScraper.create_from_fields(item_id, html_content, record["fields"])
+        scraper = WowItemScraper(item_id, html_content)
+        WowItemStore.write_record(item_id, folder, html_hash, scraper.get_fields())
+        return scraper
+
+    @staticmethod
+    def read_record(item_id: int, folder: Path) -> Optional[Dict[str, Any]]:
+        json_str = ScrapeUtils.Persistence.read_textfile(WowItemStore._get_path(item_id, folder), missing_ok=True)
+        if not json_str:
+            return None
+        try:
+            return json.loads(json_str)
+        except json.JSONDecodeError:
+            print(f"Warning: Stored record for item_id {item_id} is corrupt and will be replaced")
+            return None
+
+    @staticmethod
+    def write_record(item_id: int, folder: Path, html_hash: str, fields: Dict[str, Any]) -> None:
+        record = {"parser_version": WowItemScraper.PARSER_VERSION, "html_hash": html_hash, "fields": fields}
+        json_str = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+        ScrapeUtils.Persistence.write_textfile(WowItemStore._get_path(item_id, folder), json_str)
+
+    @staticmethod
+    def hash_html(html_content: str) -> str:
+        return hashlib.sha1(html_content.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _get_path(item_id: int, folder: Path) -> Path:
+        return folder / f"item_{item_id}.json"
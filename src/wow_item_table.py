@@ -0,0 +1,139 @@
+from array import array
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from src.wow_consts.wow_equip_slot import WowEquipSlot
+from src.wow_consts.wow_loot_category import WowLootCategory
+from src.wow_consts.wow_role import WowRole
+from src.wow_consts.wow_spec import WowSpec
+from src.wow_consts.wow_stat_primary import WowStatPrimary
+from src.wow_drop_chances import WowDropChances, WowDropChanceTable
+from src.wow_item import WowItem
+from src.wow_npc import WowNpc
+
+class _InternedColumn:
+    """A column storing each distinct value once, and a code per row"""
+
+    def __init__(self):
+        self.codes = array('I')
+        self.values: List[Hashable] = []
+        self._codes_by_value: Dict[Hashable, int] = {}
+
+    def append(self, value: Hashable) -> None:
+        code = self._codes_by_value.get(value)
+        if code is None:
+            code = self._codes_by_value[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def get_code(self, value: Hashable) -> Optional[int]:
+        return self._codes_by_value.get(value)
+
+    def __getitem__(self, row: int) -> Any:
+        return self.values[self.codes[row]]
+
+
+class WowItemTable:
+    """
+    Columnar (struct-of-arrays) form of a group of WowItems, for drop chance calculation, simming and export.
+    Repeated values are interned per column and drop chances are one WowDropChanceTable, which the items share:
+    their drop_chances become rows of this table. get_item() gives WowItem row views for existing callers.
+    """
+
+    INTERNED_COLUMNS = ["name", "item_level", "bind", "gear_slot", "gear_type", "unique", "required_level", "sell_price",
+                        "dropped_by", "mainstat", "distribution", "stats", "dropped_in", "from_", "week", "boss", "loot_category"]
+    LIST_COLUMNS = ["spec_ids"] # Interned as tuples, given to row views as lists. Row views derive spec_names from them
+    SHARED_COLUMNS = ["primary_stats", "secondary_stats"] # Dicts, shared with the row views as they are
+
+    def __init__(self, items: Iterable[WowItem] = ()):
+        """
+        Rebinds the drop_chances of every item in items to its row of self.drop_chances, so the items see
+        what is filled in here. Their values are copied in: tables built earlier from the same items keep theirs
+        """
+        all_items = list(items)
+        self.row_count = len(all_items)
+        self.item_ids = array('q', [item.item_id for item in all_items])
+        self.spec_masks = array('Q', [item.spec_mask for item in all_items])
+        self.columns: Dict[str, _InternedColumn] = {name: _InternedColumn() for name in WowItemTable.INTERNED_COLUMNS + WowItemTable.LIST_COLUMNS}
+        self.shared_columns: Dict[str, List[Any]] = {name: [] for name in WowItemTable.SHARED_COLUMNS}
+        self.boss_href_names = _InternedColumn() # Bosses are matched by href name, as in WowItemIndex
+        self.spec_names_overrides: Dict[int, Tuple[str, ...]] = {} # Only the rows with WowItem.spec_names_override
+        self._rows_by_spec: Dict[int, List[int]] = {}
+        href_names: Dict[str, str] = {}
+        for row, item in enumerate(all_items):
+            for name in WowItemTable.INTERNED_COLUMNS:
+                self.columns[name].append(getattr(item, name))
+            for name in WowItemTable.LIST_COLUMNS:
+                self.columns[name].append(tuple(getattr(item, name)))
+            for name in WowItemTable.SHARED_COLUMNS:
+                self.shared_columns[name].append(getattr(item, name))
+            if item.spec_names_override is not None:
+                self.spec_names_overrides[row] = item.spec_names_override
+            if item.dropped_by not in href_names:
+                href_names[item.dropped_by] = WowNpc.convert_display_name_to_href_name(item.dropped_by)
+            self.boss_href_names.append(href_names[item.dropped_by])
+            if self.is_mount_or_quest_item(row):
+                continue
+            for spec_id in WowSpec.get_spec_ids_from_mask(item.spec_mask):
+                self._rows_by_spec.setdefault(spec_id, []).append(row)
+        self.drop_chances = WowItem.share_drop_chance_table(all_items)
+
+    def get_item(self, row: int) -> WowItem:
+        """A WowItem view of a row. Its drop_chances are the row of this table, other fields are copies"""
+        item = WowItem.__new__(WowItem)
+        item.item_id = self.item_ids[row]
+        for name in WowItemTable.INTERNED_COLUMNS:
+            setattr(item, name, self.columns[name][row])
+        for name in WowItemTable.LIST_COLUMNS: # Setting spec_ids also sets spec_mask
+            setattr(item, name, list(self.columns[name][row]))
+        for name in WowItemTable.SHARED_COLUMNS:
+            setattr(item, name, self.shared_columns[name][row])
+        if row in self.spec_names_overrides:
+            item.spec_names_override = self.spec_names_overrides[row]
+        item.drop_chances = WowDropChances(self.drop_chances, row)
+        return item
+
+    def get_items(self, rows: Iterable[int]) -> List[WowItem]:
+        return [self.get_item(row) for row in rows]
+
+    def get_rows_for_spec(self, spec_id: int) -> List[int]:
+        """Same rows as WowItemIndex.get_items_for_spec: no mounts or quest items"""
+        return list(self._rows_by_spec.get(spec_id, []))
+
+    def get_rows_for_specs(self, spec_ids: Iterable[int]) -> List[int]:
+        """Rows for any of spec_ids, each row once, in the order of WowItemIndex.get_items_for_specs"""
+        rows: Dict[int, None] = {}
+        for spec_id in spec_ids:
+            for row in self._rows_by_spec.get(spec_id, []):
+                rows.setdefault(row)
+        return list(rows)
+
+    def get_rows_for_spec_and_gear_slot(self, spec_id: int, gear_slot: str) -> List[int]:
+        gear_slot_code = self.columns["gear_slot"].get_code(gear_slot)
+        if gear_slot_code is None:
+            return []
+        gear_slot_codes = self.columns["gear_slot"].codes
+        return [row for row in self._rows_by_spec.get(spec_id, []) if gear_slot_codes[row] == gear_slot_code]
+
+    def is_mount_or_quest_item(self, row: int) -> bool:
+        """Same as WowItem.is_mount_or_quest_item"""
+        gear_slot = self.columns["gear_slot"][row]
+        return gear_slot == "" or gear_slot is None or self.columns["gear_type"][row] == "Cosmetic"
+
+    def has_mainstat(self, row: int, mainstat: Optional[WowStatPrimary]) -> bool:
+        """Same as WowItem.has_mainstat"""
+        if mainstat is not None:
+            return mainstat.get_ingame_name() in self.shared_columns["primary_stats"][row]
+        return False
+
+    def has_role(self, row: int, role: Optional[WowRole]) -> bool:
+        """Same as WowItem.has_role"""
+        if self.columns["gear_slot"][row] == WowEquipSlot.TRINKET.get_ingame_name():
+            return WowLootCategory.get_trinket_gear_type(role) == self.columns["gear_type"][row]
+        return False
+
+    def get_drop_chance(self, row: int, abbr: str) -> int:
+        """Raises KeyError if the drop chance of abbr is not set"""
+        drop_chance = self.drop_chances.values[row * len(WowDropChanceTable.COLUMNS) + WowDropChanceTable.COLUMN_INDICES[abbr]]
+        if drop_chance < 0:
+            raise KeyError(abbr)
+        return drop_chance
@@ -0,0 +1,61 @@
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from src.wow_item_scraper import WowItemScraper
+from src.wow_item_store import WowItemStore
+from src.wow_zone_scraper import WowZoneScraper
+
+class WowRegistry:
+    """
+    Process-wide identity map of parsed Wowhead pages: one WowZoneScraper per zone id and one WowItemScraper
+    per item id, shared by every content group. The WowZone and WowItem objects of a group are its overlay:
+    they copy these records and add the group state (week, boss, drop chances), so records are never changed.
+    """
+
+    enabled: bool = True
+
+    _lock = threading.Lock()
+    _zones: Dict[int, WowZoneScraper] = {}
+    _items: Dict[int, WowItemScraper] = {}
+
+    @staticmethod
+    def get_zone(zone_id: int, html_content: Optional[str] = None) -> WowZoneScraper:
+        """The parsed zone page, parsed from html_content (or fetched) the first time zone_id is asked for"""
+        with WowRegistry._lock:
+            scraper = WowRegistry._zones.get(zone_id)
+        if scraper is not None:
+            return scraper
+        if html_content is None:
+            scraper = WowZoneScraper.scrape_wowhead_zone(zone_id)
+        else:
+            scraper = WowZoneScraper(zone_id, html_content)
+        if not WowRegistry.enabled:
+            return scraper
+        with WowRegistry._lock:
+            return WowRegistry._zones.setdefault(zone_id, scraper) # Another thread may have parsed it first
+
+    @staticmethod
+    def get_item(item_id: int, folder: Path) -> WowItemScraper:
+        """The parsed item page, loaded from WowItemStore (or parsed) the first time item_id is asked for"""
+        with WowRegistry._lock:
+            scraper = WowRegistry._items.get(item_id)
+        if scraper is not None:
+            return scraper
+        scraper = WowItemStore.load_or_scrape(item_id, folder)
+        if not WowRegistry.enabled:
+            return scraper
+        with WowRegistry._lock:
+            return WowRegistry._items.setdefault(item_id, scraper)
+
+    @staticmethod
+    def get_missing_item_ids(item_ids: Iterable[int]) -> List[int]:
+        """The item_ids without a record yet, which are the only ones worth prefetching"""
+        with WowRegistry._lock:
+            return [item_id for item_id in item_ids if item_id not in WowRegistry._items]
+
+    @staticmethod
+    def clear() -> None:
+        with WowRegistry._lock:
+            WowRegistry._zones.clear()
+            WowRegistry._items.clear()
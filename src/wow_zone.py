@@ -3,7 +3,8 @@ from typing import List, Dict
 
 from src.wow_npc import WowNpc
 from src.wow_item import WowItem
-from src.wow_zone_scraper import WowZoneScraper
+from src.wow_item_scraper import WowItemScraper
+from src.wow_registry import WowRegistry
 from src.wow_zone_fixer import WowZoneFixer
 
 class WowZone:
@@ -12,15 +13,15 @@ class WowZone:
     folder: Path = Path.cwd() / "output" / "wowhead_zones"
 
     def __init__(self, zone_id: int):
-        """Initialize WowZone by scraping data via WowZoneScraper"""
+        """Initialize WowZone from the WowZoneScraper of WowRegistry, which other groups share"""
         self.zone_id = zone_id
-        scraper = WowZoneScraper.scrape_wowhead_zone(zone_id)
+        scraper = WowRegistry.get_zone(zone_id)
         self.zone_name = scraper.zone_name
         self.shortened_zone_name = WowZone.shorten_zone_name(scraper.zone_name)
-        self.bosses: List[WowNpc] = scraper.bosses
+        self.bosses: List[WowNpc] = list(scraper.bosses)
         self.week: str = WowZoneFixer.get_release_week(zone_id)
         self.wow_items: List[WowItem] = []
-        self.item_ids = scraper.item_ids
+        self.item_ids = list(scraper.item_ids)
         self.check_if_any_hardcoded_values_exist_for_this_zone()
         self.cascade_scrape_items(self.item_ids)
 
@@ -37,6 +38,7 @@ class WowZone:
         """Scrape and initialize wow_items for the provided item_ids"""
         self.print_extracted_info()
         self.wow_items.clear()
+        WowItemScraper.prefetch_wowhead_items(WowRegistry.get_missing_item_ids(item_ids))
         for item_id in item_ids:
             wow_item = WowItem(item_id)
             wow_item.add_zone_data_to_item(self.zone_name, self.shortened_zone_name, self.week, self.bosses)
@@ -49,39 +51,36 @@ class WowZone:
 
     def get_all_wow_items(self) -> List[WowItem]:
         """Get the item_id for each WowItem in this zone """
-        all_item_ids = []
-        for wow_item in self.wow_items:
-            all_item_ids.append(wow_item)
-        return list(set(all_item_ids))
+        return list(dict.fromkeys(self.wow_items))
 
     def get_boss_position(self, boss_name: str) -> str:
         return WowNpc.get_boss_position(boss_name, self.bosses)
 
-    def validate_that_each_boss_has_loot(self, all_items: List[WowItem]) -> None:
+    def validate_that_each_boss_has_loot(self, zone_items: List[WowItem]) -> None:
+        """Check the items dropped in this zone (see WowItemIndex.get_items_for_zone) against its bosses"""
         items_missing_source: List[int] = []
         missing_drop_source = "missing"
         boss_drops_count: Dict[str, int] = {missing_drop_source: 0}
         for boss in self.bosses:
 
             boss_drops_count[boss.display_name] = 0
-        for item in all_items:
-            if item.dropped_in == self.zone_name:
-                boss_found = False
-                for boss in self.bosses:
-                    if boss.has_matching_name(item.dropped_by):
-                        boss_drops_count[boss.display_name] += 1
-                        boss_found = True
-                if item.dropped_by == WowItem.UNKNOWN_VALUE:
-                    boss_drops_count[missing_drop_source] += 1
-                    items_missing_source.append(item.item_id)
+        for item in zone_items:
+            boss_found = False
+            for boss in self.bosses:
+                if boss.has_matching_name(item.dropped_by):
+                    boss_drops_count[boss.display_name] += 1
                     boss_found = True
-                if not boss_found:
-                    print()
-                    href_name = WowNpc.convert_display_name_to_href_name(item.dropped_by)
-                    print(f"Warning: item {item.item_id} has {item.dropped_by} (href {href_name}) which did not map to anything.")
-                    for boss in self.bosses:
-                        boss.print_info()
-                    print()
+            if item.dropped_by == WowItem.UNKNOWN_VALUE:
+                boss_drops_count[missing_drop_source] += 1
+                items_missing_source.append(item.item_id)
+                boss_found = True
+            if not boss_found:
+                print()
+                href_name = WowNpc.convert_display_name_to_href_name(item.dropped_by)
+                print(f"Warning: item {item.item_id} has {item.dropped_by} (href {href_name}) which did not map to anything.")
+                for boss in self.bosses:
+                    boss.print_info()
+                print()
         all_bosses_has_drops = True
         for key, value in boss_drops_count.items():
             if value == 0 and key != missing_drop_source:
@@ -7,6 +7,8 @@ from scrape_utils import ScrapeUtils
 class WowZoneScraper:
     """Scrapes data from Wowhead for specified WowZone"""
 
+    _is_trimmer_ruleset_registered = False
+
     def __init__(self, zone_id: int, html_string: str):
         """Scrape wowhead data for zone_id"""
         self.zone_id = zone_id
@@ -19,12 +21,24 @@ class WowZoneScraper:
     def scrape_wowhead_zone(zone_id: int) -> 'WowZoneScraper':
         """Scrape zone data from Wowhead and save it."""
         WowZoneScraper._set_trimmer_ruleset_for_wowhead_zone()
-        url = f"https://www.wowhead.com/zone={zone_id}"
+        url = WowZoneScraper.get_wowhead_zone_url(zone_id)
         html_content = ScrapeUtils.Html.fetch_url(url)
         if len(html_content) == 0:
             print(f"Warning: html_content is Empty for zone_id {zone_id}")
         return WowZoneScraper(zone_id, html_content)
 
+    @staticmethod
+    def prefetch_wowhead_zones(zone_ids: List[int]) -> None:
+        """Fetch the html of several zones as one concurrent batch, so scraping them hits the cache."""
+        WowZoneScraper._set_trimmer_ruleset_for_wowhead_zone()
+        urls = [WowZoneScraper.get_wowhead_zone_url(zone_id) for zone_id in zone_ids]
+        ScrapeUtils.Html.fetch_urls(urls)
+
+    @staticmethod
+    def get_wowhead_zone_url(zone_id: int) -> str:
+        """Url of a wowhead zone page. It is also the webcache key of the page."""
+        return f"https://www.wowhead.com/zone={zone_id}"
+
 
     def extract_item_ids(self) -> List[int]:
         gatherer_data_pattern = r'WH\.Gatherer\.addData\(3, 1, ({.*?})\);'
@@ -76,7 +90,10 @@ class WowZoneScraper:
     @staticmethod
     def _set_trimmer_ruleset_for_wowhead_zone() -> None:
         """In ScrapeUtils.Trimmer, register trimming ruleset for wowhead.com/zone"""
+        if WowZoneScraper._is_trimmer_ruleset_registered:
+            return
         target_url = "wowhead.com/zone="
         html_start = '<div class="text">'
         html_end = 'var tabsRelated = new Tabs'
         ScrapeUtils.Trimmer.register_trimming_ruleset(target_url, html_start, html_end)
+        WowZoneScraper._is_trimmer_ruleset_registered = True
@@ -0,0 +1,99 @@
+import io
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Dict
+from unittest import mock
+from urllib.error import HTTPError, URLError
+from urllib.request import Request
+
+from scrape_utils import ScrapeUtils
+
+class _StubResponse:
+    """The part of an urlopen response that _send_request reads."""
+
+    def __init__(self, html: str) -> None:
+        self.status = 200
+        self.headers: Dict[str, str] = {}
+        self._body = html.encode('utf-8')
+
+    def read(self, size: int = -1) -> bytes:
+        body, self._body = (self._body, b"") if size < 0 else (self._body[:size], self._body[size:])
+        return body
+
+    def __enter__(self) -> '_StubResponse':
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        pass
+
+class FetchUrlsTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.old_folder = ScrapeUtils.Html.html_webcache_folder
+        self.old_max_connections_per_host = ScrapeUtils.Html.max_connections_per_host
+        ScrapeUtils.Html.html_webcache_folder = Path(self.temp_dir.name)
+        ScrapeUtils.Html.webcache_backend = ScrapeUtils.FileWebcache()
+        ScrapeUtils.Html._webcache.clear()
+        ScrapeUtils.Html._host_semaphores.clear()
+        self.lock = threading.Lock()
+        self.open_connections: Dict[str, int] = {}
+        self.max_open_connections: Dict[str, int] = {}
+        self.urlopen = mock.patch("scrape_utils.urlopen", side_effect=self._urlopen).start()
+
+    def tearDown(self) -> None:
+        mock.patch.stopall()
+        ScrapeUtils.Html.webcache_backend = None
+        ScrapeUtils.Html.html_webcache_folder = self.old_folder
+        ScrapeUtils.Html.max_connections_per_host = self.old_max_connections_per_host
+        ScrapeUtils.Html._webcache.clear()
+        ScrapeUtils.Html._host_semaphores.clear()
+        self.temp_dir.cleanup()
+
+    def _urlopen(self, request: Request, timeout: float) -> _StubResponse:
+        """Count the connections open per host (and in total, under '*') while a request takes a while"""
+        host = request.host
+        with self.lock:
+            for key in (host, "*"):
+                self.open_connections[key] = self.open_connections.get(key, 0) + 1
+                self.max_open_connections[key] = max(self.max_open_connections.get(key, 0), self.open_connections[key])
+        time.sleep(0.02)
+        with self.lock:
+            for key in (host, "*"):
+                self.open_connections[key] -= 1
+        if "/missing" in request.full_url:
+            raise HTTPError(request.full_url, 404, "Not Found", None, None) # type: ignore[arg-type]
+        if "offline" in host:
+            raise URLError("Name or service not known")
+        return _StubResponse(f"<p>{request.full_url}</p>")
+
+    def test_workers_limit_the_open_connections(self) -> None:
+        urls = [f"https://host{index % 3}.test/page={index}" for index in range(12)]
+        ScrapeUtils.Html.max_connections_per_host = 10
+        html_dct = ScrapeUtils.Html.fetch_urls(urls, workers=3)
+        self.assertEqual(html_dct, {url: f"<p>{url}</p>" for url in urls})
+        self.assertEqual(self.max_open_connections["*"], 3)
+
+    def test_connections_per_host_are_capped(self) -> None:
+        urls = [f"https://host{index % 2}.test/page={index}" for index in range(16)]
+        ScrapeUtils.Html.max_connections_per_host = 2
+        ScrapeUtils.Html.fetch_urls(urls, workers=8)
+        self.assertEqual(self.max_open_connections["host0.test"], 2)
+        self.assertEqual(self.max_open_connections["host1.test"], 2)
+        self.assertEqual(self.urlopen.call_count, len(urls))
+
+    def test_failed_requests_give_empty_pages_and_the_others_are_kept(self) -> None:
+        urls = ["https://host0.test/page=1", "https://host0.test/missing", "https://offline.test/page=2", "https://host1.test/page=3"]
+        with redirect_stdout(io.StringIO()) as output:
+            html_dct = ScrapeUtils.Html.fetch_urls(urls, workers=4)
+        self.assertEqual(html_dct, {urls[0]: f"<p>{urls[0]}</p>", urls[1]: "", urls[2]: "", urls[3]: f"<p>{urls[3]}</p>"})
+        self.assertEqual(output.getvalue().count("Error: A url or http error occurred"), 2)
+        self.assertEqual(ScrapeUtils.Html.fetch_url(urls[0]), f"<p>{urls[0]}</p>")
+        self.assertEqual(self.urlopen.call_count, len(urls)) # Served from the cache
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from scrape_utils import ScrapeUtils
+from src.pipeline_stage_graph import PipelineStageGraph
+
+class MetricsTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        ScrapeUtils.Metrics.reset()
+
+    def tearDown(self) -> None:
+        ScrapeUtils.Metrics.reset()
+
+    def test_counters_add_up_across_threads(self) -> None:
+        def count() -> None:
+            for _ in range(1000):
+                ScrapeUtils.Metrics.increment("html.disk_hits")
+        threads = [threading.Thread(target=count) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        ScrapeUtils.Metrics.increment("html.bytes_fetched", 512)
+        counters = ScrapeUtils.Metrics.get_report()["counters"]
+        self.assertEqual(counters, {"html.bytes_fetched": 512, "html.disk_hits": 4000})
+
+    def test_timings_keep_count_total_min_and_max(self) -> None:
+        for seconds in (0.5, 0.25, 1.0):
+            ScrapeUtils.Metrics.observe("html.latency.wowhead.com", seconds)
+        with ScrapeUtils.Metrics.timer("item_scraper.parse_seconds"):
+            pass
+        timings = ScrapeUtils.Metrics.get_report()["timings"]
+        self.assertEqual(timings["html.latency.wowhead.com"], {"count": 3, "total_seconds": 1.75, "mean_seconds": 1.75 / 3,
+                                                              "min_seconds": 0.25, "max_seconds": 1.0})
+        self.assertEqual(timings["item_scraper.parse_seconds"]["count"], 1)
+
+    def test_timer_records_blocks_that_raise(self) -> None:
+        with self.assertRaises(ValueError):
+            with ScrapeUtils.Metrics.timer("drop_chances.fill_seconds"):
+                raise ValueError("bad row")
+        self.assertEqual(ScrapeUtils.Metrics.get_report()["timings"]["drop_chances.fill_seconds"]["count"], 1)
+
+    def test_stage_graph_records_wall_and_cpu_time_of_each_stage(self) -> None:
+        graph = PipelineStageGraph()
+        graph.add_stage("scrape", lambda: sum(range(10000)), outputs=["items"])
+        graph.add_stage("export", lambda: None, inputs=["items"])
+        graph.run(jobs=2)
+        stages = ScrapeUtils.Metrics.get_report()["stages"]
+        self.assertEqual(set(stages), {"scrape", "export"})
+        for stage_times in stages.values():
+            self.assertGreaterEqual(stage_times["wall_seconds"], 0)
+            self.assertGreaterEqual(stage_times["cpu_seconds"], 0)
+
+    def test_report_is_written_as_json(self) -> None:
+        ScrapeUtils.Metrics.increment("trimmer.trimmed_chars", 42)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "output" / "metrics.json"
+            ScrapeUtils.Metrics.write_report(path)
+            report = json.loads(path.read_text(encoding='utf-8'))
+        self.assertEqual(set(report), {"run_seconds", "stages", "counters", "timings"})
+        self.assertEqual(report["counters"], {"trimmer.trimmed_chars": 42})
+
+    def test_streamed_and_whole_pages_count_the_same_trimmed_chars(self) -> None:
+        trimmer = ScrapeUtils.Trimmer("", "<h1>", "</h2>")
+        page = "<p>ad</p>" * 10 + "<h1>kept</h1><h2>end</h2>"
+        self.assertEqual(trimmer.trim_stream([page[index:index + 7] for index in range(0, len(page), 7)]), "<h1>kept</h1><h2>end</h2>")
+        streamed_chars = ScrapeUtils.Metrics.get_report()["counters"]["trimmer.trimmed_chars"]
+        ScrapeUtils.Metrics.reset()
+        ScrapeUtils.Trimmer.register_trimming_ruleset("example.com/", trimmer.start, trimmer.end)
+        try:
+            ScrapeUtils.Trimmer.trim_html("https://example.com/item=1", page)
+        finally:
+            ScrapeUtils.Trimmer.unregister_trimming_ruleset("example.com/")
+        self.assertEqual(streamed_chars, 90)
+        self.assertEqual(ScrapeUtils.Metrics.get_report()["counters"]["trimmer.trimmed_chars"], 90)
+
+    def test_trim_stream_counts_only_what_it_read(self) -> None:
+        chunks = iter(["<p>ad</p><h1>kept", "</h1></h2>tail", "never read"])
+        self.assertEqual(ScrapeUtils.Trimmer("", "<h1>", "</h2>").trim_stream(chunks), "<h1>kept</h1></h2>")
+        self.assertEqual(ScrapeUtils.Metrics.get_report()["counters"]["trimmer.trimmed_chars"], len("<p>ad</p>tail"))
+        self.assertEqual(next(chunks), "never read")
+
+if __name__ == '__main__':
+    unittest.main()
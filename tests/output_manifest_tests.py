@@ -0,0 +1,77 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from scrape_utils import ScrapeUtils
+
+class OutputManifestTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = Path(self.temp_dir.name)
+        self.manifest_path = self.folder / ScrapeUtils.OutputManifest.DEFAULT_FILENAME
+        self.manifest = ScrapeUtils.Persistence.use_output_manifest(self.manifest_path)
+
+    def tearDown(self) -> None:
+        ScrapeUtils.Persistence.output_manifest = None
+        self.temp_dir.cleanup()
+
+    def _age(self, path: Path) -> int:
+        """Move the mtime of path back, so a rewrite would be visible"""
+        os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+        return path.stat().st_mtime_ns
+
+    def test_unchanged_content_is_not_rewritten(self) -> None:
+        path = self.folder / "sim" / "Warrior.json"
+        ScrapeUtils.Persistence.write_textfile(path, "{}")
+        mtime_ns = self._age(path)
+        ScrapeUtils.Persistence.write_textfile(path, "{}")
+        self.assertEqual(path.stat().st_mtime_ns, mtime_ns)
+        ScrapeUtils.Persistence.write_textfile(path, "{\"a\": 1}")
+        self.assertEqual(path.read_text(encoding='utf-8'), "{\"a\": 1}")
+        self.assertEqual(len(self.manifest.changed_paths), 2)
+        self.assertEqual(len(self.manifest.unchanged_paths), 1)
+
+    def test_file_hash_matches_the_content_it_was_written_from(self) -> None:
+        content = "item_id,boss\n1,Ulgrax\r\n2,Sikran\n"
+        path = self.folder / "items" / "Warrior.csv"
+        ScrapeUtils.Persistence.write_textfile(path, content)
+        self.assertEqual(ScrapeUtils.OutputManifest.hash_file(path), ScrapeUtils.OutputManifest.hash_content(content))
+        # As text mode writes it on Windows
+        path.write_bytes(content.replace("\n", "\r\n").encode('utf-8'))
+        with mock.patch("scrape_utils.os.linesep", "\r\n"):
+            self.assertEqual(ScrapeUtils.OutputManifest.hash_file(path), ScrapeUtils.OutputManifest.hash_content(content))
+            # Without a recorded entry, as after a lost manifest, the file is hashed
+            self.assertTrue(ScrapeUtils.OutputManifest(self.folder / "other_manifest.json").is_unchanged(
+                path, ScrapeUtils.OutputManifest.hash_content(content)))
+
+    def test_atomic_writes_of_unchanged_content_keep_the_file(self) -> None:
+        path = self.folder / "items" / "Warrior.csv"
+        for _ in range(2):
+            with ScrapeUtils.Persistence.open_textfile_atomic(path) as file:
+                file.write("a,b\r\n1,2\n")
+            mtime_ns = self._age(path)
+        self.assertEqual(path.stat().st_mtime_ns, mtime_ns)
+        self.assertEqual(list(path.parent.glob(".*.tmp")), [])
+        self.assertEqual(len(self.manifest.get_changed_paths()), 1)
+
+    def test_saved_manifest_lists_changes_and_is_used_by_the_next_run(self) -> None:
+        unchanged_path = self.folder / "unchanged.csv"
+        edited_path = self.folder / "edited.csv"
+        ScrapeUtils.Persistence.write_textfile(unchanged_path, "same")
+        ScrapeUtils.Persistence.write_textfile(edited_path, "same")
+        self.manifest.save()
+        edited_path.write_text("edited by hand", encoding='utf-8')
+
+        next_manifest = ScrapeUtils.Persistence.use_output_manifest(self.manifest_path)
+        ScrapeUtils.Persistence.write_textfile(unchanged_path, "same")
+        ScrapeUtils.Persistence.write_textfile(edited_path, "same")
+        next_manifest.save()
+        self.assertEqual(edited_path.read_text(encoding='utf-8'), "same")
+        saved = json.loads(self.manifest_path.read_text(encoding='utf-8'))
+        self.assertEqual(len(saved["changed"]), 1)
+        self.assertTrue(saved["changed"][0].endswith("edited.csv"))
+        self.assertEqual(len(saved["files"]), 2)
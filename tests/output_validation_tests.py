@@ -0,0 +1,108 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import List
+
+from src.output_validation import OutputValidation
+from src.sim_world_tour import SimWorldTour
+from src.wow_consts.wow_class import WowClass
+from src.wow_item_csv_exporter import WowItemCsvExporter
+
+class OutputValidationTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.old_cwd = Path.cwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+        self.output_path = Path(self.temp_dir.name) / OutputValidation.BASE_OUTPUT_FOLDER
+        for path, content in [("tww_hc_week/items/Warrior.csv", "a,b\n1,2\n"), ("tww_hc_week/sim/Warrior.json", "{}"),
+                              ("all/all_items.csv", "a\n")]:
+            (self.output_path / path).parent.mkdir(parents=True, exist_ok=True)
+            (self.output_path / path).write_text(content, encoding='utf-8')
+        with redirect_stdout(io.StringIO()):
+            OutputValidation.update_golden_manifest(["tww_hc_week", "all"])
+
+    def tearDown(self) -> None:
+        os.chdir(self.old_cwd)
+        self.temp_dir.cleanup()
+
+    def test_every_file_of_the_folder_is_validated(self) -> None:
+        self.assertEqual(sorted(OutputValidation.read_golden_manifest()),
+                         ["all/all_items.csv", "tww_hc_week/items/Warrior.csv", "tww_hc_week/sim/Warrior.json"])
+        with redirect_stdout(io.StringIO()):
+            self.assertTrue(OutputValidation.validate("tww_hc_week"))
+            (self.output_path / "tww_hc_week/sim/Warrior.json").write_text("{\"a\": 1}", encoding='utf-8')
+            self.assertFalse(OutputValidation.validate("tww_hc_week"))
+            self.assertTrue(OutputValidation.validate("all"))
+            (self.output_path / "all/all_items.csv").unlink()
+            self.assertFalse(OutputValidation.validate("all"))
+
+    def test_only_differing_files_with_a_golden_copy_are_diffed(self) -> None:
+        golden_copy_path = Path.cwd() / OutputValidation.TEST_FOLDER / OutputValidation.BASE_TEST_OUTPUT_FOLDER / "tww_hc_week/items/Warrior.csv"
+        self.assertEqual(golden_copy_path.read_text(encoding='utf-8'), "a,b\n1,2\n") # Copied by update_golden_manifest
+        (self.output_path / "tww_hc_week/items/Warrior.csv").write_text("a,b\n1,3\n", encoding='utf-8')
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertFalse(OutputValidation.validate("tww_hc_week"))
+        self.assertIn("-1,2\n+1,3\n", output.getvalue())
+        self.assertNotIn("Warrior.json", output.getvalue())
+
+    def test_line_endings_do_not_change_the_hash(self) -> None:
+        (self.output_path / "tww_hc_week/items/Warrior.csv").write_bytes(b"a,b\r\n1,2\r\n")
+        with redirect_stdout(io.StringIO()):
+            self.assertTrue(OutputValidation.validate("tww_hc_week"))
+
+
+class GoldenManifestTests(unittest.TestCase):
+    """The checked-in golden manifest and golden copies, which every real run is validated against"""
+
+    GROUP_FOLDERS = ["tww_hc_week", "tww_s1_mplus"]
+    COMBINED_FOLDER = "all"
+
+    def setUp(self) -> None:
+        self.golden_path = Path(__file__).parent / OutputValidation.BASE_TEST_OUTPUT_FOLDER
+        self.old_cwd = Path.cwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+
+    def tearDown(self) -> None:
+        os.chdir(self.old_cwd)
+        self.temp_dir.cleanup()
+
+    @staticmethod
+    def _get_export_paths(csv_folder: str, sim_folder: str = "") -> List[str]:
+        """Every file a complete export writes: a csv per class, the aggregate csvs and, for content groups, a sim per class"""
+        csv_names = [f"{wow_class.get_abbr()}.csv" for wow_class in WowClass.get_all()]
+        csv_names += [WowItemCsvExporter.ALL_ITEMS_CSV_NAME, WowItemCsvExporter.ALL_COLUMNS_CSV_NAME]
+        paths = [f"{csv_folder}/{csv_name}" for csv_name in csv_names]
+        if sim_folder:
+            paths += [f"{sim_folder}/{wow_class.get_abbr()}.json" for wow_class in WowClass.get_all()]
+        return paths
+
+    def test_manifest_holds_every_exported_file_with_a_golden_copy(self) -> None:
+        expected_paths = self._get_export_paths(GoldenManifestTests.COMBINED_FOLDER)
+        for folder in GoldenManifestTests.GROUP_FOLDERS:
+            expected_paths += self._get_export_paths(f"{folder}/{WowItemCsvExporter.ITEMS_FOR_SPEC_FOLDER}",
+                                                     f"{folder}/{SimWorldTour.WORLD_TOUR_FOLDER}")
+        golden_hashes = json.loads((self.golden_path / OutputValidation.GOLDEN_MANIFEST_NAME).read_text(encoding='utf-8'))["files"]
+        self.assertEqual(sorted(golden_hashes), sorted(expected_paths))
+        self.assertEqual(OutputValidation.hash_files(self.golden_path, golden_hashes), golden_hashes)
+
+    def test_complete_export_passes_validation(self) -> None:
+        shutil.copytree(self.golden_path, Path.cwd() / OutputValidation.TEST_FOLDER / OutputValidation.BASE_TEST_OUTPUT_FOLDER)
+        output_path = Path.cwd() / OutputValidation.BASE_OUTPUT_FOLDER
+        for folder in GoldenManifestTests.GROUP_FOLDERS + [GoldenManifestTests.COMBINED_FOLDER]:
+            shutil.copytree(self.golden_path / folder, output_path / folder)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            for folder in GoldenManifestTests.GROUP_FOLDERS + [GoldenManifestTests.COMBINED_FOLDER]:
+                self.assertTrue(OutputValidation.validate(folder))
+            (output_path / "tww_s1_mplus/sim/Warrior.json").unlink()
+            self.assertFalse(OutputValidation.validate("tww_s1_mplus"))
+        self.assertNotIn("not in the golden manifest", output.getvalue())
+        self.assertIn("Expected output tww_s1_mplus/sim/Warrior.json is missing", output.getvalue())
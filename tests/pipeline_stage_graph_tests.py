@@ -0,0 +1,104 @@
+import io
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from typing import List
+from unittest import mock
+
+from src.main_wowhead_pipeline import MainWowheadPipeline
+from src.pipeline_stage_graph import PipelineStageGraph
+
+class PipelineStageGraphTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.log: List[str] = []
+        self.graph = PipelineStageGraph()
+        for group in ("a", "b"):
+            self.graph.add_stage(f"{group}.scrape", lambda group=group: self.log.append(f"{group}.scrape"), outputs=[f"{group}.items"])
+            self.graph.add_stage(f"{group}.sim", lambda group=group: self.log.append(f"{group}.sim"),
+                                 inputs=[f"{group}.items"], outputs=[f"{group}.sim"])
+        self.graph.add_stage("combined", lambda: len(self.log), inputs=["a.sim", "b.sim"])
+
+    def test_single_job_runs_each_group_in_turn(self) -> None:
+        self.assertEqual([stage.name for stage in self.graph.get_execution_order()], ["a.scrape", "a.sim", "b.scrape", "b.sim", "combined"])
+        results = self.graph.run(jobs=1)
+        self.assertEqual(self.log, ["a.scrape", "a.sim", "b.scrape", "b.sim"])
+        self.assertEqual(results["combined"], 4)
+
+    def test_independent_stages_overlap(self) -> None:
+        graph = PipelineStageGraph()
+        barrier = threading.Barrier(2, timeout=5) # Only passes if both stages run at the same time
+        graph.add_stage("a.sim", barrier.wait, outputs=["a.sim"])
+        graph.add_stage("b.scrape", barrier.wait, outputs=["b.items"])
+        graph.add_stage("combined", lambda: "done", inputs=["a.sim", "b.items"])
+        self.assertEqual(graph.run(jobs=2)["combined"], "done")
+
+    def test_invalid_graphs_and_failed_stages_raise(self) -> None:
+        with self.assertRaises(ValueError):
+            self.graph.add_stage("c.sim", lambda: None, outputs=["a.sim"])
+        self.graph.add_stage("c.sim", lambda: None, inputs=["c.items"])
+        with self.assertRaises(ValueError):
+            self.graph.get_execution_order()
+
+        graph = PipelineStageGraph()
+        graph.add_stage("a.scrape", lambda: 1 / 0, outputs=["a.items"])
+        graph.add_stage("a.sim", lambda: self.log.append("a.sim"), inputs=["a.items"])
+        with self.assertRaises(ZeroDivisionError):
+            graph.run(jobs=2)
+        self.assertEqual(self.log, [])
+
+    def test_stages_start_after_their_dependencies_with_jobs(self) -> None:
+        events: List[str] = []
+        lock = threading.Lock()
+        def run(name: str) -> None:
+            with lock:
+                events.append(f"start {name}")
+            time.sleep(0.01)
+            with lock:
+                events.append(f"end {name}")
+        graph = PipelineStageGraph()
+        for stage in self.graph.stages:
+            graph.add_stage(stage.name, lambda name=stage.name: run(name), stage.inputs, stage.outputs)
+        graph.run(jobs=3)
+        for stage in graph.stages:
+            for dependency in graph.get_dependencies(stage):
+                self.assertLess(events.index(f"end {dependency}"), events.index(f"start {stage.name}"))
+        self.assertEqual(len(events), 2 * len(graph.stages))
+
+    def test_failed_stage_lets_running_stages_finish_and_starts_no_more(self) -> None:
+        graph = PipelineStageGraph()
+        started = threading.Event()
+        def run_slowly() -> None:
+            started.set()
+            time.sleep(0.1)
+            self.log.append("a.scrape")
+        def fail() -> None:
+            started.wait(5)
+            raise ValueError("b.scrape failed")
+        graph.add_stage("a.scrape", run_slowly, outputs=["a.items"])
+        graph.add_stage("b.scrape", fail, outputs=["b.items"])
+        graph.add_stage("c.scrape", lambda: self.log.append("c.scrape"), outputs=["c.items"]) # Ready, but both jobs are taken
+        graph.add_stage("b.sim", lambda: self.log.append("b.sim"), inputs=["b.items"])
+        with self.assertRaises(ValueError):
+            graph.run(jobs=2)
+        self.assertEqual(self.log, ["a.scrape"])
+
+    def test_print_graph_lists_stages_with_their_dependencies(self) -> None:
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.graph.print_graph()
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[0], "Info: 5 stages")
+        self.assertEqual([line.split()[1] for line in lines[1::2]], ["a.scrape", "a.sim", "b.scrape", "b.sim", "combined"])
+        self.assertTrue(lines[9].endswith("after: a.sim, b.sim"))
+        self.assertIn("in: a.sim, b.sim  out: -", lines[10])
+
+    def test_dry_run_prints_the_graph_without_running_it(self) -> None:
+        output = io.StringIO()
+        with mock.patch.object(MainWowheadPipeline, "factories", []), mock.patch.object(MainWowheadPipeline, "dry_run", True), \
+                mock.patch.object(MainWowheadPipeline, "create_stage_graph", return_value=self.graph):
+            with redirect_stdout(output):
+                MainWowheadPipeline.main()
+        self.assertIn("Info: 5 stages", output.getvalue())
+        self.assertEqual(self.log, [])
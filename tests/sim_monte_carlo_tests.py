@@ -0,0 +1,60 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from src.pipeline_stage_graph import PipelineStageGraph
+from src.sim_monte_carlo import SimMonteCarlo
+from src.sim_world_tour import SimWorldTour
+from src.wow_drop_chance_matrix import WowDropChanceMatrix
+from src.wow_item import WowItem
+from src.wow_item_table import WowItemTable
+
+class SimMonteCarloTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        items = []
+        for item_id, gear_slot, dropped_by in [(1, "Chest", "Ulgrax"), (2, "Chest", "Sikran"), (3, "Finger", "Ulgrax")]:
+            item = WowItem.create_empty()
+            item.item_id = item_id
+            item.gear_slot = gear_slot
+            item.gear_type = "Plate"
+            item.primary_stats = {"Strength": 1000}
+            item.dropped_by = dropped_by
+            items.append(item)
+        self.item_table = WowItemTable(items)
+        WowDropChanceMatrix(self.item_table).fill_drop_chances()
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_same_seed_gives_same_results_for_any_worker_count(self) -> None:
+        sim_path = Path(self.temp_dir.name)
+        in_process = SimMonteCarlo.sim_monte_carlo(self.item_table, sim_path, trials=200, seed=3, workers=1)
+        in_pool = SimMonteCarlo.sim_monte_carlo(self.item_table, sim_path, trials=200, seed=3, workers=2)
+        self.assertEqual(in_process, in_pool)
+        self.assertTrue((sim_path / f"Warrior{SimMonteCarlo.FILE_SUFFIX}").is_file())
+
+    def test_worker_pool_runs_inside_a_threaded_stage_graph(self) -> None:
+        sim_path = Path(self.temp_dir.name)
+        graph = PipelineStageGraph()
+        graph.add_stage("a.sim_monte_carlo", lambda: SimMonteCarlo.sim_monte_carlo(self.item_table, sim_path, trials=200, seed=3, workers=2))
+        graph.add_stage("b.sim_world_tour", lambda: time.sleep(0.05))
+        results = graph.run(jobs=2)
+        self.assertEqual(results["a.sim_monte_carlo"], SimMonteCarlo.sim_monte_carlo(self.item_table, sim_path, trials=200, seed=3, workers=1))
+
+    def test_zero_loot_chance_never_drops(self) -> None:
+        results = SimMonteCarlo.sim_monte_carlo(self.item_table, Path(self.temp_dir.name), trials=100, loot_chance=0.0,
+                                                workers=1)
+        self.assertEqual(results["Warrior"]["Chest"]["WarriorArms"], {"p50": None, "p90": None, "season_chance": 0.0})
+
+    def test_one_run_season_matches_closed_form(self) -> None:
+        results = SimMonteCarlo.sim_monte_carlo(self.item_table, Path(self.temp_dir.name), trials=40000,
+                                                season_runs=1, workers=1)
+        with tempfile.TemporaryDirectory() as sim_dir:
+            world_tour_sim = SimWorldTour.sim_world_tour(SimWorldTour.HC, self.item_table, Path(sim_dir))
+        closed_form = world_tour_sim["Warrior"]["Chest"]["WarriorArms"]
+        season_chance = results["Warrior"]["Chest"]["WarriorArms"]["season_chance"]
+        assert season_chance is not None
+        self.assertAlmostEqual(season_chance, closed_form, delta=1.5)
@@ -0,0 +1,49 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.sim_world_tour import SimWorldTour
+from src.wow_drop_chance_matrix import WowDropChanceMatrix
+from src.wow_item import WowItem
+from src.wow_item_table import WowItemTable
+
+class SimWorldTourTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        items = []
+        for item_id, gear_slot, primary_stat, dropped_by in [(1, "Chest", "Strength", "Ulgrax"), (2, "Chest", "Strength", "Sikran"),
+                                                            (3, "Chest", "Intellect", "Ulgrax"), (4, "Finger", "Agility", "Sikran")]:
+            item = WowItem.create_empty()
+            item.item_id = item_id
+            item.gear_slot = gear_slot
+            item.gear_type = "Plate"
+            item.primary_stats = {primary_stat: 1000}
+            item.dropped_by = dropped_by
+            items.append(item)
+        self.item_table = WowItemTable(items)
+        WowDropChanceMatrix(self.item_table).fill_drop_chances()
+
+    def test_loot_chance_sweep_matches_single_sims(self) -> None:
+        loot_chances = [0.0, 0.2, 0.35, 1.0]
+        sweep = SimWorldTour.sim_world_tour_for_loot_chances(self.item_table, loot_chances)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for loot_chance in loot_chances:
+                single_sim = SimWorldTour.sim_world_tour(SimWorldTour.HC, self.item_table, Path(temp_dir), loot_chance)
+                self.assertEqual(sweep[loot_chance], single_sim)
+            self.assertTrue((Path(temp_dir) / "Warrior.json").is_file())
+        # Three chests (armor is not filtered by mainstat), each one of the two items its boss drops
+        self.assertEqual(sweep[0.0]["Warrior"]["Chest"]["WarriorArms"], 0)
+        self.assertEqual(sweep[1.0]["Warrior"]["Chest"]["WarriorArms"], 88)
+
+    def test_drop_rates_are_formatted_only_in_the_output(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            world_tour_sim = SimWorldTour.sim_world_tour(SimWorldTour.HC, self.item_table, Path(temp_dir), 1.0)
+            written_sim = json.loads((Path(temp_dir) / "Warrior.json").read_text())
+        self.assertEqual(world_tour_sim["Warrior"]["Chest"][SimWorldTour.ITEM_AVAILABLE_COUNT], 3)
+        self.assertEqual(written_sim["Chest"]["WarriorArms"], "88%")
+        self.assertEqual(written_sim["Chest"][SimWorldTour.ITEM_AVAILABLE_COUNT], f"3 available in {SimWorldTour.HC}")
+        chest_statistics = [item for item in SimWorldTour.create_gearslot_statistics(SimWorldTour.HC, world_tour_sim)
+                            if item.name == "Chest items for (Warrior)"][0]
+        self.assertEqual(chest_statistics.drop_chances["WarriorArms"], 88)
+        self.assertEqual(chest_statistics.from_, f"3 available in {SimWorldTour.HC}")
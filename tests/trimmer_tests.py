@@ -0,0 +1,88 @@
+import io
+import random
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from scrape_utils import ScrapeUtils
+
+class TrimmerTests(unittest.TestCase):
+    """The indexed ruleset lookup and the linear marker search against the scans they replaced"""
+
+    # Overlapping hosts and path prefixes, and a ruleset without a host (matched as a substring)
+    RULESETS = ["wowhead.com/item=", "wowhead.com/item=1", "ptr.wowhead.com/item=", "wowhead.com/zone=",
+                "wowhead.com/zones/", "example.com/", "/news?"]
+    URLS = ["https://www.wowhead.com/item=5", "https://www.wowhead.com/item=15", "https://ptr.wowhead.com/item=5",
+            "https://www.wowhead.com/zone=14979", "https://www.wowhead.com/zones/war-within/dungeons",
+            "https://www.wowhead.com/zones", "https://www.wowhead.com/npc=5", "https://example.com/",
+            "https://example.com/news?id=1", "https://www.wowhead.com/news?id=1", "https://www.example.org/news?id=1",
+            "https://wowhead.com/items=5", "https://other.org/", "wowhead.com/zone=1"]
+
+    def setUp(self) -> None:
+        self.old_registry = dict(ScrapeUtils.Trimmer._trimmer_registry)
+        for target_url in ScrapeUtils.Trimmer._trimmer_registry.copy():
+            ScrapeUtils.Trimmer.unregister_trimming_ruleset(target_url)
+        for index, target_url in enumerate(TrimmerTests.RULESETS):
+            ScrapeUtils.Trimmer.register_trimming_ruleset(target_url, f"<start{index}>", f"<end{index}>")
+
+    def tearDown(self) -> None:
+        for target_url in TrimmerTests.RULESETS:
+            ScrapeUtils.Trimmer.unregister_trimming_ruleset(target_url)
+        for trimmer in self.old_registry.values():
+            ScrapeUtils.Trimmer.register_trimming_ruleset(trimmer.target_url, trimmer.start, trimmer.end)
+
+    @staticmethod
+    def _legacy_find_trimmer(url: str) -> Optional[ScrapeUtils.Trimmer]:
+        """The lookup used before rulesets were indexed: a substring test against every target_url"""
+        matches = [trimmer for target_url, trimmer in ScrapeUtils.Trimmer._trimmer_registry.items() if target_url in url]
+        return matches[0] if len(matches) == 1 else None
+
+    @staticmethod
+    def _legacy_find_all(text: str, marker: str) -> List[int]:
+        """The marker search used before _find_single: test every index"""
+        return [i for i in range(len(text)) if text.startswith(marker, i)]
+
+    def test_find_trimmer_matches_the_substring_scan(self) -> None:
+        with redirect_stdout(io.StringIO()):
+            for url in TrimmerTests.URLS:
+                self.assertIs(ScrapeUtils.Trimmer.find_trimmer(url), TrimmerTests._legacy_find_trimmer(url), url)
+        with redirect_stdout(io.StringIO()) as output:
+            self.assertIsNone(ScrapeUtils.Trimmer.find_trimmer("https://www.wowhead.com/item=15")) # Two overlapping rulesets
+        self.assertIn("matched 2 trimmers", output.getvalue())
+        self.assertIsNone(ScrapeUtils.Trimmer.find_trimmer("https://other.org/")) # No ruleset: the page is kept whole
+        # Hosts are matched whole: a host that merely ends with a ruleset host no longer picks its ruleset
+        self.assertIsNone(ScrapeUtils.Trimmer.find_trimmer("https://notwowhead.com/zone=1"))
+
+    def test_find_single_matches_the_index_scan(self) -> None:
+        rng = random.Random(0)
+        for _ in range(2000):
+            text = ''.join(rng.choice("ab<>") for _ in range(rng.randrange(12)))
+            marker = ''.join(rng.choice("ab<>") for _ in range(rng.randrange(4)))
+            indices = TrimmerTests._legacy_find_all(text, marker)
+            expected = (indices[0] if indices else -1, min(len(indices), 2))
+            self.assertEqual(ScrapeUtils.Trimmer._find_single(text, marker), expected, (text, marker))
+
+    def test_trim_directory_uses_the_ruleset_of_the_substring_scan(self) -> None:
+        pages: Dict[str, str] = {}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            old_folder = ScrapeUtils.Html.html_webcache_folder
+            ScrapeUtils.Html.html_webcache_folder = Path(temp_dir)
+            try:
+                host_urls = [url for url in TrimmerTests.URLS if "://" in url and "/news?" not in url]
+                for url in host_urls:
+                    pages[url] = "before" + ''.join(f"<start{index}>kept{index}<end{index}>"
+                                                    for index in range(len(TrimmerTests.RULESETS))) + "after"
+                    ScrapeUtils.Persistence.write_textfile(ScrapeUtils.Html._get_path_for_cached_html(url), pages[url])
+                ScrapeUtils.Trimmer.trim_directory(Path(temp_dir))
+                for url in host_urls:
+                    trimmer = TrimmerTests._legacy_find_trimmer(url)
+                    expected_html = trimmer.trim(pages[url]) if trimmer is not None else pages[url]
+                    path = ScrapeUtils.Html._get_path_for_cached_html(url)
+                    self.assertEqual(ScrapeUtils.Persistence.read_textfile(path), expected_html, url)
+            finally:
+                ScrapeUtils.Html.html_webcache_folder = old_folder
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,201 @@
+import io
+import random
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List
+from unittest import mock
+
+from scrape_utils import ScrapeUtils
+from src.main_wowhead_pipeline import MainWowheadPipeline
+
+class _StandInWowhead(BaseHTTPRequestHandler):
+    """Serves one page with an ETag and answers matching conditional requests with 304."""
+
+    page = "<h1>before</h1><p>kept</p><h2>end</h2><p>dropped</p>"
+    etag = '"v1"'
+    statuses: List[int] = []
+
+    def do_GET(self) -> None:
+        if self.headers.get('If-None-Match') == _StandInWowhead.etag:
+            _StandInWowhead.statuses.append(304)
+            self.send_response(304)
+            self.send_header('ETag', _StandInWowhead.etag)
+            self.end_headers()
+            return
+        _StandInWowhead.statuses.append(200)
+        body = _StandInWowhead.page.encode('utf-8')
+        self.send_response(200)
+        self.send_header('ETag', _StandInWowhead.etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+class WebcacheTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _StandInWowhead)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/item=1"
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.old_folder = ScrapeUtils.Html.html_webcache_folder
+        ScrapeUtils.Html.html_webcache_folder = Path(self.temp_dir.name)
+        ScrapeUtils.Html.webcache_backend = ScrapeUtils.FileWebcache()
+        ScrapeUtils.Html._webcache.clear()
+        ScrapeUtils.Html._ttl_policies.clear()
+        ScrapeUtils.Trimmer.register_trimming_ruleset("127.0.0.1", "<h1>", "<h2>end</h2>")
+        _StandInWowhead.page = "<h1>before</h1><p>kept</p><h2>end</h2><p>dropped</p>"
+        _StandInWowhead.etag = '"v1"'
+        _StandInWowhead.statuses = []
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        if isinstance(ScrapeUtils.Html.webcache_backend, ScrapeUtils.SqliteWebcache):
+            ScrapeUtils.Html.webcache_backend.close()
+        ScrapeUtils.Html.webcache_backend = None
+        ScrapeUtils.Html.html_webcache_folder = self.old_folder
+        ScrapeUtils.Html._webcache.clear()
+        ScrapeUtils.Html._ttl_policies.clear()
+        ScrapeUtils.Trimmer.unregister_trimming_ruleset("127.0.0.1")
+        self.temp_dir.cleanup()
+
+    def _expire_cache_entry(self) -> None:
+        backend = ScrapeUtils.Html.get_webcache_backend()
+        metadata = backend.read_metadata(self.url)
+        assert metadata is not None
+        metadata.fetched_at -= 3600
+        backend.write_metadata(self.url, metadata)
+        ScrapeUtils.Html._webcache.clear()
+
+    def test_fresh_entry_is_not_revalidated(self) -> None:
+        ScrapeUtils.Html.register_ttl_policy("/item=", 3600)
+        ScrapeUtils.Html.fetch_url(self.url)
+        ScrapeUtils.Html._webcache.clear()
+        html = ScrapeUtils.Html.fetch_url(self.url)
+        self.assertEqual(html, "<h1>before</h1><p>kept</p><h2>end</h2>")
+        self.assertEqual(_StandInWowhead.statuses, [200])
+
+    def test_expired_entry_is_kept_on_304(self) -> None:
+        ScrapeUtils.Html.register_ttl_policy("/item=", 60)
+        ScrapeUtils.Html.fetch_url(self.url)
+        self._expire_cache_entry()
+        html = ScrapeUtils.Html.fetch_url(self.url)
+        self.assertEqual(html, "<h1>before</h1><p>kept</p><h2>end</h2>")
+        self.assertEqual(_StandInWowhead.statuses, [200, 304])
+        self.assertFalse(ScrapeUtils.Html.is_expired(self.url))
+
+    def test_expired_entry_is_replaced_when_page_changed(self) -> None:
+        ScrapeUtils.Html.register_ttl_policy("/item=", 60)
+        ScrapeUtils.Html.fetch_url(self.url)
+        self._expire_cache_entry()
+        _StandInWowhead.page = "<h1>after</h1><h2>end</h2>"
+        _StandInWowhead.etag = '"v2"'
+        ScrapeUtils.Html.fetch_url(self.url)
+        self.assertEqual(_StandInWowhead.statuses, [200, 200])
+        self.assertEqual(ScrapeUtils.Html.get_webcache_backend().read(self.url), "<h1>after</h1><h2>end</h2>")
+
+    def test_urls_without_ttl_never_expire(self) -> None:
+        ScrapeUtils.Html.register_ttl_policy("/zone=", 60)
+        ScrapeUtils.Html.fetch_url(self.url)
+        self._expire_cache_entry()
+        ScrapeUtils.Html.fetch_url(self.url)
+        self.assertEqual(_StandInWowhead.statuses, [200])
+
+    def test_sqlite_webcache_revalidates(self) -> None:
+        ScrapeUtils.Html.use_sqlite_webcache(Path(self.temp_dir.name) / "webcache.sqlite3")
+        ScrapeUtils.Html.register_ttl_policy("/item=", 60)
+        ScrapeUtils.Html.fetch_url(self.url)
+        self._expire_cache_entry()
+        html = ScrapeUtils.Html.fetch_url(self.url)
+        self.assertEqual(html, "<h1>before</h1><p>kept</p><h2>end</h2>")
+        self.assertEqual(_StandInWowhead.statuses, [200, 304])
+        metadata = ScrapeUtils.Html.get_webcache_backend().read_metadata(self.url)
+        assert metadata is not None
+        self.assertEqual(metadata.etag, '"v1"')
+        self.assertLess(time.time() - metadata.fetched_at, 60)
+
+    def test_sqlite_contains_reads_the_stored_length(self) -> None:
+        backend = ScrapeUtils.Html.use_sqlite_webcache(Path(self.temp_dir.name) / "webcache.sqlite3")
+        with redirect_stdout(io.StringIO()):
+            backend.write(self.url, "")
+        backend.write(f"{self.url}0", "<p>page</p>")
+        with mock.patch("scrape_utils.zlib.decompress", side_effect=AssertionError("contains decompressed a page")):
+            self.assertFalse(backend.contains(self.url))
+            self.assertTrue(backend.contains(f"{self.url}0"))
+            self.assertFalse(backend.contains(f"{self.url}1"))
+        backend._connection.execute("UPDATE webcache SET html_length = NULL") # As stored by older versions
+        self.assertFalse(backend.contains(self.url))
+        self.assertTrue(backend.contains(f"{self.url}0"))
+
+    def test_import_file_webcache_copies_every_page_of_the_folder(self) -> None:
+        file_webcache = ScrapeUtils.FileWebcache()
+        pages = {f"{self.url}{index}": f"<p>page {index}</p>" for index in range(3)}
+        for url, html in pages.items():
+            file_webcache.write(url, html, metadata=ScrapeUtils.WebcacheMetadata(1000.0, etag=f'"{url}"'))
+        with redirect_stdout(io.StringIO()):
+            file_webcache.write(f"{self.url}-empty", "")
+        backend = ScrapeUtils.Html.use_sqlite_webcache(Path(self.temp_dir.name) / "webcache.sqlite3")
+        self.assertEqual(backend.import_file_webcache(), len(pages))
+        for url, html in pages.items():
+            self.assertTrue(backend.contains(url))
+            self.assertEqual(backend.read(url), html)
+            self.assertEqual(backend.read_metadata(url), ScrapeUtils.WebcacheMetadata(1000.0, etag=f'"{url}"'))
+        self.assertFalse(backend.contains(f"{self.url}-empty"))
+        # Revalidating an imported page updates it, and a page written by url replaces it
+        url = f"{self.url}0"
+        backend.write_metadata(url, ScrapeUtils.WebcacheMetadata(2000.0, etag='"v2"'))
+        self.assertEqual(backend.read_metadata(url), ScrapeUtils.WebcacheMetadata(2000.0, etag='"v2"'))
+        backend.write(url, "<p>new</p>")
+        self.assertEqual(backend.read(url), "<p>new</p>")
+
+    def test_pipeline_chooses_the_webcache_backend(self) -> None:
+        ScrapeUtils.Html.webcache_backend = None
+        self.assertIsInstance(ScrapeUtils.Html.get_webcache_backend(), ScrapeUtils.FileWebcache)
+        with self.assertRaises(TypeError):
+            ScrapeUtils.WebcacheBackend() # type: ignore[abstract]
+        with mock.patch.object(MainWowheadPipeline, "factories", []), mock.patch.object(MainWowheadPipeline, "dry_run", True), \
+                mock.patch.object(MainWowheadPipeline, "use_sqlite_webcache", True), redirect_stdout(io.StringIO()):
+            MainWowheadPipeline.main()
+        backend = ScrapeUtils.Html.get_webcache_backend()
+        assert isinstance(backend, ScrapeUtils.SqliteWebcache)
+        self.assertEqual(backend.db_path, Path(self.temp_dir.name) / ScrapeUtils.SqliteWebcache.DEFAULT_FILENAME)
+
+    def test_streamed_download_is_trimmed(self) -> None:
+        _StandInWowhead.page = "x" * 5000 + "<h1>kept ✓</h1><h2>end</h2>" + "y" * 50000
+        old_chunk_size = ScrapeUtils.Html._stream_chunk_size
+        ScrapeUtils.Html._stream_chunk_size = 7
+        try:
+            html = ScrapeUtils.Html.fetch_url(self.url)
+        finally:
+            ScrapeUtils.Html._stream_chunk_size = old_chunk_size
+        self.assertEqual(html, "<h1>kept ✓</h1><h2>end</h2>")
+
+    def test_streamed_download_without_start_marker_is_refetched(self) -> None:
+        _StandInWowhead.page = "<p>no markers here</p>"
+        html = ScrapeUtils.Html.fetch_url(self.url)
+        self.assertEqual(html, "<p>no markers here</p>")
+        self.assertEqual(_StandInWowhead.statuses, [200, 200])
+
+    def test_trim_stream_matches_trim_start_and_end(self) -> None:
+        rng = random.Random(5)
+        trimmer = ScrapeUtils.Trimmer("", "<start>", "</end>")
+        for _ in range(200):
+            text = ''.join(rng.choice(["a", "<", ">", "/", "<start>", "</end>", "start", "end"]) for _ in range(60))
+            if text.count("</end>") > 1 or "<start>" not in text:
+                continue
+            chunks = []
+            index = 0
+            while index < len(text):
+                size = rng.randint(1, 9)
+                chunks.append(text[index:index + size])
+                index += size
+            expected = ScrapeUtils.Trimmer._trim_start_and_end(text, trimmer.start, trimmer.end)
+            self.assertEqual(trimmer.trim_stream(chunks), expected)
@@ -0,0 +1,51 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src.wow_content_group import WowContentGroup
+from src.wow_item import WowItem
+from src.wow_zone import WowZone
+
+class WowContentGroupSnapshotTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder_patch = mock.patch.object(WowZone, "folder", Path(self.temp_dir.name))
+        self.folder_patch.start()
+        self.group = WowContentGroup("snapshot test", "HC", [1, 2])
+        zone = WowZone.__new__(WowZone) # Skips __init__, which would scrape the zone
+        zone.zone_id = 1
+        item = WowItem.create_empty()
+        item.drop_chances["WarriorArms"] = 25
+        zone.wow_items = [item]
+        self.group.wow_zones = [zone]
+        self.group.world_tour_sim = {"Warrior": {"Trinket": {"WarriorArms": 20}}}
+
+    def tearDown(self) -> None:
+        self.folder_patch.stop()
+        self.temp_dir.cleanup()
+
+    def test_snapshot_round_trip(self) -> None:
+        self.group.save_snapshot()
+        loaded_group = WowContentGroup("snapshot test", "HC", [1, 2])
+        self.assertTrue(loaded_group.load_snapshot())
+        self.assertEqual(loaded_group.world_tour_sim, self.group.world_tour_sim)
+        self.assertEqual(loaded_group.get_all_wow_items()[0].drop_chances.as_dict(), {"WarriorArms": 25})
+
+    def test_snapshot_of_other_version_or_zones_is_ignored(self) -> None:
+        self.group.save_snapshot()
+        self.assertFalse(WowContentGroup("snapshot test", "HC", [1, 3]).load_snapshot())
+        with mock.patch.object(WowContentGroup, "SNAPSHOT_VERSION", WowContentGroup.SNAPSHOT_VERSION + 1):
+            self.assertFalse(WowContentGroup("snapshot test", "HC", [1, 2]).load_snapshot())
+
+    def test_failed_save_keeps_the_previous_snapshot(self) -> None:
+        self.group.save_snapshot()
+        self.group.world_tour_sim = {}
+        with mock.patch("src.wow_content_group.pickle.dump", side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                self.group.save_snapshot()
+        loaded_group = WowContentGroup("snapshot test", "HC", [1, 2])
+        self.assertTrue(loaded_group.load_snapshot())
+        self.assertEqual(loaded_group.world_tour_sim, {"Warrior": {"Trinket": {"WarriorArms": 20}}})
+        self.assertEqual([path.name for path in Path(self.temp_dir.name).iterdir()], ["snapshot_test.pickle"])
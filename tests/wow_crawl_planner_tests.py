@@ -0,0 +1,107 @@
+import io
+import json
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+from scrape_utils import ScrapeUtils
+from src.main_wowhead_pipeline import MainWowheadPipeline
+from src.wow_content_group import WowContentGroup
+from src.wow_content_group_scraper import WowContentGroupScraper
+from src.wow_crawl_planner import WowCrawlPlanner
+from src.wow_item_scraper import WowItemScraper
+from src.wow_registry import WowRegistry
+from src.wow_zone_scraper import WowZoneScraper
+
+class WowCrawlPlannerTests(unittest.TestCase):
+
+    ZONE_SUBPAGE = "war-within/dungeons"
+    ZONE_ID = 99001
+    ITEM_IDS = [5, 6]
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.old_folder = ScrapeUtils.Html.html_webcache_folder
+        ScrapeUtils.Html.html_webcache_folder = Path(self.temp_dir.name) / "webcache"
+        ScrapeUtils.Html.webcache_backend = ScrapeUtils.FileWebcache()
+        ScrapeUtils.Html._webcache.clear()
+        ScrapeUtils.Html._ttl_policies.clear()
+        WowRegistry.clear()
+        self.zone_list_url = WowContentGroupScraper.get_wowhead_zone_list_url(WowCrawlPlannerTests.ZONE_SUBPAGE)
+        self.zone_url = WowZoneScraper.get_wowhead_zone_url(WowCrawlPlannerTests.ZONE_ID)
+        # Any request fails the test: planning only reads the caches
+        self.urlopen = mock.patch("scrape_utils.urlopen", side_effect=AssertionError("Planning sent a request")).start()
+
+    def tearDown(self) -> None:
+        mock.patch.stopall()
+        ScrapeUtils.Html.webcache_backend = None
+        ScrapeUtils.Html.html_webcache_folder = self.old_folder
+        ScrapeUtils.Html._webcache.clear()
+        ScrapeUtils.Html._ttl_policies.clear()
+        WowRegistry.clear()
+        self.temp_dir.cleanup()
+
+    def _cache_page(self, url: str, html: str, age_seconds: float = 0) -> None:
+        metadata = ScrapeUtils.WebcacheMetadata(time.time() - age_seconds)
+        ScrapeUtils.Html.get_webcache_backend().write(url, html, metadata=metadata)
+
+    def _cache_zone_pages(self, zone_age_seconds: float = 0) -> None:
+        zone_list = json.dumps([{"id": WowCrawlPlannerTests.ZONE_ID, "name": "Test Zone"}])
+        self._cache_page(self.zone_list_url, f'<script type="text/javascript">//\nvar x = {{data: {zone_list}}};\n//]]></script>')
+        items = json.dumps({str(item_id): {"name_enus": f"Item {item_id}"} for item_id in WowCrawlPlannerTests.ITEM_IDS})
+        self._cache_page(self.zone_url, '<div class="text"><h1 class="heading-size-1"><span>Test Zone</span></h1>\n'
+                         '<ul><li><div><a href="/npc=1/boss-a">Boss A</a> stuff</div></li></ul>\n'
+                         f'WH.Gatherer.addData(3, 1, {items});\nvar tabsRelated = new Tabs', zone_age_seconds)
+
+    def _plan_cache_only(self) -> WowCrawlPlanner:
+        ScrapeUtils.Html.feature_flag_cache_only = True
+        try:
+            with redirect_stdout(io.StringIO()):
+                planner = WowCrawlPlanner([WowContentGroup("Test group", "Hc", [], WowCrawlPlannerTests.ZONE_SUBPAGE)])
+                planner.plan(fetch_missing=False)
+        finally:
+            ScrapeUtils.Html.feature_flag_cache_only = False
+        return planner
+
+    def test_cached_pages_are_planned_as_cache_hits(self) -> None:
+        self._cache_zone_pages()
+        report = self._plan_cache_only().create_report()
+        item_urls = [WowItemScraper.get_wowhead_item_url(item_id) for item_id in WowCrawlPlannerTests.ITEM_IDS]
+        self.assertEqual(report[WowCrawlPlanner.CACHE_HIT], [self.zone_list_url, self.zone_url])
+        self.assertEqual(report[WowCrawlPlanner.NETWORK], item_urls)
+        self.assertEqual(report[WowCrawlPlanner.UNRESOLVED_ZONES], [])
+        self.urlopen.assert_not_called()
+
+    def test_missing_zone_list_is_not_fetched(self) -> None:
+        report = self._plan_cache_only().create_report()
+        self.assertEqual(report[WowCrawlPlanner.CACHE_HIT], [])
+        self.assertEqual(report[WowCrawlPlanner.NETWORK], [self.zone_list_url])
+        self.assertEqual(report[WowCrawlPlanner.UNRESOLVED_ZONE_LISTS], [self.zone_list_url])
+        self.assertEqual([path for path in ScrapeUtils.Html.html_webcache_folder.rglob("*") if path.is_file()], [])
+        self.urlopen.assert_not_called()
+
+    def test_expired_zone_page_is_planned_as_network_request(self) -> None:
+        ScrapeUtils.Html.register_ttl_policy("wowhead.com/zone=", 3600)
+        self._cache_zone_pages(zone_age_seconds=7200)
+        report = self._plan_cache_only().create_report()
+        self.assertEqual(report[WowCrawlPlanner.CACHE_HIT], [self.zone_list_url])
+        self.assertEqual(report[WowCrawlPlanner.NETWORK], [self.zone_url])
+        self.assertEqual(report[WowCrawlPlanner.UNRESOLVED_ZONES], [str(WowCrawlPlannerTests.ZONE_ID)])
+        self.urlopen.assert_not_called()
+
+    def test_plan_only_run_builds_its_content_groups_without_requests(self) -> None:
+        group = mock.Mock(wraps=lambda: WowContentGroup("Test group", "Hc", [], WowCrawlPlannerTests.ZONE_SUBPAGE))
+        with mock.patch.object(MainWowheadPipeline, "factories", [group]), mock.patch.object(MainWowheadPipeline, "plan_only", True):
+            output = io.StringIO()
+            with redirect_stdout(output):
+                MainWowheadPipeline.main()
+        group.assert_called_once()
+        self.assertIn(f"Info: Zone ids of {self.zone_list_url} are unknown until it is fetched", output.getvalue())
+        self.assertFalse(ScrapeUtils.Html.feature_flag_cache_only)
+        self.urlopen.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import io
+import random
+import unittest
+from contextlib import redirect_stdout
+from typing import List
+
+from src.wow_consts.wow_spec import WowSpec
+from src.wow_drop_chance_matrix import WowDropChanceMatrix
+from src.wow_item import WowItem
+from src.wow_item_table import WowItemTable
+
+class WowDropChanceMatrixTests(unittest.TestCase):
+
+    @staticmethod
+    def _create_items(seed: int) -> List[WowItem]:
+        """Items of a few bosses, including mounts, items without specs and item ids shared by two bosses"""
+        rng = random.Random(seed)
+        items: List[WowItem] = []
+        for index in range(120):
+            item = WowItem.create_empty()
+            item.item_id = 1000 + rng.randrange(100)
+            item.gear_slot = rng.choice(["Chest", "Trinket", ""])
+            item.gear_type = rng.choice(["Plate", "Cloth", "Cosmetic"]) if index % 10 == 0 else "Leather"
+            item.dropped_by = rng.choice(["Ulgrax the Devourer", "Ulgrax, the Devourer", "Sikran", "Queen Ansurek", ""])
+            item.spec_ids = rng.sample(WowSpec.get_all_spec_ids(), rng.randint(0, 12))
+            items.append(item)
+        return items
+
+    def test_matrix_matches_per_item_calculation(self) -> None:
+        # With an item id shared by two bosses, the boss of the last of those items wins.
+        # If the losing boss has no other item, the per-item calculation fails, and so must the matrix.
+        for seed in range(10):
+            items = self._create_items(seed)
+            try:
+                with redirect_stdout(io.StringIO()):
+                    for item in items:
+                        item.calculate_drop_chance_per_spec(items)
+            except KeyError:
+                with self.assertRaises(KeyError), redirect_stdout(io.StringIO()):
+                    WowDropChanceMatrix(WowItemTable(items)).fill_drop_chances()
+                continue
+            per_item_drop_chances = [list(item.drop_chances.items()) for item in items]
+            for item in items:
+                item.drop_chances.clear()
+            WowDropChanceMatrix(WowItemTable(items)).fill_drop_chances()
+            self.assertEqual([list(item.drop_chances.items()) for item in items], per_item_drop_chances)
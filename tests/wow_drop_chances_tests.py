@@ -0,0 +1,41 @@
+import copy
+import unittest
+
+from src.wow_drop_chances import WowDropChances, WowDropChanceTable
+from src.wow_item import WowItem
+
+class WowDropChancesTests(unittest.TestCase):
+
+    def test_values_are_numeric_and_missing_ones_raise(self) -> None:
+        drop_chances = WowDropChances()
+        drop_chances["WarriorArms"] = 33
+        self.assertEqual(drop_chances["WarriorArms"], 33)
+        self.assertIsNone(drop_chances.get("WarriorFury"))
+        self.assertNotIn("WarriorFury", drop_chances)
+        with self.assertRaises(KeyError):
+            drop_chances["WarriorFury"]
+
+    def test_share_keeps_values_in_one_table(self) -> None:
+        items = [WowItem.create_empty() for _ in range(3)]
+        for index, item in enumerate(items):
+            item.drop_chances["Warrior"] = index * 10
+        table = WowItem.share_drop_chance_table(items)
+        self.assertEqual(len(table.values), 3 * len(WowDropChanceTable.COLUMNS))
+        self.assertTrue(all(item.drop_chances.table is table for item in items))
+        self.assertEqual([item.drop_chances["Warrior"] for item in items], [0, 10, 20])
+        items[1].drop_chances["Warrior"] = 50
+        self.assertEqual([item.drop_chances["Warrior"] for item in items], [0, 50, 20])
+
+    def test_percent_strings_only_in_csv_rows(self) -> None:
+        item = WowItem.create_empty()
+        item.drop_chances["WarriorArms"] = 50
+        item.drop_chances["WarriorFury"] = 25
+        item.drop_chances["WarriorProt"] = 50
+        item.drop_chances["Warrior"] = 50
+        pretty_item = copy.deepcopy(item)
+        pretty_item.prettify_table_by_removing_duplicate_droprates()
+        self.assertEqual(item.drop_chances["Warrior"], 50)
+        row_data = pretty_item.create_csv_row_data()
+        self.assertEqual([row_data[key] for key in ("WarriorArms", "WarriorFury", "WarriorProt", "Warrior")],
+                         [WowItem.DROP_CHANCE_REPLACEMENT, "25%", WowItem.DROP_CHANCE_REPLACEMENT, "50%"])
+        self.assertNotIn("Mage", row_data)
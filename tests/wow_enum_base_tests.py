@@ -0,0 +1,54 @@
+import unittest
+
+from src.wow_consts.wow_class import WowClass
+from src.wow_consts.wow_equip_slot import WowEquipSlot
+from src.wow_consts.wow_equip_type_armor import WowEquipTypeArmor
+from src.wow_consts.wow_equip_type_weapon import WowEquipTypeWeapon
+from src.wow_consts.wow_loot_category import WowLootCategory
+from src.wow_consts.wow_role import WowRole
+from src.wow_consts.wow_spec import WowSpec
+from src.wow_consts.wow_stat_primary import WowStatPrimary
+from src.wow_consts.wow_stat_secondary import WowStatSecondary
+
+class WowEnumBaseTests(unittest.TestCase):
+
+    ENUMS = [WowClass, WowEquipSlot, WowEquipTypeArmor, WowEquipTypeWeapon, WowLootCategory, WowRole, WowSpec,
+             WowStatPrimary, WowStatSecondary]
+
+    def test_lookups_match_linear_scans(self) -> None:
+        for enum_class in WowEnumBaseTests.ENUMS:
+            for member in enum_class:
+                abbr = ''.join(word.capitalize() for word in member.name.split('_'))
+                self.assertEqual(member.get_abbr(), abbr)
+                self.assertIs(enum_class.get_from_abbr(abbr), next(m for m in enum_class if m.get_abbr() == abbr))
+                self.assertIs(enum_class.get_from_ingame_name(member.get_ingame_name()),
+                              next(m for m in enum_class if m.get_ingame_name() == member.get_ingame_name()))
+                self.assertTrue(member.is_in_enum_set(abbr))
+            self.assertIsNone(enum_class.get_from_ingame_name("Not a value"))
+            with self.assertRaises(ValueError):
+                enum_class.get_from_abbr("NotAnAbbr")
+
+    def test_spec_lookups_return_copies(self) -> None:
+        self.assertIs(WowSpec.get_spec_from_id(73), WowSpec.WARRIOR_PROT)
+        self.assertEqual(WowSpec.get_all_spec_ids_for_class(WowClass.WARRIOR), [71, 72, 73])
+        self.assertEqual(WowSpec.get_all_spec_ids_for_role(WowRole.TANK),
+                         [spec.get_spec_id() for spec in WowSpec if spec.get_role() == WowRole.TANK])
+        WowSpec.get_all_spec_ids().clear()
+        WowSpec.get_all().clear()
+        self.assertEqual(len(WowSpec.get_all_spec_ids()), len(WowSpec))
+        self.assertEqual(len(WowSpec.get_all()), len(WowSpec))
+        with self.assertRaises(ValueError):
+            WowSpec.get_spec_from_id(-1)
+
+    def test_spec_masks(self) -> None:
+        mask = WowSpec.get_mask_from_spec_ids([73, 250, 71, 71])
+        self.assertEqual(WowSpec.get_spec_ids_from_mask(mask), [250, 71, 73])
+        self.assertIs(WowSpec.intern_spec_ids([73, 250, 71, 71]), WowSpec.intern_spec_ids((73, 250, 71, 71)))
+        self.assertIs(WowSpec.get_mask_from_spec_ids([250, 71, 73]), mask) # Interned
+        self.assertEqual(mask & WowSpec.get_mask_for_class(WowClass.WARRIOR), WowSpec.get_mask_from_spec_ids([71, 73]))
+        self.assertEqual(mask & WowSpec.get_mask_for_role(WowRole.TANK), WowSpec.get_mask_from_spec_ids([250, 73]))
+        self.assertTrue(WowSpec.has_spec_id(mask, 250))
+        self.assertFalse(WowSpec.has_spec_id(mask, 72))
+        self.assertEqual(WowSpec.get_spec_ids_from_mask(WowSpec.get_all_specs_mask()), WowSpec.get_all_spec_ids())
+        with self.assertRaises(ValueError):
+            WowSpec.get_mask_from_spec_ids([-1])
@@ -0,0 +1,71 @@
+import csv
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.wow_consts.wow_spec import WowSpec
+from src.wow_drop_chance_matrix import WowDropChanceMatrix
+from src.wow_item import WowItem
+from src.wow_item_csv_exporter import WowItemCsvExporter
+from src.wow_item_table import WowItemTable
+
+class WowItemCsvExporterTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.items = []
+        for item_id, gear_slot, dropped_by, spec_ids in [(2, "Chest", "Ulgrax", [71, 72, 73]), (1, "Chest", "Ulgrax", [71]),
+                                                         (3, "Trinket", "Sikran", [72]), (4, "", "Sikran", [71])]:
+            item = WowItem.create_empty()
+            item.item_id = item_id
+            item.name = f"Item {item_id}"
+            item.gear_slot = gear_slot
+            item.gear_type = "Plate"
+            item.dropped_by = dropped_by
+            item.spec_ids = spec_ids
+            item.loot_category = "Chest" if gear_slot == "Chest" else "DpsTrinket"
+            self.items.append(item)
+        self.item_table = WowItemTable(self.items)
+        WowDropChanceMatrix(self.item_table).fill_drop_chances()
+
+    def test_class_csv_is_sorted_and_prettified_without_touching_the_items(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            WowItemCsvExporter.export_items_to_csv_for_all_specs_and_classes(self.item_table, Path(temp_dir))
+            with open(Path(temp_dir) / "Warrior.csv", newline='') as file:
+                rows = list(csv.DictReader(file))
+        self.assertEqual([row[WowItem.COLUMN_ITEM_ID] for row in rows], ["1", "2", "3"]) # No mount, sorted by category and id
+        self.assertEqual([(row["Warrior"], row["WarriorArms"], row["WarriorFury"]) for row in rows],
+                         [("50%", "", "0%"), ("100%", "50%", ""), ("100%", "0%", "")])
+        self.assertEqual(self.items[0].drop_chances["WarriorArms"], 50)
+
+    def test_per_spec_csvs_are_filtered_from_the_class_rows(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            WowItemCsvExporter.export_items_to_csv_for_all_specs_and_classes(self.item_table, Path(temp_dir), per_spec=True)
+            with open(Path(temp_dir) / "WarriorArms.csv", newline='') as file:
+                rows = list(csv.DictReader(file))
+            self.assertTrue((Path(temp_dir) / "DhHavoc.csv").exists()) # Written even without items
+            self.assertEqual(list(Path(temp_dir).glob("*.tmp")) + list(Path(temp_dir).glob(".*.tmp")), [])
+        self.assertEqual([row[WowItem.COLUMN_ITEM_ID] for row in rows], ["1", "2"])
+        self.assertEqual(list(rows[0].keys()), [WowItem.COLUMN_LOOT_CATEGORY, WowItem.COLUMN_FROM, WowItem.COLUMN_BOSS,
+                                                WowItem.COLUMN_WEEK, WowItem.COLUMN_STATS, "Warrior", "WarriorArms", WowItem.COLUMN_ITEM_ID])
+
+    def test_joined_row_groups_match_filtering_every_row(self) -> None:
+        rng = random.Random(0)
+        all_spec_ids = WowSpec.get_all_spec_ids()
+        items = []
+        for item_id in range(200):
+            item = WowItem.create_empty()
+            item.item_id = item_id
+            item.spec_ids = rng.sample(all_spec_ids, rng.choice([1, 2, 3, 39]))
+            items.append(item)
+        item_table = WowItemTable(items)
+        sorted_rows = list(range(item_table.row_count))
+        rng.shuffle(sorted_rows)
+        row_groups = WowItemCsvExporter._group_rows_by_spec_mask(item_table, sorted_rows)
+        positions = [0] * item_table.row_count
+        for position, row in enumerate(sorted_rows):
+            positions[row] = position
+        for spec_ids in [[spec_id] for spec_id in all_spec_ids] + [[71, 72, 73], [250, 577], all_spec_ids]:
+            spec_mask = WowSpec.get_mask_from_spec_ids(spec_ids)
+            self.assertEqual(WowItemCsvExporter._join_row_groups(row_groups, positions, spec_ids),
+                             [row for row in sorted_rows if item_table.spec_masks[row] & spec_mask])
@@ -0,0 +1,44 @@
+import io
+import random
+import unittest
+from contextlib import redirect_stdout
+from typing import Any, Dict
+
+from src.wow_item_scraper import WowItemScraper
+
+class WowItemExtractorTests(unittest.TestCase):
+
+    FRAGMENTS = [
+        '<h1 class="heading-size-1">', 'Sword of Tests', '</h1>', '\n', 'Item Level <!--ilvl-->', '639', 'x',
+        '<table width="100%"><tr><td>', 'Trinket', '</td><th><!--scstart2:4--><span class="q1">', 'Plate',
+        '</span><!--scend--></th></tr></table>', '</td>', 'Requires Level <!--rlvl-->', '80',
+        '<span class="moneygold">', '<span class="moneysilver">', '<span class="moneycopper">', '12', '</span>',
+        'Dropped by: ', 'Ulgrax', '</div>', '<div class="iconsmall spec', '250', '"', 'Binds when picked up',
+        'Unique-Equipped', 'Valid only for tank specializations.', '+', '1,234', ' ', '[', ']', 'Agility',
+        'Strength', 'Intellect', 'Stamina', ',', '  ', 'Critical Strike', 'Haste', 'Mastery', 'Versatility',
+    ]
+
+    @staticmethod
+    def _scrape(html: str, single_pass: bool) -> Dict[str, Any]:
+        old_flag = WowItemScraper.feature_flag_single_pass_extractor
+        WowItemScraper.feature_flag_single_pass_extractor = single_pass
+        try:
+            with redirect_stdout(io.StringIO()): # Random pages trigger the 'Only valid for tanks' warning
+                scraper = WowItemScraper(1, html)
+        except ValueError as error: # e.g. a stat value of only commas, which both ways fail to parse
+            return {"error": str(error)}
+        finally:
+            WowItemScraper.feature_flag_single_pass_extractor = old_flag
+        fields = {key: value for key, value in vars(scraper).items() if key != "html_string"}
+        fields["primary_stat_order"] = list(scraper.primary_stats)
+        fields["secondary_stat_order"] = list(scraper.secondary_stats)
+        return fields
+
+    def test_single_pass_matches_per_field_extraction(self) -> None:
+        rng = random.Random(7)
+        for _ in range(2000):
+            html = ''.join(rng.choice(WowItemExtractorTests.FRAGMENTS) for _ in range(rng.randint(0, 80)))
+            self.assertEqual(self._scrape(html, True), self._scrape(html, False), html)
+
+    def test_empty_html(self) -> None:
+        self.assertEqual(self._scrape("", True), self._scrape("", False))
@@ -0,0 +1,28 @@
+import unittest
+
+from src.wow_item import WowItem
+from src.wow_item_index import WowItemIndex
+from tests.wow_item_test_data import WowItemTestData
+
+class WowItemIndexTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.items = WowItemTestData.create_stonevault_items()
+        self.index = WowItemIndex(self.items)
+
+    def test_spec_lookup_matches_linear_scan_in_stable_order(self) -> None:
+        for spec_id in (71, 72, 73, 250):
+            self.assertEqual(self.index.get_items_for_spec(spec_id), WowItem.get_all_items_for_spec(spec_id, self.items))
+        self.assertEqual(self.index.get_items_for_specs([73, 72]), [self.items[1], self.items[3], self.items[0]])
+
+    def test_slot_boss_and_zone_lookups(self) -> None:
+        self.assertEqual(self.index.get_items_for_spec_and_gear_slot(73, "Chest"), [self.items[3]])
+        self.assertEqual(self.index.get_items_for_gear_slot("Chest"), [self.items[0], self.items[3]])
+        self.assertEqual(self.index.get_items_for_boss("skarmorak"), [self.items[1], self.items[2]])
+        self.assertEqual(self.index.get_items_for_zone("The Stonevault"), self.items)
+
+    def test_added_items_are_indexed_once(self) -> None:
+        extra_item = WowItemTestData.create_item(5, "Chest", "E.D.N.A.", [71])
+        self.index.add_items([extra_item, self.items[0]])
+        self.assertEqual(self.index.get_items_for_spec(71), [self.items[0], extra_item])
+        self.assertEqual(len(self.index.all_items), 5)
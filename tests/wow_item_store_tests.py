@@ -0,0 +1,42 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src.wow_item_scraper import WowItemScraper
+from src.wow_item_store import WowItemStore
+
+class WowItemStoreTests(unittest.TestCase):
+
+    HTML = ('<h1 class="heading-size-1">Stored Blade</h1>Item Level <!--ilvl-->639<table width="100%"><tr><td>One-Hand'
+            '</td></tr></table>+1,234 [Agility or Strength] 456 Haste 789 Mastery Dropped by: Ulgrax</div>')
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = Path(self.temp_dir.name)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def _load_or_scrape(self, html: str) -> WowItemScraper:
+        with mock.patch.object(WowItemScraper, "fetch_wowhead_item_html", return_value=html):
+            return WowItemStore.load_or_scrape(1, self.folder)
+
+    def test_stored_fields_equal_parsed_fields(self) -> None:
+        parsed = self._load_or_scrape(WowItemStoreTests.HTML)
+        with mock.patch.object(WowItemScraper, "__init__", side_effect=AssertionError("html was parsed again")):
+            stored = self._load_or_scrape(WowItemStoreTests.HTML)
+        self.assertEqual(stored.get_fields(), parsed.get_fields())
+
+    def test_changed_html_is_parsed_again(self) -> None:
+        self._load_or_scrape(WowItemStoreTests.HTML)
+        scraper = self._load_or_scrape(WowItemStoreTests.HTML.replace("Stored Blade", "Renamed Blade"))
+        self.assertEqual(scraper.name, "Renamed Blade")
+
+    def test_new_parser_version_is_parsed_again(self) -> None:
+        self._load_or_scrape(WowItemStoreTests.HTML)
+        with mock.patch.object(WowItemScraper, "PARSER_VERSION", WowItemScraper.PARSER_VERSION + 1):
+            self._load_or_scrape(WowItemStoreTests.HTML)
+            record = WowItemStore.read_record(1, self.folder)
+        assert record is not None
+        self.assertEqual(record["parser_version"], WowItemScraper.PARSER_VERSION + 1)
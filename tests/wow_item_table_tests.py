@@ -0,0 +1,60 @@
+import unittest
+
+from src.wow_consts.wow_stat_primary import WowStatPrimary
+from src.wow_item import WowItem
+from src.wow_item_index import WowItemIndex
+from src.wow_item_table import WowItemTable
+from tests.wow_item_test_data import WowItemTestData
+
+class WowItemTableTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.items = WowItemTestData.create_stonevault_items()
+        self.index = WowItemIndex(self.items)
+        self.table = WowItemTable(self.index.all_items)
+
+    def test_rows_match_item_index(self) -> None:
+        for spec_id in (71, 72, 73, 250):
+            self.assertEqual([self.table.item_ids[row] for row in self.table.get_rows_for_spec(spec_id)],
+                             [item.item_id for item in self.index.get_items_for_spec(spec_id)])
+        self.assertEqual(self.table.get_rows_for_specs([73, 72]), [1, 3, 0])
+        self.assertEqual(self.table.get_rows_for_spec_and_gear_slot(73, "Chest"), [3])
+        self.assertTrue(self.table.has_mainstat(0, WowStatPrimary.STR))
+        self.assertFalse(self.table.has_mainstat(0, WowStatPrimary.INT))
+
+    def test_row_view_has_the_fields_of_the_item(self) -> None:
+        self.items[0].drop_chances["WarriorArms"] = 50
+        for row, item in enumerate(self.items):
+            self.assertEqual(vars(self.table.get_item(row)), vars(item))
+        self.table.get_item(0).drop_chances["WarriorArms"] = 25 # Views and items share the drop chance table
+        self.assertEqual(self.items[0].drop_chances["WarriorArms"], 25)
+        self.assertEqual(self.table.get_drop_chance(0, "WarriorArms"), 25)
+
+    def test_repeated_values_are_stored_once(self) -> None:
+        self.assertEqual(self.table.columns["gear_type"].values, ["Plate"])
+        self.assertEqual(len(self.table.boss_href_names.values), 3)
+
+    def test_spec_ids_keep_the_order_of_the_item_page(self) -> None:
+        item = WowItemTestData.create_item(5, "Chest", "E.D.N.A.", [73, 71])
+        row_view = WowItemTable([item]).get_item(0)
+        self.assertEqual(row_view.create_csv_row_data()[WowItem.COLUMN_SPEC_IDS], "73, 71")
+        self.assertEqual(row_view.create_csv_row_data()[WowItem.COLUMN_SPEC_NAMES], "WarriorProt, WarriorArms")
+        self.assertIs(row_view.spec_names, item.spec_names) # Derived once per distinct spec_ids, not stored per item
+        self.assertEqual(row_view.spec_mask, item.spec_mask)
+        self.assertTrue(row_view.has_spec_id(71))
+        self.assertFalse(row_view.has_spec_id(72))
+
+    def test_spec_names_override_is_kept_by_its_row_only(self) -> None:
+        statistics_row = WowItemTestData.create_item(6, "Chest", "E.D.N.A.", [71])
+        statistics_row.spec_names_override = ("WarriorArms", "WarriorFury")
+        table = WowItemTable([self.items[0], statistics_row])
+        self.assertEqual(table.get_item(1).create_csv_row_data()[WowItem.COLUMN_SPEC_NAMES], "WarriorArms, WarriorFury")
+        self.assertIsNone(table.get_item(0).spec_names_override)
+        self.assertEqual(vars(table.get_item(0)), vars(self.items[0]))
+
+    def test_new_table_rebinds_the_drop_chances_of_its_items(self) -> None:
+        self.items[0].drop_chances["WarriorArms"] = 50
+        new_table = WowItemTable(self.items)
+        self.items[0].drop_chances["WarriorArms"] = 25
+        self.assertEqual(new_table.get_drop_chance(0, "WarriorArms"), 25)
+        self.assertEqual(self.table.get_drop_chance(0, "WarriorArms"), 50) # The earlier table keeps its copy
@@ -0,0 +1,28 @@
+from typing import List
+
+from src.wow_item import WowItem
+
+class WowItemTestData:
+    """Items shared by the item index and item table tests"""
+
+    @staticmethod
+    def create_item(item_id: int, gear_slot: str, dropped_by: str, spec_ids: List[int]) -> WowItem:
+        item = WowItem.create_empty()
+        item.item_id = item_id
+        item.gear_slot = gear_slot
+        item.gear_type = "Plate"
+        item.primary_stats = {"Strength": 1000}
+        item.dropped_by = dropped_by
+        item.dropped_in = "The Stonevault"
+        item.spec_ids = spec_ids
+        return item
+
+    @staticmethod
+    def create_stonevault_items() -> List[WowItem]:
+        """Items out of item id order, with a repeated spec id and an item without gear slot"""
+        return [
+            WowItemTestData.create_item(3, "Chest", "E.D.N.A.", [71, 72]),
+            WowItemTestData.create_item(1, "Trinket", "Skarmorak", [72, 72, 73]),
+            WowItemTestData.create_item(2, "", "Skarmorak", [71]), # Mount or quest item
+            WowItemTestData.create_item(4, "Chest", "Master Machinists Brokk and Dorlita", [73]),
+        ]
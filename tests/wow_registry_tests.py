@@ -0,0 +1,52 @@
+import unittest
+
+from src.wow_item import WowItem
+from src.wow_item_scraper import WowItemScraper
+from src.wow_item_store import WowItemStore
+from src.wow_registry import WowRegistry
+from src.wow_zone_scraper import WowZoneScraper
+from scrape_utils import ScrapeUtils
+
+class WowRegistryTests(unittest.TestCase):
+
+    ZONE_HTML = '<h1 class="heading-size-1"><span>Test Zone</span></h1>WH.Gatherer.addData(3, 1, {"900001": {}, "900002": {}});'
+
+    def setUp(self) -> None:
+        WowRegistry.clear()
+        self.old_store_enabled = WowItemStore.enabled
+        WowItemStore.enabled = False
+        for item_id in (900001, 900002):
+            ScrapeUtils.Html._webcache[WowItemScraper.get_wowhead_item_url(item_id)] = f"<h1>Item {item_id}</h1>"
+
+    def tearDown(self) -> None:
+        WowRegistry.clear()
+        WowItemStore.enabled = self.old_store_enabled
+        for item_id in (900001, 900002):
+            ScrapeUtils.Html._webcache.pop(WowItemScraper.get_wowhead_item_url(item_id), None)
+
+    def test_each_id_is_parsed_once(self) -> None:
+        zone = WowRegistry.get_zone(900000, WowRegistryTests.ZONE_HTML)
+        self.assertIs(WowRegistry.get_zone(900000, "other html is not parsed again"), zone)
+        self.assertEqual(zone.item_ids, [900001, 900002])
+        item = WowRegistry.get_item(900001, WowItem.json_folder)
+        self.assertIs(WowRegistry.get_item(900001, WowItem.json_folder), item)
+        self.assertEqual(WowRegistry.get_missing_item_ids(zone.item_ids), [900002])
+
+    def test_items_of_two_groups_share_the_record_but_not_their_state(self) -> None:
+        first_group_item = WowItem(900001)
+        second_group_item = WowItem(900001)
+        self.assertIsNot(first_group_item, second_group_item)
+        self.assertIs(first_group_item.primary_stats, WowRegistry.get_item(900001, WowItem.json_folder).primary_stats)
+        first_group_item.week = "1"
+        first_group_item.drop_chances["WarriorArms"] = 50
+        self.assertEqual(second_group_item.week, WowItem.UNINITIALIZED_VALUE)
+        self.assertNotIn("WarriorArms", second_group_item.drop_chances)
+
+    def test_disabled_registry_parses_every_time(self) -> None:
+        WowRegistry.enabled = False
+        try:
+            self.assertIsNot(WowRegistry.get_zone(900000, WowRegistryTests.ZONE_HTML),
+                             WowRegistry.get_zone(900000, WowRegistryTests.ZONE_HTML))
+        finally:
+            WowRegistry.enabled = True
+        self.assertIsInstance(WowRegistry.get_zone(900000, WowRegistryTests.ZONE_HTML), WowZoneScraper)
@@ -0,0 +1,116 @@
+import io
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+from scrape_utils import ScrapeUtils
+from src.main_wowhead_pipeline import MainWowheadPipeline
+from src.pipeline_stage_graph import PipelineStageGraph
+
+class WriteBehindTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = Path(self.temp_dir.name)
+        self.write_behind = ScrapeUtils.Persistence.use_write_behind(max_queued=4)
+
+    def tearDown(self) -> None:
+        try:
+            ScrapeUtils.Persistence.stop_write_behind()
+        finally:
+            self.temp_dir.cleanup()
+
+    def test_queued_writes_are_readable_before_and_written_at_flush(self) -> None:
+        release = threading.Event()
+        self.write_behind.submit(release.wait) # Holds the writer thread until the writes are queued
+        path = self.folder / "sim" / "Warrior.json"
+        ScrapeUtils.Persistence.write_textfile(path, "{\"a\": 1}")
+        ScrapeUtils.Persistence.write_textfile(path, "{\"a\": 2}")
+        self.assertFalse(path.exists())
+        self.assertEqual(ScrapeUtils.Persistence.read_textfile(path), "{\"a\": 2}")
+        release.set()
+        ScrapeUtils.Persistence.flush()
+        self.assertEqual(path.read_text(encoding='utf-8'), "{\"a\": 2}")
+        self.assertEqual(list(path.parent.glob(".*.tmp")), [])
+
+    def test_bounded_queue_writes_every_file_in_order(self) -> None:
+        for index in range(50):
+            ScrapeUtils.Persistence.write_textfile(self.folder / "items" / f"{index % 5}.csv", str(index))
+        ScrapeUtils.Persistence.flush()
+        self.assertEqual([(self.folder / "items" / f"{index}.csv").read_text(encoding='utf-8') for index in range(5)],
+                         ["45", "46", "47", "48", "49"])
+
+    def test_errors_are_raised_at_the_next_flush(self) -> None:
+        (self.folder / "not_a_folder").write_text("", encoding='utf-8')
+        ScrapeUtils.Persistence.write_textfile(self.folder / "fine.csv", "a")
+        self.write_behind.write_textfile(self.folder / "not_a_folder" / "item.json", "{}")
+        with self.assertRaises(OSError):
+            ScrapeUtils.Persistence.flush()
+        ScrapeUtils.Persistence.flush() # Each error is raised once
+        self.assertTrue((self.folder / "fine.csv").exists())
+
+    def test_file_webcache_sees_queued_pages(self) -> None:
+        old_folder = ScrapeUtils.Html.html_webcache_folder
+        ScrapeUtils.Html.html_webcache_folder = self.folder / "webcache"
+        try:
+            backend = ScrapeUtils.FileWebcache()
+            url = "https://www.wowhead.com/item=1"
+            release = threading.Event()
+            self.write_behind.submit(release.wait)
+            backend.write(url, "<h1>item</h1>", metadata=ScrapeUtils.WebcacheMetadata(1000.0, etag='"v1"'))
+            self.assertFalse(ScrapeUtils.Html._get_path_for_cached_html(url).exists())
+            self.assertTrue(backend.contains(url))
+            self.assertEqual(backend.read_metadata(url), ScrapeUtils.WebcacheMetadata(1000.0, etag='"v1"'))
+            release.set()
+            ScrapeUtils.Persistence.flush()
+            self.assertEqual(backend.read_metadata(url), ScrapeUtils.WebcacheMetadata(1000.0, etag='"v1"'))
+        finally:
+            ScrapeUtils.Html.html_webcache_folder = old_folder
+
+    def test_removed_validators_are_not_left_by_a_queued_write(self) -> None:
+        old_folder = ScrapeUtils.Html.html_webcache_folder
+        ScrapeUtils.Html.html_webcache_folder = self.folder / "webcache"
+        try:
+            backend = ScrapeUtils.FileWebcache()
+            url = "https://www.wowhead.com/item=1"
+            self.write_behind = ScrapeUtils.Persistence.use_write_behind(max_queued=16) # Room for every job held below
+            release = threading.Event()
+            self.write_behind.submit(release.wait) # The page and its validators are still queued below
+            backend.write(url, "<h1>item</h1>", metadata=ScrapeUtils.WebcacheMetadata(1000.0, etag='"v1"'))
+            backend.write_metadata(url, ScrapeUtils.WebcacheMetadata(2000.0))
+            self.assertEqual(backend.read_metadata(url), ScrapeUtils.WebcacheMetadata(2000.0))
+            release.set()
+            ScrapeUtils.Persistence.flush()
+            self.assertEqual(backend.read_metadata(url), ScrapeUtils.WebcacheMetadata(2000.0))
+            self.assertEqual(list((self.folder / "webcache").rglob("*.meta")), [])
+            # Validators written again after the queued deletion are kept
+            backend.write_metadata(url, ScrapeUtils.WebcacheMetadata(3000.0))
+            backend.write_metadata(url, ScrapeUtils.WebcacheMetadata(3000.0, etag='"v2"'))
+            ScrapeUtils.Persistence.flush()
+            self.assertEqual(backend.read_metadata(url), ScrapeUtils.WebcacheMetadata(3000.0, etag='"v2"'))
+        finally:
+            ScrapeUtils.Html.html_webcache_folder = old_folder
+
+    def test_failed_run_still_writes_queued_files(self) -> None:
+        path = self.folder / "webcache" / "item=1.txt"
+        def write_slowly() -> None:
+            ScrapeUtils.Persistence.write_behind.submit(lambda: time.sleep(0.2))
+            ScrapeUtils.Persistence.write_textfile(path, "<h1>item</h1>")
+        def fail() -> None:
+            raise ValueError("stage failed")
+        graph = PipelineStageGraph()
+        graph.add_stage("scrape", write_slowly, outputs=["pages"])
+        graph.add_stage("export", fail, inputs=["pages"])
+        with mock.patch.object(MainWowheadPipeline, "factories", []), \
+                mock.patch.object(MainWowheadPipeline, "write_behind", True), \
+                mock.patch.object(MainWowheadPipeline, "metrics_report_path", self.folder / "metrics.json"), \
+                mock.patch.object(MainWowheadPipeline, "create_stage_graph", return_value=graph):
+            with redirect_stdout(io.StringIO()), self.assertRaises(ValueError):
+                MainWowheadPipeline.main()
+        self.assertIsNone(ScrapeUtils.Persistence.write_behind)
+        self.assertEqual(path.read_text(encoding='utf-8'), "<h1>item</h1>")
+        self.assertTrue((self.folder / "metrics.json").exists())